@@ -0,0 +1,57 @@
+"""Compare two benchmark reports of run.py.
+
+    python benchmarks/compare.py baseline.json current.json [--threshold 1.2]
+
+Prints the median ratio (current / baseline) of every case both reports
+contain and exits with 1 if any case got slower than the threshold.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+
+def load(path: Path) -> Dict[Tuple[int, str], dict]:
+    """Return the results of a report by (size, case)."""
+    report = json.loads(path.read_text())
+    return {(row["size"], row["case"]): row for row in report["results"]}
+
+
+def main() -> None:
+    """Print the comparison and set the exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument(
+        "--threshold", type=float, default=1.2, help="slowdown ratio counted as regression"
+    )
+    parser.add_argument(
+        "--min-ms",
+        type=float,
+        default=0.05,
+        help="ignore cases faster than this in both reports (timer noise)",
+    )
+    args = parser.parse_args()
+
+    baseline = load(args.baseline)
+    current = load(args.current)
+    regressions = 0
+    for key in sorted(baseline.keys() & current.keys()):
+        old, new = baseline[key]["median"], current[key]["median"]
+        ratio = new / old if old else float("inf")
+        flag = ""
+        if ratio > args.threshold and max(old, new) >= args.min_ms:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif ratio < 1 / args.threshold and max(old, new) >= args.min_ms:
+            flag = "  faster"
+        print(f"{key[0]:>7} {key[1]:<36} {old:>10.3f} -> {new:>10.3f} ms  x{ratio:.2f}{flag}")
+
+    for key in sorted(baseline.keys() ^ current.keys()):
+        print(f"{key[0]:>7} {key[1]:<36} only in {'baseline' if key in baseline else 'current'}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
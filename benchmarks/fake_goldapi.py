@@ -0,0 +1,369 @@
+"""Local stand-in for the goldapi.io price endpoints.
+
+Serves `/{METAL}/{CURRENCY}` (current price) and `?date=YYYY-MM-DD`
+(historical price) with synthetic, deterministic prices, and can inject
+latency, server errors, hanging requests, a per-minute rate limit (429 with
+Retry-After) and an exhausted quota (403). In record mode requests are
+forwarded to the real API and the responses saved to a cassette; replay
+mode serves a cassette without network access.
+
+    python benchmarks/fake_goldapi.py --port 8765 --latency 0.05 --error-rate 0.02
+    python benchmarks/fake_goldapi.py --mode record --cassette gold.json
+    python benchmarks/fake_goldapi.py --mode replay --cassette gold.json
+
+Point the client at it with `GoldAPIClient(api_key, base_url=...)`.
+`GET /_stats` returns the request counters.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from collections import Counter
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from aiohttp import ClientSession, ClientTimeout, web
+
+BENCH_DIR = Path(__file__).resolve().parent
+# Also run standalone: the integration package needs Home Assistant (stub)
+for path in (str(BENCH_DIR / "ha_stub"), str(BENCH_DIR.parent)):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from custom_components.gold_portfolio.const import (  # noqa: E402
+    GOLD_API_BASE_URL,
+    TROY_OZ_TO_GRAM,
+)
+
+MODE_SYNTHETIC = "synthetic"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+MODES = (MODE_SYNTHETIC, MODE_RECORD, MODE_REPLAY)
+
+# EUR per troy ounce around which the synthetic prices move
+BASE_PRICES = {"XAU": 2200.0, "XAG": 26.0, "XPT": 900.0, "XPD": 1000.0}
+CURRENCY_RATES = {"EUR": 1.0, "USD": 1.08, "GBP": 0.85, "CHF": 0.95}
+
+
+class FakeConfig:
+    """Behavior of the fake server."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        hang_rate: float = 0.0,
+        hang: float = 30.0,
+        rate_limit: int = 0,
+        quota: int = 0,
+        api_keys: Optional[Set[str]] = None,
+        mode: str = MODE_SYNTHETIC,
+        cassette: Optional[Path] = None,
+        upstream: str = GOLD_API_BASE_URL,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the configuration.
+
+        `latency` is the mean response delay in seconds, varied by up to
+        `jitter` (a fraction) either way. `error_rate` and `hang_rate` are
+        probabilities per request; a hanging request waits `hang` seconds
+        before answering, so clients run into their timeout. `rate_limit` is
+        requests per minute and `quota` requests in total per API key
+        (0 = unlimited). Without `api_keys` any key is accepted.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self.hang = hang
+        self.rate_limit = rate_limit
+        self.quota = quota
+        self.api_keys = api_keys
+        self.mode = mode
+        self.cassette = cassette
+        self.upstream = upstream
+        self.seed = seed
+
+
+def synthetic_price(metal: str, currency: str, moment: float) -> float:
+    """Return a smooth, deterministic price per troy ounce at epoch seconds."""
+    days = moment / 86400
+    base = BASE_PRICES[metal] * CURRENCY_RATES[currency]
+    # Slow trend, a yearly cycle and a fast intraday wiggle
+    factor = 1 + 0.00005 * (days - 19000) + 0.08 * math.sin(days / 58) + 0.004 * math.sin(days * 48)
+    return round(base * max(factor, 0.1), 2)
+
+
+def price_response(metal: str, currency: str, moment: float) -> Dict[str, Any]:
+    """Return a goldapi.io style response body."""
+    price = synthetic_price(metal, currency, moment)
+    day_start = moment - moment % 86400
+    prev_close = synthetic_price(metal, currency, day_start - 1)
+    return {
+        "timestamp": int(moment),
+        "metal": metal,
+        "currency": currency,
+        "exchange": "FAKE",
+        "symbol": f"FAKE:{metal}{currency}",
+        "prev_close_price": prev_close,
+        "open_price": synthetic_price(metal, currency, day_start),
+        "open_time": int(day_start),
+        "price": price,
+        "ch": round(price - prev_close, 2),
+        "chp": round((price - prev_close) / prev_close * 100, 2),
+        "ask": round(price * 1.0005, 2),
+        "bid": round(price * 0.9995, 2),
+        "price_gram_24k": round(price / TROY_OZ_TO_GRAM, 4),
+    }
+
+
+class TokenBucket:
+    """Per-minute request budget of one API key."""
+
+    def __init__(self, per_minute: int) -> None:
+        """Initialize a full bucket."""
+        self.rate = per_minute / 60
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def take(self) -> Optional[float]:
+        """Take a token; return None if granted, else seconds until one is free."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return None
+        return (1 - self.tokens) / self.rate
+
+
+class FakeGoldAPI:
+    """The fake server: an aiohttp application plus its counters."""
+
+    def __init__(self, config: FakeConfig) -> None:
+        """Initialize the server."""
+        self.config = config
+        self.stats: Counter = Counter()
+        self._rng = random.Random(config.seed)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._used: Counter = Counter()
+        self._interactions: List[Dict[str, Any]] = []
+        self._replay: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._replay_position: Counter = Counter()
+        self._upstream: Optional[ClientSession] = None
+        if config.mode != MODE_SYNTHETIC and config.cassette is None:
+            raise ValueError(f"Mode {config.mode} needs a cassette")
+        if config.mode == MODE_REPLAY:
+            for interaction in json.loads(config.cassette.read_text())["interactions"]:
+                key = (interaction["path"], interaction["query"])
+                self._replay.setdefault(key, []).append(interaction)
+
+    def make_app(self) -> web.Application:
+        """Return the aiohttp application."""
+        app = web.Application()
+        app.router.add_get("/_stats", self._handle_stats)
+        app.router.add_get("/{metal}/{currency}", self._handle_price)
+        app.router.add_get("/{metal}/{currency}/{day}", self._handle_price)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+    async def _on_cleanup(self, _app: web.Application) -> None:
+        """Close the upstream session and save the cassette."""
+        if self._upstream is not None:
+            await self._upstream.close()
+        self.save_cassette()
+
+    def save_cassette(self) -> None:
+        """Write the recorded interactions (record mode only)."""
+        if self.config.mode != MODE_RECORD:
+            return
+        self.config.cassette.write_text(
+            json.dumps(
+                {
+                    "recorded": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "upstream": self.config.upstream,
+                    "interactions": self._interactions,
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+
+    async def _handle_stats(self, _request: web.Request) -> web.Response:
+        """Return the counters."""
+        return web.json_response(dict(self.stats))
+
+    def _reply(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> web.Response:
+        """Count and build a response."""
+        self.stats[f"status_{status}"] += 1
+        return web.json_response(body, status=status, headers=headers)
+
+    async def _handle_price(self, request: web.Request) -> web.Response:
+        """Answer a price request, applying the configured faults."""
+        config = self.config
+        self.stats["requests"] += 1
+        api_key = request.headers.get("x-access-token", "")
+        if not api_key or (config.api_keys is not None and api_key not in config.api_keys):
+            return self._reply(401, {"error": "Invalid API Key"})
+
+        if config.rate_limit:
+            bucket = self._buckets.get(api_key)
+            if bucket is None:
+                bucket = self._buckets[api_key] = TokenBucket(config.rate_limit)
+            wait = bucket.take()
+            if wait is not None:
+                return self._reply(
+                    429,
+                    {"error": "Too Many Requests"},
+                    {"Retry-After": str(math.ceil(wait))},
+                )
+        if config.quota:
+            if self._used[api_key] >= config.quota:
+                return self._reply(403, {"error": "API quota exhausted"})
+            self._used[api_key] += 1
+
+        roll = self._rng.random()
+        if roll < config.hang_rate:
+            self.stats["hung"] += 1
+            await asyncio.sleep(config.hang)
+        elif config.latency:
+            spread = config.latency * config.jitter
+            await asyncio.sleep(max(0.0, self._rng.uniform(config.latency - spread, config.latency + spread)))
+        if config.hang_rate <= roll < config.hang_rate + config.error_rate:
+            status = self._rng.choice((500, 502, 503))
+            return self._reply(status, {"error": "Injected server error"})
+
+        if config.mode == MODE_SYNTHETIC:
+            return self._synthetic(request)
+        if config.mode == MODE_REPLAY:
+            return self._replayed(request)
+        return await self._recorded(request, api_key)
+
+    def _synthetic(self, request: web.Request) -> web.Response:
+        """Answer with a synthetic price."""
+        metal = request.match_info["metal"].upper()
+        currency = request.match_info["currency"].upper()
+        if metal not in BASE_PRICES or currency not in CURRENCY_RATES:
+            return self._reply(400, {"error": f"Unsupported symbol {metal}/{currency}"})
+
+        day = request.query.get("date") or request.match_info.get("day")
+        if not day:
+            return self._reply(200, price_response(metal, currency, time.time()))
+        try:
+            # ?date=YYYY-MM-DD as sent by the client, /YYYYMMDD as goldapi.io documents
+            moment = datetime.strptime(day.replace("-", ""), "%Y%m%d").replace(
+                tzinfo=timezone.utc
+            )
+        except ValueError:
+            return self._reply(400, {"error": f"Invalid date {day}"})
+        if moment.date() > date.today():
+            return self._reply(400, {"error": "Date is in the future"})
+        # Closing price of the day
+        return self._reply(200, price_response(metal, currency, moment.timestamp() + 86399))
+
+    def _replayed(self, request: web.Request) -> web.Response:
+        """Answer with the next recorded response for the path and query."""
+        key = (request.path, request.query_string)
+        interactions = self._replay.get(key)
+        if not interactions:
+            self.stats["replay_misses"] += 1
+            return self._reply(404, {"error": f"No recorded response for {request.path_qs}"})
+        # Repeated requests cycle through the recorded responses
+        interaction = interactions[self._replay_position[key] % len(interactions)]
+        self._replay_position[key] += 1
+        return self._reply(interaction["status"], interaction["body"], interaction.get("headers"))
+
+    async def _recorded(self, request: web.Request, api_key: str) -> web.Response:
+        """Forward the request upstream and record the response (not the key)."""
+        if self._upstream is None:
+            self._upstream = ClientSession(timeout=ClientTimeout(total=30))
+        async with self._upstream.get(
+            f"{self.config.upstream}{request.path_qs}",
+            headers={"x-access-token": api_key, "Content-Type": "application/json"},
+        ) as resp:
+            try:
+                body = await resp.json(content_type=None)
+            except ValueError:
+                body = {"error": await resp.text()}
+            headers = {
+                name: resp.headers[name] for name in ("Retry-After",) if name in resp.headers
+            }
+        self._interactions.append(
+            {
+                "path": request.path,
+                "query": request.query_string,
+                "status": resp.status,
+                "headers": headers,
+                "body": body,
+            }
+        )
+        self.save_cassette()
+        return self._reply(resp.status, body, headers)
+
+
+async def async_start(
+    config: FakeConfig, host: str = "127.0.0.1", port: int = 0
+) -> Tuple[FakeGoldAPI, web.AppRunner, str]:
+    """Start a fake server; return it, its runner (to clean up) and its base URL."""
+    fake = FakeGoldAPI(config)
+    runner = web.AppRunner(fake.make_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return fake, runner, f"http://{host}:{bound_port}"
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the fake server options to a parser."""
+    parser.add_argument("--latency", type=float, default=0.0, help="mean delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="delay spread as a fraction")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 5xx answers")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="share of hanging requests")
+    parser.add_argument("--hang", type=float, default=30.0, help="seconds a request hangs")
+    parser.add_argument("--rate-limit", type=int, default=0, help="requests per minute and key")
+    parser.add_argument("--quota", type=int, default=0, help="requests in total per key")
+    parser.add_argument("--api-key", action="append", help="accepted key (default any)")
+    parser.add_argument("--mode", choices=MODES, default=MODE_SYNTHETIC)
+    parser.add_argument("--cassette", type=Path, help="recorded responses (record/replay)")
+    parser.add_argument("--upstream", default=GOLD_API_BASE_URL, help="API to record from")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def config_from_args(args: argparse.Namespace) -> FakeConfig:
+    """Return the configuration for parsed options."""
+    return FakeConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        hang_rate=args.hang_rate,
+        hang=args.hang,
+        rate_limit=args.rate_limit,
+        quota=args.quota,
+        api_keys=set(args.api_key) if args.api_key else None,
+        mode=args.mode,
+        cassette=args.cassette,
+        upstream=args.upstream,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    """Run the fake server until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args()
+    fake = FakeGoldAPI(config_from_args(args))
+    web.run_app(fake.make_app(), host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""Minimal stand-in for Home Assistant core, used by the benchmarks only.
+
+It implements just the surface the integration touches, with the same
+call semantics (callbacks run on the event loop, blocking work goes to an
+executor), so timings reflect the integration's own code.
+"""
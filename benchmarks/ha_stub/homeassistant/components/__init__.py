@@ -0,0 +1 @@
+"""Components of the Home Assistant stub."""
@@ -0,0 +1,39 @@
+"""Sensor entity of the Home Assistant stub."""
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from ..helpers.entity import Entity
+
+
+class SensorStateClass(str, Enum):
+    """State classes of sensors."""
+
+    MEASUREMENT = "measurement"
+    TOTAL = "total"
+    TOTAL_INCREASING = "total_increasing"
+
+
+class SensorEntity(Entity):
+    """Sensor whose state is its native value, with unit and state class."""
+
+    _attr_native_unit_of_measurement: Optional[str] = None
+    _attr_state_class: Optional[str] = None
+
+    @property
+    def native_value(self) -> Any:
+        """Return the value."""
+        return None
+
+    @property
+    def state(self) -> Any:
+        """Return the native value."""
+        return self.native_value
+
+    def _base_attributes(self) -> Dict[str, Any]:
+        """Return the unit and state class."""
+        attributes: Dict[str, Any] = {}
+        if self._attr_native_unit_of_measurement is not None:
+            attributes["unit_of_measurement"] = self._attr_native_unit_of_measurement
+        if self._attr_state_class is not None:
+            attributes["state_class"] = self._attr_state_class
+        return attributes
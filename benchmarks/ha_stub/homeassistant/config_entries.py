@@ -0,0 +1,41 @@
+"""Config entries of the Home Assistant stub."""
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional
+
+
+class ConfigEntry:
+    """A config entry with data and options."""
+
+    def __init__(
+        self,
+        entry_id: str,
+        domain: str,
+        title: str,
+        data: Optional[Dict[str, Any]] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Initialize the entry."""
+        self.entry_id = entry_id
+        self.domain = domain
+        self.title = title
+        self.data = MappingProxyType(dict(data or {}))
+        self.options = MappingProxyType(dict(options or {}))
+        self.pref_disable_polling = False
+        self._on_unload: List[Callable[[], Any]] = []
+
+    def async_on_unload(self, func: Callable[[], Any]) -> None:
+        """Call a function when the entry is unloaded."""
+        self._on_unload.append(func)
+
+    def add_update_listener(self, listener: Callable) -> Callable[[], None]:
+        """Listen for option updates (never fired by the stub)."""
+        return lambda: None
+
+    def async_create_background_task(self, hass: Any, target: Any, name: str, eager_start: bool = False) -> Any:
+        """Create a task bound to the entry."""
+        return hass.async_create_task(target, name)
+
+    def async_unload(self) -> None:
+        """Run the unload callbacks."""
+        while self._on_unload:
+            self._on_unload.pop()()
@@ -0,0 +1,11 @@
+"""Constants of the Home Assistant stub."""
+from enum import Enum
+
+CONF_NAME = "name"
+EVENT_HOMEASSISTANT_FINAL_WRITE = "homeassistant_final_write"
+
+
+class Platform(str, Enum):
+    """Entity platforms."""
+
+    SENSOR = "sensor"
@@ -0,0 +1,204 @@
+"""Event loop, bus, states and services of the Home Assistant stub."""
+import asyncio
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+CALLBACK_TYPE = Callable[[], None]
+
+
+def callback(func: Callable) -> Callable:
+    """Mark a function as safe to run in the event loop."""
+    return func
+
+
+class Event:
+    """An event on the bus."""
+
+    def __init__(self, event_type: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """Initialize the event."""
+        self.event_type = event_type
+        self.data = data or {}
+
+
+class SupportsResponse(str, Enum):
+    """Whether a service returns a response."""
+
+    NONE = "none"
+    OPTIONAL = "optional"
+    ONLY = "only"
+
+
+class ServiceCall:
+    """A service call."""
+
+    def __init__(
+        self, domain: str, service: str, data: Dict[str, Any], return_response: bool = False
+    ) -> None:
+        """Initialize the call."""
+        self.domain = domain
+        self.service = service
+        self.data = data
+        self.return_response = return_response
+
+
+class EventBus:
+    """Event bus that counts fired events."""
+
+    def __init__(self) -> None:
+        """Initialize the bus."""
+        self._listeners: Dict[str, List[Callable]] = {}
+        self.fired = 0
+
+    @callback
+    def async_listen(self, event_type: str, listener: Callable) -> CALLBACK_TYPE:
+        """Listen for an event type."""
+        self._listeners.setdefault(event_type, []).append(listener)
+
+        def remove() -> None:
+            if listener in self._listeners.get(event_type, []):
+                self._listeners[event_type].remove(listener)
+
+        return remove
+
+    async_listen_once = async_listen
+
+    @callback
+    def async_fire(self, event_type: str, event_data: Optional[Dict[str, Any]] = None) -> None:
+        """Fire an event."""
+        self.fired += 1
+        for listener in list(self._listeners.get(event_type, [])):
+            result = listener(Event(event_type, event_data))
+            if asyncio.iscoroutine(result):
+                asyncio.get_running_loop().create_task(result)
+
+
+class State:
+    """State of an entity."""
+
+    __slots__ = ("entity_id", "state", "attributes")
+
+    def __init__(self, entity_id: str, state: str, attributes: Dict[str, Any]) -> None:
+        """Initialize the state."""
+        self.entity_id = entity_id
+        self.state = state
+        self.attributes = attributes
+
+
+class StateMachine:
+    """States by entity id; counts writes."""
+
+    def __init__(self) -> None:
+        """Initialize the state machine."""
+        self._states: Dict[str, State] = {}
+        self.writes = 0
+
+    @callback
+    def async_set(self, entity_id: str, state: Any, attributes: Optional[Dict[str, Any]] = None) -> None:
+        """Set the state of an entity."""
+        self.writes += 1
+        # Home Assistant stores states as strings with a copy of the attributes
+        self._states[entity_id] = State(entity_id, str(state), dict(attributes or {}))
+
+    @callback
+    def async_remove(self, entity_id: str) -> bool:
+        """Remove the state of an entity."""
+        return self._states.pop(entity_id, None) is not None
+
+    def get(self, entity_id: str) -> Optional[State]:
+        """Return the state of an entity."""
+        return self._states.get(entity_id)
+
+    def async_entity_ids(self) -> List[str]:
+        """Return all entity ids."""
+        return list(self._states)
+
+
+class ServiceRegistry:
+    """Registered service handlers with their schemas."""
+
+    def __init__(self, hass: "HomeAssistant") -> None:
+        """Initialize the registry."""
+        self._hass = hass
+        self._services: Dict[str, Dict[str, tuple]] = {}
+
+    @callback
+    def async_register(
+        self,
+        domain: str,
+        service: str,
+        handler: Callable,
+        schema: Any = None,
+        supports_response: SupportsResponse = SupportsResponse.NONE,
+    ) -> None:
+        """Register a service."""
+        self._services.setdefault(domain, {})[service] = (handler, schema, supports_response)
+
+    def has_service(self, domain: str, service: str) -> bool:
+        """Return True if the service exists."""
+        return service in self._services.get(domain, {})
+
+    async def async_call(
+        self,
+        domain: str,
+        service: str,
+        service_data: Optional[Dict[str, Any]] = None,
+        blocking: bool = True,
+        return_response: bool = False,
+    ) -> Any:
+        """Validate the data against the schema and run the handler."""
+        handler, schema, _ = self._services[domain][service]
+        data = dict(service_data or {})
+        if schema is not None:
+            data = schema(data)
+        result = handler(ServiceCall(domain, service, data, return_response))
+        if asyncio.iscoroutine(result):
+            result = await result
+        return result if return_response else None
+
+
+class Config:
+    """Configuration directory."""
+
+    def __init__(self, config_dir: str) -> None:
+        """Initialize the configuration."""
+        self.config_dir = config_dir
+        self.time_zone = "UTC"
+
+    def path(self, *path: str) -> str:
+        """Return a path in the configuration directory."""
+        import os
+
+        return os.path.join(self.config_dir, *path)
+
+
+class HomeAssistant:
+    """Core object; must be created inside a running event loop."""
+
+    def __init__(self, config_dir: str) -> None:
+        """Initialize the core."""
+        self.loop = asyncio.get_running_loop()
+        self.bus = EventBus()
+        self.states = StateMachine()
+        self.services = ServiceRegistry(self)
+        self.config = Config(config_dir)
+        self.data: Dict[str, Any] = {}
+        self._tasks: set = set()
+
+    @callback
+    def async_create_task(self, target: Any, name: Optional[str] = None, eager_start: bool = False) -> asyncio.Task:
+        """Create a task that is awaited by `async_block_till_done`."""
+        task = self.loop.create_task(target, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async_create_background_task = async_create_task
+
+    def async_add_executor_job(self, target: Callable, *args: Any) -> asyncio.Future:
+        """Run a blocking function in the default executor."""
+        return self.loop.run_in_executor(None, target, *args)
+
+    async def async_block_till_done(self) -> None:
+        """Wait for all tracked tasks, including ones they start."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
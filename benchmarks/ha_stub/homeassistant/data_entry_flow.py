@@ -0,0 +1,4 @@
+"""Data entry flows of the Home Assistant stub."""
+from typing import Any, Dict
+
+FlowResult = Dict[str, Any]
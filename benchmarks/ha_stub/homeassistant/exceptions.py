@@ -0,0 +1,9 @@
+"""Exceptions of the Home Assistant stub."""
+
+
+class HomeAssistantError(Exception):
+    """General Home Assistant error."""
+
+
+class ConfigEntryNotReady(HomeAssistantError):
+    """A config entry could not be set up yet."""
@@ -0,0 +1 @@
+"""Helpers of the Home Assistant stub."""
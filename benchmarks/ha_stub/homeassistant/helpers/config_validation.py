@@ -0,0 +1,25 @@
+"""Config validation of the Home Assistant stub."""
+from typing import Any, Dict, List
+
+import voluptuous as vol
+
+
+def ensure_list(value: Any) -> List[Any]:
+    """Wrap a single value in a list (None becomes an empty list)."""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def multi_select(options: Dict[str, Any]) -> Any:
+    """Validate a list of options."""
+
+    def validator(value: List[Any]) -> List[Any]:
+        if not isinstance(value, list):
+            value = [value]
+        for item in value:
+            if item not in options:
+                raise vol.Invalid(f"{item} is not a valid option")
+        return value
+
+    return validator
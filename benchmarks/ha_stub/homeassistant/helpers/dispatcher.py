@@ -0,0 +1,28 @@
+"""Dispatcher helpers of the Home Assistant stub."""
+from typing import Any, Callable
+
+from ..core import CALLBACK_TYPE, HomeAssistant, callback
+
+DATA_DISPATCHER = "dispatcher"
+
+
+@callback
+def async_dispatcher_connect(
+    hass: HomeAssistant, signal: str, target: Callable[..., Any]
+) -> CALLBACK_TYPE:
+    """Connect a callable to a signal."""
+    targets = hass.data.setdefault(DATA_DISPATCHER, {}).setdefault(signal, [])
+    targets.append(target)
+
+    def remove_dispatcher() -> None:
+        if target in targets:
+            targets.remove(target)
+
+    return remove_dispatcher
+
+
+@callback
+def async_dispatcher_send(hass: HomeAssistant, signal: str, *args: Any) -> None:
+    """Call the callables connected to a signal."""
+    for target in list(hass.data.get(DATA_DISPATCHER, {}).get(signal, [])):
+        target(*args)
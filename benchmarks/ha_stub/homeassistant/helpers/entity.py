@@ -0,0 +1,84 @@
+"""Entity base class of the Home Assistant stub."""
+from typing import Any, Dict, List, Optional
+
+from ..core import CALLBACK_TYPE, HomeAssistant, callback
+
+
+class Entity:
+    """An entity that writes its state and attributes to the state machine."""
+
+    hass: Optional[HomeAssistant] = None
+    entity_id: Optional[str] = None
+    registry_entry: Any = None
+    platform: Any = None
+    _attr_name: Optional[str] = None
+    _attr_unique_id: Optional[str] = None
+    _attr_icon: Optional[str] = None
+    _attr_extra_state_attributes: Dict[str, Any] = {}
+    _on_remove: Optional[List[CALLBACK_TYPE]] = None
+
+    @property
+    def name(self) -> Optional[str]:
+        """Return the name."""
+        return self._attr_name
+
+    @property
+    def unique_id(self) -> Optional[str]:
+        """Return the unique id."""
+        return self._attr_unique_id
+
+    @property
+    def available(self) -> bool:
+        """Return True if the entity is available."""
+        return True
+
+    @property
+    def state(self) -> Any:
+        """Return the state."""
+        return None
+
+    @property
+    def extra_state_attributes(self) -> Optional[Dict[str, Any]]:
+        """Return extra state attributes."""
+        return self._attr_extra_state_attributes
+
+    def _base_attributes(self) -> Dict[str, Any]:
+        """Return attributes every entity of the platform has."""
+        return {}
+
+    @callback
+    def async_on_remove(self, func: CALLBACK_TYPE) -> None:
+        """Call a function when the entity is removed."""
+        if self._on_remove is None:
+            self._on_remove = []
+        self._on_remove.append(func)
+
+    async def async_added_to_hass(self) -> None:
+        """Run when the entity was added."""
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Run before the entity is removed."""
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state like Home Assistant does: state, attributes, availability."""
+        if self.hass is None or self.entity_id is None:
+            return
+        if not self.available:
+            self.hass.states.async_set(self.entity_id, "unavailable", {})
+            return
+        attributes = self._base_attributes()
+        attributes.update(self.extra_state_attributes or {})
+        if self.name is not None:
+            attributes["friendly_name"] = self.name
+        self.hass.states.async_set(self.entity_id, self.state, attributes)
+
+    async def async_remove(self, *, force_remove: bool = False) -> None:
+        """Remove the entity and its state."""
+        await self.async_will_remove_from_hass()
+        while self._on_remove:
+            self._on_remove.pop()()
+        if self.hass is not None and self.entity_id is not None:
+            self.hass.states.async_remove(self.entity_id)
+        if self.platform is not None:
+            self.platform.entities.pop(self.entity_id, None)
@@ -0,0 +1,47 @@
+"""Entity platform of the Home Assistant stub."""
+import re
+from typing import Any, Callable, Dict, Iterable
+
+from ..core import HomeAssistant
+from . import entity_registry as er
+
+AddEntitiesCallback = Callable[..., None]
+
+
+def _slug(value: str) -> str:
+    """Return an entity id slug."""
+    return re.sub(r"[^a-z0-9]+", "_", value.lower()).strip("_")
+
+
+class EntityPlatform:
+    """Adds entities: assigns ids, registers them and writes their first state."""
+
+    def __init__(self, hass: HomeAssistant, domain: str, config_entry_id: str) -> None:
+        """Initialize the platform."""
+        self.hass = hass
+        self.domain = domain
+        self.config_entry_id = config_entry_id
+        self.entities: Dict[str, Any] = {}
+
+    def async_add_entities(self, new_entities: Iterable[Any], update_before_add: bool = False) -> None:
+        """Add entities; the work runs as a task like in Home Assistant."""
+        self.hass.async_create_task(self._async_add(list(new_entities)))
+
+    async def _async_add(self, new_entities: list) -> None:
+        """Add the entities one by one."""
+        registry = er.async_get(self.hass)
+        for entity in new_entities:
+            entity.hass = self.hass
+            entity.platform = self
+            base = f"{self.domain}.{_slug(entity.name or 'entity')}"
+            entity_id, suffix = base, 2
+            while entity_id in self.entities or self.hass.states.get(entity_id):
+                entity_id, suffix = f"{base}_{suffix}", suffix + 1
+            entity.entity_id = entity_id
+            if entity.unique_id is not None:
+                entity.registry_entry = registry.async_get_or_create(
+                    entity_id, entity.unique_id, self.config_entry_id, entity
+                )
+            self.entities[entity_id] = entity
+            await entity.async_added_to_hass()
+            entity.async_write_ha_state()
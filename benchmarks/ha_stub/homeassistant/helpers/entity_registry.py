@@ -0,0 +1,78 @@
+"""Entity registry of the Home Assistant stub."""
+from typing import Any, Dict, List, Optional
+
+from ..core import HomeAssistant
+
+DATA_REGISTRY = "entity_registry"
+
+
+class RegistryEntry:
+    """A registry entry."""
+
+    __slots__ = ("entity_id", "unique_id", "config_entry_id")
+
+    def __init__(self, entity_id: str, unique_id: str, config_entry_id: str) -> None:
+        """Initialize the entry."""
+        self.entity_id = entity_id
+        self.unique_id = unique_id
+        self.config_entry_id = config_entry_id
+
+
+class EntityRegistry:
+    """Registry entries by entity id; removing one removes the live entity."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the registry."""
+        self.hass = hass
+        self.entities: Dict[str, RegistryEntry] = {}
+        self._live: Dict[str, Any] = {}
+
+    def async_get_or_create(
+        self, entity_id: str, unique_id: str, config_entry_id: str, entity: Any = None
+    ) -> RegistryEntry:
+        """Register an entity."""
+        entry = self.entities[entity_id] = RegistryEntry(entity_id, unique_id, config_entry_id)
+        if entity is not None:
+            self._live[entity_id] = entity
+        return entry
+
+    def async_get(self, entity_id: str) -> Optional[RegistryEntry]:
+        """Return a registry entry."""
+        return self.entities.get(entity_id)
+
+    def async_get_entity_id(self, domain: str, platform: str, unique_id: str) -> Optional[str]:
+        """Return the entity id registered for a unique id."""
+        for entry in self.entities.values():
+            if entry.unique_id == unique_id and entry.entity_id.startswith(f"{domain}."):
+                return entry.entity_id
+        return None
+
+    def async_update_entity(self, entity_id: str, *, new_unique_id: Optional[str] = None) -> RegistryEntry:
+        """Change the unique id of an entry."""
+        entry = self.entities[entity_id]
+        if new_unique_id is not None:
+            entry.unique_id = new_unique_id
+        return entry
+
+    def async_remove(self, entity_id: str) -> None:
+        """Remove an entry and its entity."""
+        self.entities.pop(entity_id, None)
+        entity = self._live.pop(entity_id, None)
+        if entity is not None:
+            self.hass.async_create_task(entity.async_remove(force_remove=True))
+
+
+def async_get(hass: HomeAssistant) -> EntityRegistry:
+    """Return the entity registry."""
+    registry = hass.data.get(DATA_REGISTRY)
+    if registry is None:
+        registry = hass.data[DATA_REGISTRY] = EntityRegistry(hass)
+    return registry
+
+
+def async_entries_for_config_entry(registry: EntityRegistry, config_entry_id: str) -> List[RegistryEntry]:
+    """Return the registry entries of a config entry."""
+    return [
+        entry for entry in registry.entities.values()
+        if entry.config_entry_id == config_entry_id
+    ]
@@ -0,0 +1,16 @@
+"""Event helpers of the Home Assistant stub."""
+from datetime import timedelta
+from typing import Any, Callable, Union
+
+from ..core import CALLBACK_TYPE, HomeAssistant, callback
+from ..util import dt as dt_util
+
+
+@callback
+def async_call_later(
+    hass: HomeAssistant, delay: Union[float, timedelta], action: Callable[[Any], Any]
+) -> CALLBACK_TYPE:
+    """Call an action after a delay."""
+    seconds = delay.total_seconds() if isinstance(delay, timedelta) else delay
+    handle = hass.loop.call_later(seconds, lambda: action(dt_util.utcnow()))
+    return handle.cancel
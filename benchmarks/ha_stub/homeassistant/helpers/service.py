@@ -0,0 +1,17 @@
+"""Service helpers of the Home Assistant stub."""
+from typing import Any, Callable
+
+from ..core import HomeAssistant, SupportsResponse, callback
+
+
+@callback
+def async_register_admin_service(
+    hass: HomeAssistant,
+    domain: str,
+    service: str,
+    service_func: Callable,
+    schema: Any = None,
+    supports_response: SupportsResponse = SupportsResponse.NONE,
+) -> None:
+    """Register a service (the stub has no users to check)."""
+    hass.services.async_register(domain, service, service_func, schema, supports_response)
@@ -0,0 +1,118 @@
+"""Data update coordinator of the Home Assistant stub (no polling)."""
+import logging
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ..core import CALLBACK_TYPE, HomeAssistant, callback
+from .entity import Entity
+
+
+class UpdateFailed(Exception):
+    """An update failed."""
+
+
+class DataUpdateCoordinator:
+    """Holds data and notifies listeners; refreshes only when asked to."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        logger: logging.Logger,
+        *,
+        name: str,
+        update_method: Optional[Callable[[], Awaitable[Any]]] = None,
+        update_interval: Optional[timedelta] = None,
+        always_update: bool = True,
+        config_entry: Any = None,
+    ) -> None:
+        """Initialize the coordinator."""
+        self.hass = hass
+        self.logger = logger
+        self.name = name
+        self.update_method = update_method
+        self.update_interval = update_interval
+        self.always_update = always_update
+        self.data: Any = None
+        self.last_update_success = True
+        self._listeners: Dict[CALLBACK_TYPE, Any] = {}
+        self._unsub_refresh: Optional[CALLBACK_TYPE] = None
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE, context: Any = None) -> CALLBACK_TYPE:
+        """Listen for data updates."""
+        self._listeners[update_callback] = context
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.pop(update_callback, None)
+
+        return remove_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify all listeners in subscription order."""
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def _schedule_refresh(self) -> None:
+        """Polling is not simulated."""
+
+    async def _async_update_data(self) -> Any:
+        """Fetch data."""
+        if self.update_method is None:
+            raise NotImplementedError
+        return await self.update_method()
+
+    async def async_refresh(self) -> None:
+        """Refresh now."""
+        try:
+            data = await self._async_update_data()
+        except UpdateFailed:
+            self.last_update_success = False
+            self.async_update_listeners()
+            return
+        if not self.always_update and self.last_update_success and data == self.data:
+            return
+        self.last_update_success = True
+        self.data = data
+        self.async_update_listeners()
+
+    async def async_request_refresh(self) -> None:
+        """Refresh now (no debouncing)."""
+        await self.async_refresh()
+
+    @callback
+    def async_set_updated_data(self, data: Any) -> None:
+        """Set data and notify listeners."""
+        self.data = data
+        self.last_update_success = True
+        self.async_update_listeners()
+
+    async def async_shutdown(self) -> None:
+        """Stop notifying listeners."""
+        self._listeners.clear()
+
+
+class CoordinatorEntity(Entity):
+    """Entity that writes its state on coordinator updates."""
+
+    def __init__(self, coordinator: DataUpdateCoordinator, context: Any = None) -> None:
+        """Initialize the entity."""
+        self.coordinator = coordinator
+
+    @property
+    def available(self) -> bool:
+        """Return True if the last update succeeded."""
+        return self.coordinator.last_update_success
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the coordinator."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_listener(self._handle_coordinator_update)
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state."""
+        self.async_write_ha_state()
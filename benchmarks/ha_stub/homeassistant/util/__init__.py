@@ -0,0 +1 @@
+"""Utilities of the Home Assistant stub."""
@@ -0,0 +1,50 @@
+"""Date and time helpers of the Home Assistant stub (local time is UTC)."""
+from datetime import date, datetime, timezone
+from typing import Optional
+
+DEFAULT_TIME_ZONE = timezone.utc
+
+
+def now() -> datetime:
+    """Return the current local time."""
+    return datetime.now(DEFAULT_TIME_ZONE)
+
+
+def utcnow() -> datetime:
+    """Return the current UTC time."""
+    return datetime.now(timezone.utc)
+
+
+def utc_from_timestamp(timestamp: float) -> datetime:
+    """Return a UTC datetime for epoch seconds."""
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+def as_utc(value: datetime) -> datetime:
+    """Return a datetime in UTC (naive means local)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=DEFAULT_TIME_ZONE)
+    return value.astimezone(timezone.utc)
+
+
+def as_local(value: datetime) -> datetime:
+    """Return a datetime in local time (naive means UTC)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(DEFAULT_TIME_ZONE)
+
+
+def parse_datetime(value: str) -> Optional[datetime]:
+    """Parse an ISO datetime; a plain date is not a datetime."""
+    if "T" not in value and " " not in value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def start_of_local_day(day: Optional[date] = None) -> datetime:
+    """Return local midnight of a day."""
+    day = day or now().date()
+    return datetime(day.year, day.month, day.day, tzinfo=DEFAULT_TIME_ZONE)
@@ -0,0 +1,230 @@
+"""Load harness for GoldAPIClient against the local goldapi.io stand-in.
+
+Drives the integration's client with N concurrent workers and reports
+throughput, latency percentiles and outcome rates as JSON. Without `--url`
+a fake server is started in-process with the given fault options (see
+fake_goldapi.py):
+
+    python benchmarks/load.py --concurrency 20 --requests 2000 --latency 0.05 --error-rate 0.02
+    python benchmarks/load.py --endpoint historical --rate-limit 600 --timeout 2 --hang-rate 0.01
+    python benchmarks/load.py --scheduler --rate-limit 30 --requests 50
+
+With `--scheduler` every request goes through the QuotaScheduler, as in
+Home Assistant, so 429s turn into waits and retries instead of errors.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+sys.path[:0] = [str(BENCH_DIR / "ha_stub"), str(REPO_DIR), str(BENCH_DIR)]
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.gold_portfolio.api import GoldAPIClient, RateLimitError  # noqa: E402
+from custom_components.gold_portfolio.const import (  # noqa: E402
+    API_RATE_LIMIT_PER_MINUTE,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_LIVE,
+)
+from custom_components.gold_portfolio.scheduler import (  # noqa: E402
+    ApiUsageStore,
+    QuotaExceededError,
+    QuotaScheduler,
+)
+
+import fake_goldapi  # noqa: E402
+
+ENDPOINTS = ("live", "historical", "mixed")
+PERCENTILES = (50, 90, 95, 99)
+
+OUTCOME_OK = "ok"
+OUTCOME_NO_PRICE = "no_price"
+OUTCOME_RATE_LIMITED = "rate_limited"
+OUTCOME_DEFERRED = "deferred"
+OUTCOME_TIMEOUT = "timeout"
+OUTCOME_ERROR = "error"
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    """Return nearest-rank percentiles, mean and max of latencies in ms."""
+    if not values:
+        return {**{f"p{p}": None for p in PERCENTILES}, "mean": None, "max": None}
+    ordered = sorted(values)
+    result: Dict[str, Optional[float]] = {}
+    for p in PERCENTILES:
+        rank = max(1, -(-p * len(ordered) // 100))
+        result[f"p{p}"] = round(ordered[rank - 1], 3)
+    result["mean"] = round(statistics.fmean(ordered), 3)
+    result["max"] = round(ordered[-1], 3)
+    return result
+
+
+def classify(result: Any, error: Optional[BaseException]) -> str:
+    """Return the outcome of one client call."""
+    if error is None:
+        return OUTCOME_OK if result is not None else OUTCOME_NO_PRICE
+    # Deferred by the scheduler's own budget; a subclass of RateLimitError
+    if isinstance(error, QuotaExceededError):
+        return OUTCOME_DEFERRED
+    if isinstance(error, RateLimitError):
+        return OUTCOME_RATE_LIMITED
+    if isinstance(error, asyncio.TimeoutError) or "timeout" in str(error).lower():
+        return OUTCOME_TIMEOUT
+    return OUTCOME_ERROR
+
+
+def request_factory(
+    client: GoldAPIClient, endpoint: str, symbols: List[str], rng: random.Random
+) -> Callable[[], Awaitable[Any]]:
+    """Return a function starting one client call of the chosen kind."""
+    today = date.today()
+
+    def make() -> Awaitable[Any]:
+        symbol = rng.choice(symbols)
+        kind = endpoint if endpoint != "mixed" else rng.choice(("live", "historical"))
+        if kind == "live":
+            return client.get_price(symbol, priority=PRIORITY_LIVE)
+        day = today - timedelta(days=rng.randrange(1, 3650))
+        return client.get_historical_price(
+            day.isoformat(), symbol=symbol, priority=PRIORITY_INTERACTIVE
+        )
+
+    return make
+
+
+async def run_load(
+    make_request: Callable[[], Awaitable[Any]],
+    concurrency: int,
+    requests: int,
+    duration: Optional[float],
+) -> Tuple[float, List[Tuple[str, float]]]:
+    """Run the workers; return the elapsed seconds and (outcome, ms) per call."""
+    samples: List[Tuple[str, float]] = []
+    remaining = [requests]
+    deadline = time.monotonic() + duration if duration else None
+
+    async def worker() -> None:
+        while remaining[0] > 0 and (deadline is None or time.monotonic() < deadline):
+            remaining[0] -= 1
+            start = time.perf_counter()
+            result, error = None, None
+            try:
+                result = await make_request()
+            except Exception as err:  # noqa: BLE001 - every failure is an outcome
+                error = err
+            samples.append((classify(result, error), (time.perf_counter() - start) * 1000))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, samples
+
+
+async def async_main(args: argparse.Namespace) -> Dict[str, Any]:
+    """Start the fake server if needed, run the load and build the report."""
+    runner = fake = None
+    url = args.url
+    if url is None:
+        fake, runner, url = await fake_goldapi.async_start(fake_goldapi.config_from_args(args))
+
+    scheduler = None
+    with tempfile.TemporaryDirectory(prefix="gold_portfolio_load_") as config_dir:
+        if args.scheduler:
+            hass = HomeAssistant(config_dir)
+            scheduler = QuotaScheduler(
+                hass,
+                args.client_key,
+                ApiUsageStore(hass),
+                monthly_quota=args.monthly_quota,
+                rate_per_minute=args.scheduler_rate,
+            )
+        client = GoldAPIClient(
+            args.client_key, timeout=args.timeout, scheduler=scheduler, base_url=url
+        )
+        try:
+            make_request = request_factory(
+                client, args.endpoint, args.symbols, random.Random(args.seed)
+            )
+            elapsed, samples = await run_load(
+                make_request, args.concurrency, args.requests, args.duration
+            )
+        finally:
+            await client.async_close()
+            if runner is not None:
+                await runner.cleanup()
+
+    outcomes = Counter(outcome for outcome, _ in samples)
+    total = len(samples)
+    report = {
+        "meta": {
+            "url": url if args.url else "in-process",
+            "endpoint": args.endpoint,
+            "symbols": args.symbols,
+            "concurrency": args.concurrency,
+            "client_timeout": args.timeout,
+            "scheduler": args.scheduler,
+            "fault_options": None if args.url else {
+                "latency": args.latency,
+                "jitter": args.jitter,
+                "error_rate": args.error_rate,
+                "hang_rate": args.hang_rate,
+                "rate_limit": args.rate_limit,
+                "quota": args.quota,
+                "mode": args.mode,
+            },
+        },
+        "requests": total,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else None,
+        "outcomes": dict(outcomes),
+        "error_rate": round((total - outcomes[OUTCOME_OK]) / total, 4) if total else None,
+        "latency_ms": percentiles([ms for _, ms in samples]),
+        "latency_ok_ms": percentiles([ms for outcome, ms in samples if outcome == OUTCOME_OK]),
+    }
+    if fake is not None:
+        report["server"] = dict(fake.stats)
+    return report
+
+
+def main() -> None:
+    """Parse arguments, run the load and print the JSON report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="base URL of a running fake (default start one)")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--duration", type=float, help="stop after this many seconds")
+    parser.add_argument("--endpoint", choices=ENDPOINTS, default="live")
+    parser.add_argument("--symbols", nargs="+", default=["XAU/EUR"])
+    parser.add_argument("--timeout", type=float, default=10.0, help="client timeout")
+    parser.add_argument("--client-key", default="load-test-key")
+    parser.add_argument("--scheduler", action="store_true", help="use the QuotaScheduler")
+    parser.add_argument("--scheduler-rate", type=int, default=API_RATE_LIMIT_PER_MINUTE)
+    parser.add_argument("--monthly-quota", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write JSON here instead of stdout")
+    parser.add_argument("--verbose", action="store_true", help="show the client's log")
+    fake_goldapi.add_arguments(parser)
+    args = parser.parse_args()
+
+    # Injected faults would otherwise log one line per failed request
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.CRITICAL)
+    report = asyncio.run(async_main(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
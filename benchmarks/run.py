@@ -0,0 +1,411 @@
+"""Offline benchmarks of Gold Portfolio Tracker.
+
+Runs the integration's own code against synthetic portfolios and a stubbed
+Home Assistant core (see ha_stub/), without network access, and prints the
+timings as JSON:
+
+    python benchmarks/run.py --sizes 10 1000 100000 --output results.json
+    python benchmarks/compare.py old.json results.json
+
+Every case reports min/median/mean/max in milliseconds per operation.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+sys.path[:0] = [str(BENCH_DIR / "ha_stub"), str(REPO_DIR), str(BENCH_DIR)]
+
+from homeassistant.config_entries import ConfigEntry  # noqa: E402
+from homeassistant.core import HomeAssistant, StateMachine  # noqa: E402
+from homeassistant.helpers.entity_platform import EntityPlatform  # noqa: E402
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator  # noqa: E402
+
+from custom_components.gold_portfolio import sensor, services  # noqa: E402
+from custom_components.gold_portfolio.columnar import numpy_available  # noqa: E402
+from custom_components.gold_portfolio.const import (  # noqa: E402
+    CONF_ENTITY_MODE,
+    DOMAIN,
+    ENTITY_MODE_COMPACT,
+    ENTITY_MODE_PER_LOT,
+)
+from custom_components.gold_portfolio.portfolio import PortfolioManager  # noqa: E402
+from custom_components.gold_portfolio.scheduler import (  # noqa: E402
+    ApiUsageStore,
+    QuotaScheduler,
+)
+from custom_components.gold_portfolio.tick_store import TickStore  # noqa: E402
+
+import synthetic  # noqa: E402
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+ENTRY_ID = "benchmark"
+# Operations per timed run for the cheap per-call cases
+OPS = 100
+SERVICE_OPS = 20
+
+
+class Results:
+    """Collected timings."""
+
+    def __init__(self) -> None:
+        """Initialize an empty result list."""
+        self.rows: List[Dict[str, Any]] = []
+
+    def add(
+        self, size: int, case: str, samples: List[float], ops: int = 1, **extra: Any
+    ) -> None:
+        """Add the samples (seconds per run) of a case as milliseconds per operation."""
+        per_op = [sample * 1000 / ops for sample in samples]
+        row = {
+            "size": size,
+            "case": case,
+            "unit": "ms",
+            "runs": len(samples),
+            "ops_per_run": ops,
+            "min": round(min(per_op), 4),
+            "median": round(statistics.median(per_op), 4),
+            "mean": round(statistics.fmean(per_op), 4),
+            "max": round(max(per_op), 4),
+            **extra,
+        }
+        self.rows.append(row)
+        print(
+            f"{size:>7} {case:<36} median {row['median']:>10.3f} ms",
+            file=sys.stderr,
+        )
+
+
+def timed(func: Callable[[], Any]) -> float:
+    """Return the seconds a call takes."""
+    gc.collect()
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+async def timed_async(func: Callable[[], Awaitable[Any]]) -> float:
+    """Return the seconds an awaited call takes."""
+    gc.collect()
+    start = time.perf_counter()
+    await func()
+    return time.perf_counter() - start
+
+
+def bench_portfolio_load(size: int, config_dir: str, repeat: int, results: Results) -> None:
+    """Time loading the stored portfolio (snapshot plus ledger tail)."""
+    samples = [
+        timed(lambda: PortfolioManager(config_dir, None).load()) for _ in range(repeat)
+    ]
+    results.add(size, "portfolio.load", samples)
+
+
+async def bench_portfolio_mutations(
+    size: int, manager: PortfolioManager, repeat: int, rng: random.Random, results: Results
+) -> None:
+    """Time add, update and remove, and the save of the resulting snapshot."""
+    rows = synthetic.lot_rows(OPS, seed=rng.randrange(1 << 30))
+    add, update, remove, save = [], [], [], []
+    for _ in range(repeat):
+        added: List[str] = []
+        add.append(timed(lambda: added.extend(manager.add_entry(**row).id for row in rows)))
+
+        lot_ids = [lot.id for lot in rng.sample(manager.get_entries(), min(OPS, size))]
+        update.append(
+            timed(
+                lambda: [
+                    manager.update_entry(lot_id, purchase_date="2010-06-01")
+                    for lot_id in lot_ids
+                ]
+            )
+        )
+        save.append(await timed_async(manager.async_flush))
+
+        remove.append(timed(lambda: [manager.remove_entry(lot_id) for lot_id in added]))
+        await manager.async_flush()
+
+    results.add(size, "portfolio.add_entry", add, OPS)
+    results.add(size, "portfolio.update_entry", update, min(OPS, size))
+    results.add(size, "portfolio.remove_entry", remove, OPS)
+    results.add(size, "portfolio.save", save, storage_mode=manager.storage_mode)
+
+
+def bench_valuation(
+    size: int, manager: PortfolioManager, repeat: int, rng: random.Random, results: Results
+) -> None:
+    """Time the valuation of the whole portfolio and of single entries."""
+    prices = synthetic.prices_per_gram()
+    results.add(
+        size,
+        "portfolio.calculate_portfolio_value",
+        [timed(lambda: manager.calculate_portfolio_value(prices)) for _ in range(repeat)],
+    )
+    lot_ids = [lot.id for lot in rng.sample(manager.get_entries(), min(OPS, size))]
+    results.add(
+        size,
+        "portfolio.calculate_entry_value",
+        [
+            timed(lambda: [manager.calculate_entry_value(lot_id, prices) for lot_id in lot_ids])
+            for _ in range(repeat)
+        ],
+        len(lot_ids),
+    )
+
+
+async def async_setup_sensors(
+    hass: HomeAssistant, manager: PortfolioManager, entity_mode: str
+) -> ConfigEntry:
+    """Set up the sensor platform like the integration does, without a hub."""
+    hass.states = StateMachine()
+    hass.data.pop("entity_registry", None)
+    usage_store = ApiUsageStore(hass)
+    coordinator = DataUpdateCoordinator(
+        hass, logging.getLogger(__name__), name=DOMAIN, always_update=False
+    )
+    coordinator.data = synthetic.price_data()
+    config_entry = ConfigEntry(
+        ENTRY_ID,
+        DOMAIN,
+        "Benchmark",
+        {"api_key": "benchmark"},
+        {
+            CONF_ENTITY_MODE: entity_mode,
+            # Compact mode keeps a handful of lots as entities
+            "tracked_lots": [lot.id for lot in manager.get_entries()[:5]],
+        },
+    )
+    hass.data[DOMAIN] = {
+        "hub": SimpleNamespace(tick_store=TickStore(hass)),
+        ENTRY_ID: {
+            "coordinator": coordinator,
+            "api_client": SimpleNamespace(
+                scheduler=QuotaScheduler(hass, "benchmark", usage_store)
+            ),
+            "entry": config_entry,
+            "portfolio_manager": manager,
+        },
+    }
+    platform = EntityPlatform(hass, "sensor", ENTRY_ID)
+    await sensor.async_setup_entry(hass, config_entry, platform.async_add_entities)
+    await hass.async_block_till_done()
+    config_entry.platform = platform
+    return config_entry
+
+
+async def async_unload_sensors(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Remove the entities and flush what the platform scheduled."""
+    config_entry.async_unload()
+    for entity in list(config_entry.platform.entities.values()):
+        await entity.async_remove()
+    await hass.data[DOMAIN][ENTRY_ID]["analytics"].async_flush()
+
+
+async def bench_sensors(
+    size: int,
+    hass: HomeAssistant,
+    manager: PortfolioManager,
+    entity_mode: str,
+    repeat: int,
+    results: Results,
+) -> ConfigEntry:
+    """Time platform setup and coordinator updates across all entities."""
+    start = time.perf_counter()
+    config_entry = await async_setup_sensors(hass, manager, entity_mode)
+    setup = time.perf_counter() - start
+    entities = len(config_entry.platform.entities)
+    results.add(size, f"sensor.setup.{entity_mode}", [setup], entities=entities)
+
+    coordinator = hass.data[DOMAIN][ENTRY_ID]["coordinator"]
+    for case, changed in (("refresh", True), ("refresh_unchanged", False)):
+        samples, writes = [], []
+        for run in range(repeat):
+            # A new price moves every value; an equal one should write nothing
+            data = synthetic.price_data(1 + (run + 1) * 0.001 if changed else 1.0)
+            if not changed:
+                coordinator.async_set_updated_data(data)
+            before = hass.states.writes
+            samples.append(timed(lambda: coordinator.async_set_updated_data(dict(data))))
+            writes.append(hass.states.writes - before)
+        results.add(
+            size,
+            f"sensor.{case}.{entity_mode}",
+            samples,
+            entities=entities,
+            state_writes=max(writes),
+        )
+    return config_entry
+
+
+async def bench_services(
+    size: int, hass: HomeAssistant, manager: PortfolioManager, repeat: int,
+    rng: random.Random, results: Results,
+) -> None:
+    """Time service calls through schema validation and the handlers."""
+
+    async def call(service: str, data: Dict[str, Any], response: bool = False) -> Any:
+        return await hass.services.async_call(
+            DOMAIN, service, {"entry_id": ENTRY_ID, **data}, return_response=response
+        )
+
+    async def run(case: str, calls: Callable[[], List[Awaitable[Any]]], ops: int) -> None:
+        samples = []
+        for _ in range(repeat):
+            pending = calls()
+            gc.collect()
+            start = time.perf_counter()
+            for coro in pending:
+                await coro
+            await hass.async_block_till_done()
+            samples.append(time.perf_counter() - start)
+        results.add(size, f"service.{case}", samples, ops)
+
+    rows = synthetic.lot_rows(SERVICE_OPS, seed=rng.randrange(1 << 30))
+    await run(
+        "add_portfolio_entry",
+        lambda: [call("add_portfolio_entry", row) for row in rows],
+        SERVICE_OPS,
+    )
+    await run(
+        "update_portfolio_entry",
+        lambda: [
+            call("update_portfolio_entry", {"portfolio_entry_id": lot.id, "purchase_date": "2011-01-01"})
+            for lot in rng.sample(manager.get_entries(), min(SERVICE_OPS, size))
+        ],
+        min(SERVICE_OPS, size),
+    )
+    await run(
+        "sell_portfolio_entries",
+        lambda: [
+            call("sell_portfolio_entries", {"amount_grams": 0.01, "proceeds_eur": 1.0}, True)
+            for _ in range(SERVICE_OPS)
+        ],
+        SERVICE_OPS,
+    )
+    await run(
+        "remove_portfolio_entry",
+        lambda: [
+            call("remove_portfolio_entry", {"portfolio_entry_id": lot.id})
+            for lot in manager.get_entries()[-SERVICE_OPS:]
+        ],
+        SERVICE_OPS,
+    )
+    await run(
+        "get_portfolio_values",
+        lambda: [call("get_portfolio_values", {"offset": 0, "limit": 100}, True)],
+        1,
+    )
+    await run(
+        "get_portfolio_entries",
+        lambda: [call("get_portfolio_entries", {}, True)],
+        1,
+    )
+    await manager.async_flush()
+
+
+async def bench_size(
+    size: int, repeat: int, seed: int, per_lot_max: int, results: Results
+) -> None:
+    """Run all cases for one portfolio size."""
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory(prefix="gold_portfolio_bench_") as config_dir:
+        # Without hass the manager writes synchronously: the stored portfolio
+        seeded = PortfolioManager(config_dir, None)
+        seeded.load()
+        seeded.add_entries(synthetic.lot_rows(size, seed))
+        del seeded
+
+        bench_portfolio_load(size, config_dir, repeat, results)
+
+        hass = HomeAssistant(config_dir)
+        manager = PortfolioManager(config_dir, hass)
+        await manager.async_load()
+        await bench_portfolio_mutations(size, manager, repeat, rng, results)
+        bench_valuation(size, manager, repeat, rng, results)
+
+        if size <= per_lot_max:
+            config_entry = await bench_sensors(
+                size, hass, manager, ENTITY_MODE_PER_LOT, repeat, results
+            )
+            await async_unload_sensors(hass, config_entry)
+        config_entry = await bench_sensors(
+            size, hass, manager, ENTITY_MODE_COMPACT, repeat, results
+        )
+        await services.async_setup_services(hass)
+        await bench_services(size, hass, manager, repeat, rng, results)
+        await async_unload_sensors(hass, config_entry)
+        await manager.async_flush()
+        await hass.async_block_till_done()
+
+
+def _git_revision() -> Optional[str]:
+    """Return the checked out commit, if any."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    """Parse arguments, run the benchmarks and write the JSON report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--per-lot-max",
+        type=int,
+        default=10000,
+        help="largest size that also runs the sensors in per-lot entity mode",
+    )
+    parser.add_argument("--output", type=Path, help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = Results()
+    started = time.perf_counter()
+    for size in args.sizes:
+        asyncio.run(bench_size(size, args.repeat, args.seed, args.per_lot_max, results))
+
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": numpy_available(),
+            "sizes": args.sizes,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "seconds": round(time.perf_counter() - started, 1),
+        },
+        "results": results.rows,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
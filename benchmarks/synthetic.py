@@ -0,0 +1,59 @@
+"""Deterministic synthetic portfolios and price tables for the benchmarks."""
+import random
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+from custom_components.gold_portfolio.const import TROY_OZ_TO_GRAM
+
+# Metal mix of a typical portfolio and rough EUR prices per troy ounce
+METAL_WEIGHTS = {"XAU": 0.7, "XAG": 0.2, "XPT": 0.05, "XPD": 0.05}
+PRICES_PER_OZ = {"XAU": 2200.0, "XAG": 26.0, "XPT": 900.0, "XPD": 1000.0}
+
+FIRST_PURCHASE = date(2000, 1, 1)
+PURCHASE_DAYS = (date(2025, 12, 31) - FIRST_PURCHASE).days
+
+
+def lot_rows(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Return `count` purchases in the row format of `PortfolioManager.add_entries`."""
+    rng = random.Random(seed)
+    metals = list(METAL_WEIGHTS)
+    weights = list(METAL_WEIGHTS.values())
+    rows = []
+    for _ in range(count):
+        metal = rng.choices(metals, weights)[0]
+        grams = round(rng.choice((1.0, 5.0, 10.0, 31.1, 50.0, 100.0, 250.0, 1000.0)), 2)
+        # Buy prices scatter around today's price so lots end up in gain and in loss
+        per_gram = PRICES_PER_OZ[metal] / TROY_OZ_TO_GRAM * rng.uniform(0.4, 1.3)
+        rows.append(
+            {
+                "purchase_date": (
+                    FIRST_PURCHASE + timedelta(days=rng.randrange(PURCHASE_DAYS))
+                ).isoformat(),
+                "amount_grams": grams,
+                "purchase_price_eur": round(grams * per_gram, 2),
+                "metal": metal,
+            }
+        )
+    return rows
+
+
+def price_data(factor: float = 1.0, timestamp: int = 0) -> Dict[str, Any]:
+    """Return coordinator data for all metals, scaled by `factor`."""
+    timestamp = timestamp or int(time.time())
+    prices = {
+        f"{metal}/EUR": {
+            "price": round(price * factor, 2),
+            "timestamp": timestamp,
+            "currency": "EUR",
+        }
+        for metal, price in PRICES_PER_OZ.items()
+    }
+    return {**prices["XAU/EUR"], "prices": prices}
+
+
+def prices_per_gram(factor: float = 1.0) -> Dict[str, float]:
+    """Return metal -> EUR per gram, scaled by `factor`."""
+    return {
+        metal: price * factor / TROY_OZ_TO_GRAM for metal, price in PRICES_PER_OZ.items()
+    }
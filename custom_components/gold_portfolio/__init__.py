@@ -2,18 +2,36 @@
 import asyncio
 import logging
 from datetime import timedelta
+from typing import Callable, List
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-
-from .api import GoldAPIClient
-from .const import DOMAIN, UPDATE_INTERVAL_DEFAULT
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    API_MONTHLY_QUOTA_DEFAULT,
+    CONF_COST_BASIS,
+    CONF_MAX_STALENESS,
+    CONF_MONTHLY_QUOTA,
+    CONF_REQUEST_TIMEOUT,
+    CONF_STORAGE_MODE,
+    CONF_SYMBOLS,
+    COST_BASIS_FIFO,
+    DEFAULT_SYMBOL,
+    DOMAIN,
+    MAX_STALENESS_DEFAULT,
+    PORTFOLIO_CURRENCY,
+    REQUEST_TIMEOUT_DEFAULT,
+    STORAGE_MODE_SNAPSHOT,
+    UPDATE_INTERVAL_DEFAULT,
+)
+from .hub import PriceFeed, PriceHub, PriceSubscription, async_get_hub
+from .portfolio import PortfolioManager, migrate_legacy_files
+from .price_cache import HistoricalPriceCache
 from .services import async_setup_services
-
-# Pre-load sensor module to avoid blocking import warning
-from . import sensor as _sensor_module  # noqa: F401
+from .timing import PhaseTimer
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,39 +39,78 @@ PLATFORMS: list[Platform] = [Platform.SENSOR]
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up Gold Portfolio from a config entry."""
+    """Set up Gold Portfolio from a config entry.
+
+    Nothing here waits for goldapi.io: sensors start from the persisted
+    portfolio and the last stored price (flagged stale), which is
+    revalidated in the background once it is older than the maximum
+    staleness.
+    """
+    timer = PhaseTimer(_LOGGER, f"Setup of {entry.title}")
     hass.data.setdefault(DOMAIN, {})
+    if "price_cache" not in hass.data[DOMAIN]:
+        hass.data[DOMAIN]["price_cache"] = HistoricalPriceCache(hass)
+    hub: PriceHub = await async_get_hub(hass)
+    timer.mark("hub")
+
+    # The portfolio saved before files were kept per entry belongs to the
+    # oldest entry
+    if entry.entry_id == hass.config_entries.async_entries(DOMAIN)[0].entry_id:
+        await hass.async_add_executor_job(
+            migrate_legacy_files, hass.config.path(), entry.entry_id
+        )
+    portfolio_manager = PortfolioManager(
+        hass.config.path(),
+        hass,
+        cost_basis=entry.options.get(CONF_COST_BASIS, COST_BASIS_FIFO),
+        storage_mode=entry.options.get(CONF_STORAGE_MODE, STORAGE_MODE_SNAPSHOT),
+        entry_id=entry.entry_id,
+    )
+    try:
+        await portfolio_manager.async_load()
+    except Exception as err:
+        # Retried later; the files are left as they are for inspection
+        raise ConfigEntryNotReady(f"Portfolio could not be loaded: {err}") from err
+    timer.mark(f"portfolio ({portfolio_manager.get_entry_count()} lots)")
 
     api_key = entry.data.get("api_key")
-    update_interval = entry.options.get("update_interval", UPDATE_INTERVAL_DEFAULT)
 
-    api_client = GoldAPIClient(api_key)
+    def entry_symbols() -> list[str]:
+        """Return the symbols to fetch: gold, configured pairs and held metals."""
+        symbols = [DEFAULT_SYMBOL, *entry.options.get(CONF_SYMBOLS, [])]
+        symbols.extend(
+            f"{metal}/{PORTFOLIO_CURRENCY}" for metal in portfolio_manager.get_metals()
+        )
+        return list(dict.fromkeys(symbols))
 
-    async def async_update_data():
-        """Fetch data from Gold API."""
-        try:
-            return await api_client.get_gold_price()
-        except Exception as err:
-            _LOGGER.error("Error updating gold price: %s", err)
-            raise UpdateFailed(f"Error communicating with Gold API: {err}")
-
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name=DOMAIN,
-        update_method=async_update_data,
-        update_interval=timedelta(hours=24 // update_interval),
-    )
-
-    await coordinator.async_config_entry_first_refresh()
+    # Entries with the same API key share one client and coordinator
+    subscription = _subscription(entry, entry_symbols)
+    feed = await hub.async_subscribe(entry.entry_id, api_key, subscription)
 
     hass.data[DOMAIN][entry.entry_id] = {
-        "coordinator": coordinator,
-        "api_client": api_client,
+        "coordinator": feed.coordinator,
+        "api_client": feed.api_client,
+        "api_key": api_key,
         "entry": entry,
+        "portfolio_manager": portfolio_manager,
+        "subscription": subscription,
     }
 
+    @callback
+    def revalidate(_now=None) -> None:
+        """Refresh in the background; entries set up together share the request."""
+        _async_refresh_in_background(hass, entry, feed)
+
+    delay = feed.refresh_delay(subscription)
+    if delay == 0:
+        revalidate()
+    elif delay is not None:
+        _LOGGER.debug("Serving stored gold price, revalidating in %.0f s", delay)
+        entry.async_on_unload(async_call_later(hass, delay, revalidate))
+    timer.mark("price feed")
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    timer.mark("platforms")
 
     # Setup services once
     if not hass.data[DOMAIN].get("services_registered"):
@@ -61,6 +118,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.data[DOMAIN]["services_registered"] = True
 
     entry.async_on_unload(entry.add_update_listener(async_update_listener))
+    timer.mark("services")
+    timer.log()
 
     return True
 
@@ -68,11 +127,77 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+        if portfolio_manager := entry_data.get("portfolio_manager"):
+            await portfolio_manager.async_flush()
+        if analytics := entry_data.get("analytics"):
+            await analytics.async_flush()
+        await hass.data[DOMAIN]["hub"].async_unsubscribe(entry.entry_id)
+        await hass.data[DOMAIN]["price_cache"].async_flush()
 
     return unload_ok
 
 
+def _subscription(
+    entry: ConfigEntry, symbols: Callable[[], List[str]]
+) -> PriceSubscription:
+    """Return the price subscription for the entry's current options."""
+    options = entry.options
+    return PriceSubscription(
+        symbols,
+        timedelta(hours=24 // options.get("update_interval", UPDATE_INTERVAL_DEFAULT)),
+        options.get(CONF_REQUEST_TIMEOUT, REQUEST_TIMEOUT_DEFAULT),
+        options.get(CONF_MONTHLY_QUOTA, API_MONTHLY_QUOTA_DEFAULT),
+        timedelta(hours=options.get(CONF_MAX_STALENESS, MAX_STALENESS_DEFAULT)),
+    )
+
+
+@callback
+def _async_refresh_in_background(
+    hass: HomeAssistant, entry: ConfigEntry, feed: PriceFeed
+) -> None:
+    """Request a debounced refresh without blocking the caller."""
+    entry.async_create_background_task(
+        hass,
+        feed.coordinator.async_request_refresh(),
+        f"{DOMAIN} revalidate {entry.entry_id}",
+    )
+
+
 async def async_update_listener(hass: HomeAssistant, config_entry: ConfigEntry):
-    """Listen for option updates."""
-    await hass.config_entries.async_reload(config_entry.entry_id)
+    """Apply option updates in place; only a new API key needs a reload.
+
+    The feed is retimed, the portfolio and sensors are reconfigured, and
+    caches, prices and in-memory state stay. A fetch only happens when a
+    newly needed symbol has no price yet.
+    """
+    entry_data = hass.data[DOMAIN].get(config_entry.entry_id)
+    if entry_data is None or config_entry.data.get("api_key") != entry_data["api_key"]:
+        await hass.config_entries.async_reload(config_entry.entry_id)
+        return
+
+    timer = PhaseTimer(_LOGGER, f"Options update of {config_entry.title}")
+    options = config_entry.options
+    portfolio_manager: PortfolioManager = entry_data["portfolio_manager"]
+    portfolio_manager.cost_basis = options.get(CONF_COST_BASIS, COST_BASIS_FIFO)
+    portfolio_manager.set_storage_mode(
+        options.get(CONF_STORAGE_MODE, STORAGE_MODE_SNAPSHOT)
+    )
+
+    subscription = _subscription(config_entry, entry_data["subscription"].symbols)
+    entry_data["subscription"] = subscription
+    hub: PriceHub = hass.data[DOMAIN]["hub"]
+    feed = await hub.async_subscribe(
+        config_entry.entry_id, entry_data["api_key"], subscription
+    )
+    if feed.refresh_delay(subscription) == 0:
+        _async_refresh_in_background(hass, config_entry, feed)
+    timer.mark("price feed")
+
+    if "entity_manager" in entry_data:
+        # Imported here so setup doesn't load the platform early
+        from .sensor import async_apply_options
+
+        await async_apply_options(hass, config_entry)
+        timer.mark("sensors")
+    timer.log()
@@ -0,0 +1,315 @@
+"""Incrementally maintained price indicators for Gold Portfolio Tracker."""
+import logging
+import math
+from collections import deque
+from datetime import date
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ANALYTICS_FILE,
+    EMA_WINDOW_DEFAULT,
+    RANGE_WINDOW_DEFAULT,
+    SMA_WINDOW_DEFAULT,
+    VOLATILITY_WINDOW_DEFAULT,
+)
+from .storage import DelayedJSONWriter, load_json_file
+from .tick_store import TickStore, period_keys
+
+_LOGGER = logging.getLogger(__name__)
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+class RollingSum:
+    """Last `size` values with their running sum and sum of squares."""
+
+    def __init__(self, size: int, values: Optional[List[float]] = None) -> None:
+        """Initialize the window."""
+        self.size = size
+        self.values: Deque[float] = deque()
+        self.total = 0.0
+        self.total_squares = 0.0
+        for value in values or []:
+            self.push(value)
+
+    def push(self, value: float) -> None:
+        """Add a value, dropping the oldest one if the window is full."""
+        if self.size <= 0:
+            return
+        if len(self.values) == self.size:
+            old = self.values.popleft()
+            self.total -= old
+            self.total_squares -= old * old
+        self.values.append(value)
+        self.total += value
+        self.total_squares += value * value
+
+
+class MonotonicExtreme:
+    """Maximum (or minimum) of the values of the last `size` days.
+
+    Keeps (day ordinal, value) pairs with monotonic values, so each value is
+    pushed and popped at most once.
+    """
+
+    def __init__(self, size: int, highest: bool, items: Optional[List[List[float]]] = None) -> None:
+        """Initialize the window."""
+        self.size = size
+        self.highest = highest
+        self.items: Deque[Tuple[int, float]] = deque()
+        for day, value in items or []:
+            self.push(int(day), value)
+
+    def _dominates(self, new: float, old: float) -> bool:
+        """Return True if new makes old irrelevant."""
+        return new >= old if self.highest else new <= old
+
+    def push(self, day: int, value: float) -> None:
+        """Add the value of a day."""
+        while self.items and self._dominates(value, self.items[-1][1]):
+            self.items.pop()
+        self.items.append((day, value))
+        self.evict(day)
+
+    def evict(self, today: int) -> None:
+        """Drop values older than the window, as seen from today."""
+        while self.items and self.items[0][0] <= today - self.size:
+            self.items.popleft()
+
+    @property
+    def value(self) -> Optional[float]:
+        """Return the extreme of the window."""
+        return self.items[0][1] if self.items else None
+
+
+class DailyIndicators:
+    """SMA, EMA, volatility, max drawdown and high/low over daily closes.
+
+    Completed days are committed into the running structures once. Ticks
+    within the current day only replace its provisional close, which each
+    indicator combines with the committed state in O(1).
+    """
+
+    def __init__(
+        self,
+        sma_window: int = SMA_WINDOW_DEFAULT,
+        ema_window: int = EMA_WINDOW_DEFAULT,
+        volatility_window: int = VOLATILITY_WINDOW_DEFAULT,
+        range_window: int = RANGE_WINDOW_DEFAULT,
+    ) -> None:
+        """Initialize empty indicators."""
+        self.windows = [sma_window, ema_window, volatility_window, range_window]
+        self.day: Optional[int] = None
+        self.close: Optional[float] = None
+        self.previous_close: Optional[float] = None
+        self.ema: Optional[float] = None
+        self.peak: Optional[float] = None
+        self.max_drawdown = 0.0
+        self._closes = RollingSum(sma_window - 1)
+        self._returns = RollingSum(volatility_window - 1)
+        self._high = MonotonicExtreme(range_window, True)
+        self._low = MonotonicExtreme(range_window, False)
+
+    def _commit(self) -> None:
+        """Fold the current day's close into the committed state."""
+        close = self.close
+        self._closes.push(close)
+        alpha = 2 / (self.windows[1] + 1)
+        self.ema = close if self.ema is None else alpha * close + (1 - alpha) * self.ema
+        if self.previous_close:
+            self._returns.push(math.log(close / self.previous_close))
+        self._high.push(self.day, close)
+        self._low.push(self.day, close)
+        self.peak = close if self.peak is None else max(self.peak, close)
+        self.max_drawdown = max(self.max_drawdown, (self.peak - close) / self.peak)
+        self.previous_close = close
+
+    def update(self, day: int, price: float) -> bool:
+        """Apply a price of a day (ordinal); returns False for past days."""
+        if price <= 0 or (self.day is not None and day < self.day):
+            return False
+        if self.day is not None and day > self.day:
+            self._commit()
+        self.day = day
+        self.close = price
+        return True
+
+    def values(self) -> Dict[str, Optional[float]]:
+        """Return the indicators including the current day."""
+        close = self.close
+        if close is None:
+            return dict.fromkeys(
+                ("sma", "ema", "volatility", "max_drawdown", "range_high", "range_low")
+            )
+
+        sma = (self._closes.total + close) / (len(self._closes.values) + 1)
+
+        alpha = 2 / (self.windows[1] + 1)
+        ema = close if self.ema is None else alpha * close + (1 - alpha) * self.ema
+
+        volatility = None
+        returns = self._returns
+        count = len(returns.values)
+        total, squares = returns.total, returns.total_squares
+        if self.previous_close:
+            current = math.log(close / self.previous_close)
+            count += 1
+            total += current
+            squares += current * current
+        if count >= 2:
+            variance = max(0.0, (squares - total * total / count) / (count - 1))
+            volatility = math.sqrt(variance * TRADING_DAYS_PER_YEAR) * 100
+
+        peak = close if self.peak is None else max(self.peak, close)
+        drawdown = max(self.max_drawdown, (peak - close) / peak)
+
+        self._high.evict(self.day)
+        self._low.evict(self.day)
+        high = self._high.value
+        low = self._low.value
+
+        return {
+            "sma": round(sma, 2),
+            "ema": round(ema, 2),
+            "volatility": round(volatility, 2) if volatility is not None else None,
+            "max_drawdown": round(drawdown * 100, 2),
+            "range_high": round(close if high is None else max(high, close), 2),
+            "range_low": round(close if low is None else min(low, close), 2),
+        }
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the state for persistence."""
+        return {
+            "windows": list(self.windows),
+            "day": self.day,
+            "close": self.close,
+            "previous_close": self.previous_close,
+            "ema": self.ema,
+            "peak": self.peak,
+            "max_drawdown": self.max_drawdown,
+            "closes": list(self._closes.values),
+            "returns": list(self._returns.values),
+            "high": [list(item) for item in self._high.items],
+            "low": [list(item) for item in self._low.items],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DailyIndicators":
+        """Restore persisted state."""
+        indicators = cls(*data["windows"])
+        indicators.day = data["day"]
+        indicators.close = data["close"]
+        indicators.previous_close = data["previous_close"]
+        indicators.ema = data["ema"]
+        indicators.peak = data["peak"]
+        indicators.max_drawdown = data["max_drawdown"]
+        indicators._closes = RollingSum(indicators.windows[0] - 1, data["closes"])
+        indicators._returns = RollingSum(indicators.windows[2] - 1, data["returns"])
+        indicators._high = MonotonicExtreme(indicators.windows[3], True, data["high"])
+        indicators._low = MonotonicExtreme(indicators.windows[3], False, data["low"])
+        return indicators
+
+
+def _day_ordinal(timestamp: Any) -> int:
+    """Return the local day ordinal of a quote timestamp (now if missing)."""
+    if not timestamp:
+        return dt_util.now().date().toordinal()
+    return date.fromisoformat(period_keys(float(timestamp))[0]).toordinal()
+
+
+class PriceAnalytics:
+    """Indicators of one symbol for a config entry, fed by the coordinator.
+
+    State is persisted in `.storage`. When it is missing or was computed with
+    other window lengths, it is rebuilt from the daily closes of the tick
+    store.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: DataUpdateCoordinator,
+        tick_store: TickStore,
+        entry_id: str,
+        symbol: str,
+        windows: List[int],
+    ) -> None:
+        """Initialize the analytics."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.symbol = symbol
+        self.indicators = DailyIndicators(*windows)
+        self._tick_store = tick_store
+        self._writer = DelayedJSONWriter(
+            hass,
+            Path(hass.config.path(".storage", ANALYTICS_FILE.format(entry_id=entry_id))),
+            self._data_to_save,
+        )
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return the state for the writer."""
+        return {"symbol": self.symbol, "indicators": self.indicators.as_dict()}
+
+    async def async_load(self) -> None:
+        """Restore persisted state or rebuild it from recorded ticks."""
+        try:
+            data = await self.hass.async_add_executor_job(
+                load_json_file, self._writer.path, {}
+            )
+            state = data.get("indicators") if data.get("symbol") == self.symbol else None
+            if state and state.get("windows") == self.indicators.windows:
+                self.indicators = DailyIndicators.from_dict(state)
+                return
+        except Exception as err:
+            _LOGGER.error("Error loading price analytics: %s", err)
+
+        await self._async_rebuild(self.indicators.windows)
+
+    async def async_set_windows(self, windows: List[int]) -> None:
+        """Rebuild the indicators if the window lengths changed."""
+        if windows == self.indicators.windows:
+            return
+        await self._async_rebuild(windows)
+        self._handle_update()
+
+    async def _async_rebuild(self, windows: List[int]) -> None:
+        """Recompute the indicators from the recorded daily closes."""
+        self.indicators = DailyIndicators(*windows)
+        ohlc = await self._tick_store.async_ohlc(
+            self.symbol, "day", 0, dt_util.utcnow().timestamp()
+        )
+        for day, close in zip(ohlc["periods"], ohlc["close"]):
+            self.indicators.update(date.fromisoformat(day).toordinal(), close)
+        _LOGGER.debug(
+            "Rebuilt %s analytics from %d daily closes", self.symbol, len(ohlc["periods"])
+        )
+        self._writer.async_schedule()
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Apply the current price and follow coordinator updates."""
+        self._handle_update()
+        return self.coordinator.async_add_listener(self._handle_update)
+
+    @callback
+    def _handle_update(self) -> None:
+        """Apply the latest quote of the symbol."""
+        data = self.coordinator.data
+        quote = (data or {}).get("prices", {}).get(self.symbol)
+        if not self.coordinator.last_update_success or not quote:
+            return
+        if self.indicators.update(_day_ordinal(quote.get("timestamp")), quote["price"]):
+            self._writer.async_schedule()
+
+    def values(self) -> Dict[str, Optional[float]]:
+        """Return the current indicator values."""
+        return self.indicators.values()
+
+    async def async_flush(self) -> None:
+        """Write pending state now."""
+        await self._writer.async_flush()
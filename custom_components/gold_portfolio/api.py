@@ -1,58 +1,203 @@
 """Gold API client for fetching gold prices."""
 import asyncio
 import logging
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Iterable, Optional, TypeVar
 
 import aiohttp
 
-from .const import GOLD_API_BASE_URL, GOLD_PRICE_ENDPOINT
+from .const import (
+    DEFAULT_SYMBOL,
+    GOLD_API_BASE_URL,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_LIVE,
+    REQUEST_TIMEOUT_DEFAULT,
+)
+
+if TYPE_CHECKING:
+    from .scheduler import QuotaScheduler
 
 _LOGGER = logging.getLogger(__name__)
 
+# Pool settings for the client's own session (when HA's is not passed in)
+CONNECTION_LIMIT = 10
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 60
+
+_T = TypeVar("_T")
+
+
+class RateLimitError(ValueError):
+    """Raised when the Gold API answers with HTTP 429."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None) -> None:
+        """Initialize with the server's Retry-After in seconds, if any."""
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
 
 class GoldAPIClient:
-    """Client for interacting with Gold API."""
+    """Client for interacting with Gold API.
+
+    Pass Home Assistant's shared session (`async_get_clientsession`) to reuse
+    its pooled connections. Without one the client lazily creates its own
+    pooled, keep-alive session, which `async_close` releases.
+
+    With a `scheduler` every request waits for its admission, so all calls
+    made with one API key share its quota and rate limit. `base_url` points
+    the client at another server, such as the local stand-in used by the
+    benchmarks.
+    """
 
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        session: Optional[aiohttp.ClientSession] = None,
+        timeout: float = REQUEST_TIMEOUT_DEFAULT,
+        scheduler: Optional["QuotaScheduler"] = None,
+        base_url: str = GOLD_API_BASE_URL,
+    ):
         """Initialize the Gold API client."""
         self.api_key = api_key
-        self.base_url = GOLD_API_BASE_URL
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.scheduler = scheduler
+        self._session = session
+        self._owns_session = session is None
 
-    async def get_gold_price(self) -> dict:
-        """Get current gold price in EUR."""
-        url = f"{self.base_url}{GOLD_PRICE_ENDPOINT}"
-        headers = {
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating a pooled one if needed."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=CONNECTION_LIMIT,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._owns_session = True
+        return self._session
+
+    async def async_close(self) -> None:
+        """Close the session if this client created it."""
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _headers(self) -> dict:
+        """Return the request headers."""
+        return {
             "x-access-token": self.api_key,
             "Content-Type": "application/json"
         }
 
+    def _timeout(self, timeout: Optional[float]) -> aiohttp.ClientTimeout:
+        """Return the timeout for a request."""
+        return aiohttp.ClientTimeout(total=timeout if timeout is not None else self.timeout)
+
+    async def _schedule(
+        self, priority: int, request: Callable[[], Awaitable[_T]]
+    ) -> _T:
+        """Run a request through the scheduler, if there is one."""
+        if self.scheduler is None:
+            return await request()
+        return await self.scheduler.async_call(priority, request)
+
+    async def get_gold_price(
+        self, timeout: Optional[float] = None, priority: int = PRIORITY_LIVE
+    ) -> dict:
+        """Get current gold price in EUR."""
+        return await self.get_price(DEFAULT_SYMBOL, timeout=timeout, priority=priority)
+
+    async def get_prices(
+        self,
+        symbols: Iterable[str],
+        timeout: Optional[float] = None,
+        priority: int = PRIORITY_LIVE,
+    ) -> Dict[str, dict]:
+        """Get current prices for several symbols concurrently.
+
+        Symbols that fail are logged and left out; raises only if all fail.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        results = await asyncio.gather(
+            *(
+                self.get_price(symbol, timeout=timeout, priority=priority)
+                for symbol in symbols
+            ),
+            return_exceptions=True,
+        )
+        prices = {}
+        error: Optional[BaseException] = None
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, BaseException):
+                _LOGGER.warning("Could not fetch price for %s: %s", symbol, result)
+                error = result
+            else:
+                prices[symbol] = result
+        if not prices and error is not None:
+            raise error
+        return prices
+
+    async def get_price(
+        self,
+        symbol: str,
+        timeout: Optional[float] = None,
+        priority: int = PRIORITY_LIVE,
+    ) -> dict:
+        """Get the current price of a METAL/CURRENCY symbol per troy ounce."""
+        return await self._schedule(priority, lambda: self._get_price(symbol, timeout))
+
+    async def _get_price(self, symbol: str, timeout: Optional[float]) -> dict:
+        """Request the current price of a symbol."""
+        url = f"{self.base_url}/{symbol}"
+
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as resp:
-                    _LOGGER.debug(f"Gold API Response Status: {resp.status}")
-                    
-                    if resp.status == 200:
-                        data = await resp.json()
-                        _LOGGER.debug(f"Gold API Response: {data}")
-                        return {
-                            "price": float(data.get("price", 0)),
-                            "timestamp": data.get("timestamp"),
-                            "currency": data.get("currency", "EUR"),
-                        }
-                    elif resp.status == 401:
-                        _LOGGER.error("API Key authentication failed (401)")
-                        raise ValueError("Invalid API Key - Authentication failed")
-                    elif resp.status == 403:
-                        _LOGGER.error("API Key forbidden (403)")
-                        raise ValueError("Invalid API Key - Access forbidden")
-                    elif resp.status == 429:
-                        _LOGGER.error("API rate limit exceeded (429)")
-                        raise ValueError("Rate limit exceeded - wait before retrying")
-                    else:
-                        response_text = await resp.text()
-                        _LOGGER.error(f"API request failed with status {resp.status}: {response_text}")
-                        raise Exception(f"API error: {resp.status}")
+            session = self._get_session()
+            async with session.get(url, headers=self._headers(), timeout=self._timeout(timeout)) as resp:
+                _LOGGER.debug(f"Gold API Response Status: {resp.status}")
+
+                if resp.status == 200:
+                    data = await resp.json()
+                    _LOGGER.debug(f"Gold API Response: {data}")
+                    return {
+                        "price": float(data.get("price", 0)),
+                        "timestamp": data.get("timestamp"),
+                        "currency": data.get("currency", symbol.partition("/")[2]),
+                    }
+                elif resp.status == 401:
+                    _LOGGER.error("API Key authentication failed (401)")
+                    raise ValueError("Invalid API Key - Authentication failed")
+                elif resp.status == 403:
+                    _LOGGER.error("API Key forbidden (403)")
+                    raise ValueError("Invalid API Key - Access forbidden")
+                elif resp.status == 429:
+                    _LOGGER.error("API rate limit exceeded (429)")
+                    raise RateLimitError(
+                        "Rate limit exceeded - wait before retrying",
+                        parse_retry_after(resp.headers.get("Retry-After")),
+                    )
+                else:
+                    response_text = await resp.text()
+                    _LOGGER.error(f"API request failed with status {resp.status}: {response_text}")
+                    raise Exception(f"API error: {resp.status}")
         except asyncio.TimeoutError:
             _LOGGER.error("API request timeout")
             raise ValueError("Gold API request timeout - check your internet connection")
@@ -60,25 +205,44 @@ class GoldAPIClient:
             _LOGGER.error(f"API client error: {err}")
             raise ValueError(f"Connection error: {err}")
 
-    async def get_historical_price(self, date: str) -> Optional[float]:
-        """Get historical gold price for a specific date (format: YYYY-MM-DD)."""
-        url = f"{self.base_url}{GOLD_PRICE_ENDPOINT}?date={date}"
-        headers = {
-            "x-access-token": self.api_key,
-            "Content-Type": "application/json"
-        }
+    async def get_historical_price(
+        self,
+        date: str,
+        timeout: Optional[float] = None,
+        symbol: str = DEFAULT_SYMBOL,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> Optional[float]:
+        """Get historical price for a specific date (format: YYYY-MM-DD)."""
+        return await self._schedule(
+            priority, lambda: self._get_historical_price(date, timeout, symbol)
+        )
+
+    async def _get_historical_price(
+        self, date: str, timeout: Optional[float], symbol: str
+    ) -> Optional[float]:
+        """Request the price of a symbol on a date."""
+        url = f"{self.base_url}/{symbol}?date={date}"
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        return float(data.get("price"))
-                    else:
-                        _LOGGER.warning(
-                            "Could not fetch historical price for %s: %s", date, resp.status
-                        )
-                        return None
+            session = self._get_session()
+            async with session.get(url, headers=self._headers(), timeout=self._timeout(timeout)) as resp:
+                if resp.status == 200:
+                    data = await resp.json()
+                    return float(data.get("price"))
+                elif resp.status == 429:
+                    # Let the scheduler back off and batch callers stop
+                    raise RateLimitError(
+                        "Rate limit exceeded - wait before retrying",
+                        parse_retry_after(resp.headers.get("Retry-After")),
+                    )
+                else:
+                    _LOGGER.warning(
+                        "Could not fetch historical price for %s: %s", date, resp.status
+                    )
+                    return None
+        except RateLimitError:
+            _LOGGER.warning("Rate limit exceeded fetching historical price for %s", date)
+            raise
         except Exception as err:
             _LOGGER.warning("Error fetching historical price for %s: %s", date, err)
             return None
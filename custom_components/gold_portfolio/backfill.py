@@ -0,0 +1,301 @@
+"""Backfill of daily portfolio history into long-term statistics."""
+import logging
+import time
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DEFAULT_METAL,
+    DOMAIN,
+    EVENT_BACKFILL_PROGRESS,
+    PORTFOLIO_CURRENCY,
+    TROY_OZ_TO_GRAM,
+)
+from .ledger import EVENT_ADJUST, EVENT_BUY, EVENT_SELL, GRAMS_EPSILON
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy ships with Home Assistant
+    np = None
+
+_LOGGER = logging.getLogger(__name__)
+
+SERIES = ("value", "invested", "gain")
+SERIES_NAMES = {
+    "value": "Portfolio Value",
+    "invested": "Portfolio Invested",
+    "gain": "Portfolio Gain",
+}
+
+# (day ordinal, grams, cost, metal) per purchase, negative per sale
+LotRow = Tuple[int, float, float, str]
+
+
+def statistic_id(entry_id: str, series: str) -> str:
+    """Return the external statistic id of a series."""
+    return f"{DOMAIN}:portfolio_{series}_{entry_id.lower()}"
+
+
+def forward_fill(prices: "np.ndarray") -> "np.ndarray":
+    """Carry the last known price forward over NaN gaps (leading NaNs stay)."""
+    index = np.where(~np.isnan(prices), np.arange(len(prices)), 0)
+    np.maximum.accumulate(index, out=index)
+    return prices[index]
+
+
+def compute_daily_series(
+    lots: Sequence[LotRow],
+    first_day: int,
+    last_day: int,
+    prices: Dict[str, Dict[int, float]],
+) -> Dict[str, "np.ndarray"]:
+    """Return value, invested and gain per day from first_day to last_day.
+
+    Holdings per day are a cumulative sum of the grams bought and sold on
+    each day (one bincount per metal), so the cost is O(rows + days x metals)
+    with no per-lot loop over days. Rows before first_day count from its
+    start, rows after last_day not at all. Prices are per gram, keyed by day
+    ordinal, and forward-filled; days before a held metal's first price are
+    NaN.
+    """
+    days = last_day - first_day + 1
+    ordinals = np.fromiter((lot[0] for lot in lots), dtype=np.int64, count=len(lots))
+    grams = np.fromiter((lot[1] for lot in lots), dtype=np.float64, count=len(lots))
+    cost = np.fromiter((lot[2] for lot in lots), dtype=np.float64, count=len(lots))
+    metals = np.array([lot[3] for lot in lots], dtype=object)
+    in_range = ordinals <= last_day
+    grams, cost, metals = grams[in_range], cost[in_range], metals[in_range]
+    offsets = np.maximum(ordinals[in_range] - first_day, 0)
+
+    invested = np.cumsum(np.bincount(offsets, weights=cost, minlength=days))
+    value = np.zeros(days)
+    for metal in np.unique(metals).tolist():
+        selected = metals == metal
+        holdings = np.cumsum(
+            np.bincount(offsets[selected], weights=grams[selected], minlength=days)
+        )
+        series = np.full(days, np.nan)
+        for day, price in prices.get(metal, {}).items():
+            if first_day <= day <= last_day:
+                series[day - first_day] = price
+        price_per_day = forward_fill(series)
+        # No holdings (yet or any more) means no value, even without a price
+        value += np.where(holdings > GRAMS_EPSILON, holdings * price_per_day, 0.0)
+
+    return {"value": value, "invested": invested, "gain": value - invested}
+
+
+def _ordinal(value: Any) -> Optional[int]:
+    """Return the day ordinal of an ISO date (or datetime), None if invalid."""
+    try:
+        return date.fromisoformat(str(value)[:10]).toordinal()
+    except ValueError:
+        return None
+
+
+def ledger_rows(events: Iterable[Dict[str, Any]]) -> Tuple[List[LotRow], int]:
+    """Return rows built from the ledger events and the count of skipped lots.
+
+    Each lot adds its bought grams and cost on its purchase date and every
+    sale fill takes its grams and cost out on the sale date, so sold lots
+    still count for the days they were held. Adjust events correct the
+    purchase; removed lots are dropped with their sales.
+    """
+    bought: Dict[str, Dict[str, Any]] = {}
+    sales: Dict[str, List[Tuple[Any, float, float]]] = {}
+    for event in events:
+        if event["type"] == EVENT_BUY:
+            bought[event["lot"]["id"]] = dict(event["lot"])
+        elif event["type"] == EVENT_SELL:
+            for lot_id, grams, cost in event["fills"]:
+                sales.setdefault(lot_id, []).append((event["date"], grams, cost))
+        elif event["type"] == EVENT_ADJUST:
+            if event.get("removed"):
+                bought.pop(event["lot_id"], None)
+                sales.pop(event["lot_id"], None)
+            elif event["lot_id"] in bought:
+                bought[event["lot_id"]].update(event["changes"])
+
+    rows: List[LotRow] = []
+    skipped = 0
+    for lot_id, lot in bought.items():
+        purchased = _ordinal(lot["purchase_date"])
+        if purchased is None:
+            skipped += 1
+            continue
+        metal = lot.get("metal", DEFAULT_METAL)
+        rows.append((purchased, lot["amount_grams"], lot["purchase_price_eur"], metal))
+        for sale_date, grams, cost in sales.get(lot_id, ()):
+            sold = max(_ordinal(sale_date) or purchased, purchased)
+            rows.append((sold, -grams, -cost, metal))
+    return rows, skipped
+
+
+def _statistics_rows(
+    series: "np.ndarray", first_day: int
+) -> List[Tuple[datetime, float]]:
+    """Return (local midnight, value) for every day with a value."""
+    rows = []
+    for offset in np.flatnonzero(~np.isnan(series)).tolist():
+        day = date.fromordinal(first_day + offset)
+        rows.append((dt_util.start_of_local_day(day), round(float(series[offset]), 2)))
+    return rows
+
+
+class PortfolioBackfill:
+    """Rebuilds daily portfolio value, invested capital and gain history.
+
+    Holdings per day follow the buys and sales in the portfolio's ledger.
+    Prices come from the historical price cache and the tick store's daily
+    closes, optionally topped up with a limited number of API lookups at
+    backfill priority (`fetch(symbol)` returns a date -> price fetcher).
+    The series are computed in the executor and imported
+    as external statistics in one call per series.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        events: Sequence[Dict[str, Any]],
+        price_cache: Any,
+        tick_store: Any,
+        fetch: Optional[Callable[[str], Callable[[str], Any]]] = None,
+    ) -> None:
+        """Initialize the job."""
+        self.hass = hass
+        self.entry_id = entry_id
+        self.events = events
+        self.price_cache = price_cache
+        self.tick_store = tick_store
+        self.fetch = fetch
+
+    def _progress(self, phase: str, progress: float) -> None:
+        """Report progress as an event."""
+        self.hass.bus.async_fire(
+            EVENT_BACKFILL_PROGRESS,
+            {"entry_id": self.entry_id, "phase": phase, "progress": round(progress, 2)},
+        )
+
+    async def _async_prices(
+        self, metals: List[str], first_day: int, last_day: int, max_fetch: int
+    ) -> Tuple[Dict[str, Dict[int, float]], int, Dict[str, Dict[str, str]]]:
+        """Collect per-gram prices by metal and day ordinal and fetch errors by symbol."""
+        prices: Dict[str, Dict[int, float]] = {}
+        fetched = 0
+        fetch_errors: Dict[str, Dict[str, str]] = {}
+        for metal in metals:
+            symbol = f"{metal}/{PORTFOLIO_CURRENCY}"
+            by_day: Dict[int, float] = {}
+            for day, price in (await self.price_cache.async_stored_prices(symbol)).items():
+                by_day[date.fromisoformat(day).toordinal()] = price
+            ohlc = await self.tick_store.async_ohlc(
+                symbol, "day", 0, dt_util.utcnow().timestamp()
+            )
+            for day, close in zip(ohlc["periods"], ohlc["close"]):
+                by_day[date.fromisoformat(day).toordinal()] = close
+
+            missing = [
+                day for day in range(first_day, last_day + 1) if day not in by_day
+            ]
+            if self.fetch is not None and max_fetch > 0 and missing:
+                # Spread the budget evenly; forward-fill covers the gaps
+                picks = np.unique(
+                    np.linspace(0, len(missing) - 1, min(max_fetch, len(missing))).astype(int)
+                )
+                dates = [date.fromordinal(missing[i]).isoformat() for i in picks.tolist()]
+                self._progress(f"fetch_{metal}", 0.0)
+                found, _, errors = await self.price_cache.async_get_many(
+                    dates, self.fetch(symbol), symbol=symbol
+                )
+                for day, price in found.items():
+                    by_day[date.fromisoformat(day).toordinal()] = price
+                fetched += len(found)
+                if errors:
+                    # Deferred dates (low API budget) are among them
+                    fetch_errors[symbol] = errors
+                    _LOGGER.warning(
+                        "Backfill could not fetch %d %s prices", len(errors), symbol
+                    )
+
+            prices[metal] = {day: price / TROY_OZ_TO_GRAM for day, price in by_day.items()}
+        return prices, fetched, fetch_errors
+
+    async def async_run(
+        self, start_date: Optional[str] = None, max_fetch: int = 0
+    ) -> Dict[str, Any]:
+        """Compute the history and import it as statistics."""
+        from homeassistant.components.recorder.models import (
+            StatisticData,
+            StatisticMetaData,
+        )
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+        )
+
+        started = time.monotonic()
+        rows, skipped = ledger_rows(self.events)
+        if not rows:
+            return {"error": "No portfolio entries with a valid purchase date"}
+
+        first_day = min(row[0] for row in rows)
+        if start_date:
+            first_day = max(first_day, date.fromisoformat(start_date).toordinal())
+        last_day = dt_util.now().date().toordinal() - 1
+        if first_day > last_day:
+            return {"error": "Nothing to backfill before today"}
+
+        self._progress("prices", 0.0)
+        metals = sorted({row[3] for row in rows if row[0] <= last_day})
+        prices, fetched, fetch_errors = await self._async_prices(
+            metals, first_day, last_day, max_fetch
+        )
+
+        self._progress("compute", 0.3)
+        series = await self.hass.async_add_executor_job(
+            compute_daily_series, rows, first_day, last_day, prices
+        )
+
+        self._progress("import", 0.6)
+        imported: Dict[str, int] = {}
+        for index, name in enumerate(SERIES):
+            points = await self.hass.async_add_executor_job(
+                _statistics_rows, series[name], first_day
+            )
+            metadata = StatisticMetaData(
+                has_mean=True,
+                has_sum=False,
+                name=SERIES_NAMES[name],
+                source=DOMAIN,
+                statistic_id=statistic_id(self.entry_id, name),
+                unit_of_measurement=PORTFOLIO_CURRENCY,
+            )
+            async_add_external_statistics(
+                self.hass,
+                metadata,
+                [
+                    StatisticData(start=start, mean=value, min=value, max=value, state=value)
+                    for start, value in points
+                ],
+            )
+            imported[metadata["statistic_id"]] = len(points)
+            self._progress("import", 0.6 + 0.4 * (index + 1) / len(SERIES))
+
+        days = last_day - first_day + 1
+        result = {
+            "first_day": date.fromordinal(first_day).isoformat(),
+            "last_day": date.fromordinal(last_day).isoformat(),
+            "days": days,
+            "days_without_price": days - imported[statistic_id(self.entry_id, "value")],
+            "lots": sum(1 for row in rows if row[1] > 0),
+            "lots_skipped": skipped,
+            "prices_fetched": fetched,
+            "fetch_errors": fetch_errors,
+            "statistics": imported,
+            "seconds": round(time.monotonic() - started, 2),
+        }
+        _LOGGER.info("Backfilled portfolio statistics: %s", result)
+        return result
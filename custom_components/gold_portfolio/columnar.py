@@ -0,0 +1,194 @@
+"""Columnar (NumPy) lot storage for large Gold Portfolios."""
+import logging
+from datetime import date
+from typing import Dict, List, Mapping, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy ships with Home Assistant
+    np = None
+
+_LOGGER = logging.getLogger(__name__)
+
+INITIAL_CAPACITY = 1024
+_COLUMNS = ("grams", "cost", "ordinal", "metal", "live")
+# Compact once this share of rows is deleted (and at least COMPACT_MIN rows)
+COMPACT_RATIO = 0.25
+COMPACT_MIN = 64
+
+
+def numpy_available() -> bool:
+    """Return True if the columnar backend can be used."""
+    return np is not None
+
+
+def date_to_ordinal(value: Optional[str]) -> int:
+    """Convert a YYYY-MM-DD string to a proleptic ordinal (0 if invalid)."""
+    try:
+        return date.fromisoformat(str(value)[:10]).toordinal()
+    except (TypeError, ValueError):
+        return 0
+
+
+class ColumnarLotIndex:
+    """Lot fields in contiguous arrays with an id to row index.
+
+    Deleted rows are zeroed and left in place until enough of them pile up,
+    then the arrays are compacted and a new id index is built. Existing
+    id -> row mappings never change within one index dict, so valuations
+    computed from an older generation stay self-consistent.
+    """
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY) -> None:
+        """Initialize empty columns."""
+        self.grams = np.zeros(capacity, dtype=np.float64)
+        self.cost = np.zeros(capacity, dtype=np.float64)
+        self.ordinal = np.zeros(capacity, dtype=np.int32)
+        self.metal = np.zeros(capacity, dtype=np.int8)
+        self.live = np.zeros(capacity, dtype=bool)
+        # Metal symbol -> code stored in the metal column
+        self.metal_codes: Dict[str, int] = {}
+        self.rows: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._deleted = 0
+
+    @property
+    def size(self) -> int:
+        """Return the number of used rows, including deleted ones."""
+        return len(self._ids)
+
+    def _grow(self) -> None:
+        """Double the capacity of all columns."""
+        capacity = max(INITIAL_CAPACITY, len(self.grams) * 2)
+        for name in _COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+
+    def _metal_code(self, metal: str) -> int:
+        """Return the code of a metal, assigning a new one if needed."""
+        code = self.metal_codes.get(metal)
+        if code is None:
+            code = self.metal_codes[metal] = len(self.metal_codes)
+        return code
+
+    def add(
+        self, lot_id: str, grams: float, cost: float, ordinal: int, metal: str
+    ) -> None:
+        """Append a lot."""
+        if self.size == len(self.grams):
+            self._grow()
+        row = self.size
+        self._ids.append(lot_id)
+        self.grams[row] = grams
+        self.cost[row] = cost
+        self.ordinal[row] = ordinal
+        self.metal[row] = self._metal_code(metal)
+        self.live[row] = True
+        self.rows[lot_id] = row
+
+    def update(
+        self,
+        lot_id: str,
+        grams: Optional[float] = None,
+        cost: Optional[float] = None,
+        ordinal: Optional[int] = None,
+        metal: Optional[str] = None,
+    ) -> None:
+        """Update the fields of a lot in place."""
+        row = self.rows[lot_id]
+        if grams is not None:
+            self.grams[row] = grams
+        if cost is not None:
+            self.cost[row] = cost
+        if ordinal is not None:
+            self.ordinal[row] = ordinal
+        if metal is not None:
+            self.metal[row] = self._metal_code(metal)
+
+    def remove(self, lot_id: str) -> None:
+        """Remove a lot, compacting the columns when worthwhile."""
+        row = self.rows.pop(lot_id)
+        self._ids[row] = None
+        self.grams[row] = 0.0
+        self.cost[row] = 0.0
+        self.live[row] = False
+        self._deleted += 1
+        if self._deleted >= max(COMPACT_MIN, self.size * COMPACT_RATIO):
+            self.compact()
+
+    def compact(self) -> None:
+        """Drop deleted rows and rebuild the id index."""
+        size = self.size
+        keep = np.flatnonzero(self.live[:size])
+        capacity = max(INITIAL_CAPACITY, len(self.grams))
+        for name in _COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[: len(keep)] = old[keep]
+            setattr(self, name, new)
+        self._ids = [self._ids[row] for row in keep.tolist()]
+        # New dict object: older valuations keep their own index generation
+        self.rows = {lot_id: row for row, lot_id in enumerate(self._ids)}
+        self._deleted = 0
+        _LOGGER.debug("Compacted lot columns from %d to %d rows", size, len(keep))
+
+    def valuate(self, prices: Mapping[str, float]) -> "ColumnarValuation":
+        """Value all lots at once from metal -> per-gram prices.
+
+        Lots of a metal without a price get NaN values.
+        """
+        size = self.size
+        grams = self.grams[:size]
+        cost = self.cost[:size]
+        price_table = np.full(max(len(self.metal_codes), 1), np.nan)
+        for metal, code in self.metal_codes.items():
+            if prices.get(metal) is not None:
+                price_table[code] = prices[metal]
+        value = grams * price_table[self.metal[:size]]
+        gain = value - cost
+        gain_percent = np.divide(
+            gain * 100, cost, out=np.zeros(size, dtype=np.float64), where=cost > 0
+        )
+        # Rounding is deferred to lookup; most rows are never read
+        return ColumnarValuation(self.rows, grams.copy(), value, gain, gain_percent)
+
+
+class ColumnarValuation:
+    """Per-lot valuation arrays, looked up by lot id."""
+
+    __slots__ = ("_rows", "_grams", "_value", "_gain", "_gain_percent")
+
+    def __init__(self, rows, grams, value, gain, gain_percent) -> None:
+        """Initialize the valuation."""
+        self._rows = rows
+        self._grams = grams
+        self._value = value
+        self._gain = gain
+        self._gain_percent = gain_percent
+
+    def get(
+        self, lot_id: str
+    ) -> Optional[Tuple[float, Optional[float], Optional[float], Optional[float]]]:
+        """Return (grams, value, gain, gain %) for a lot."""
+        row = self._rows.get(lot_id)
+        if row is None or row >= len(self._value):
+            return None
+        if np.isnan(self._value[row]):
+            return (float(self._grams[row]), None, None, None)
+        return (
+            float(self._grams[row]),
+            round(float(self._value[row]), 2),
+            round(float(self._gain[row]), 2),
+            round(float(self._gain_percent[row]), 2),
+        )
+
+    def gain_counts(self) -> Tuple[int, int]:
+        """Return the number of lots in gain and in loss."""
+        # Deleted rows have zero gain, unpriced ones NaN: both count as neither
+        return int(np.count_nonzero(self._gain > 0)), int(np.count_nonzero(self._gain < 0))
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return len(self._value)
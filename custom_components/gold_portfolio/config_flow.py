@@ -7,9 +7,48 @@ from homeassistant import config_entries
 from homeassistant.const import CONF_NAME
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .api import GoldAPIClient
-from .const import CONF_API_KEY, CONF_UPDATE_INTERVAL, DOMAIN, UPDATE_INTERVAL_DEFAULT
+from .const import (
+    API_MONTHLY_QUOTA_DEFAULT,
+    CONF_API_KEY,
+    CONF_COST_BASIS,
+    CONF_EMA_WINDOW,
+    CONF_ENTITY_MODE,
+    CONF_MAX_STALENESS,
+    CONF_MONTHLY_QUOTA,
+    CONF_RANGE_WINDOW,
+    CONF_REQUEST_TIMEOUT,
+    CONF_SMA_WINDOW,
+    CONF_STORAGE_MODE,
+    CONF_SYMBOLS,
+    CONF_THRESHOLD_EUR,
+    CONF_THRESHOLD_PERCENT,
+    CONF_TRACKED_LOTS,
+    CONF_UPDATE_INTERVAL,
+    CONF_VOLATILITY_WINDOW,
+    COST_BASIS_FIFO,
+    COST_BASIS_METHODS,
+    CURRENCIES,
+    DEFAULT_SYMBOL,
+    DOMAIN,
+    EMA_WINDOW_DEFAULT,
+    ENTITY_MODE_PER_LOT,
+    ENTITY_MODES,
+    MAX_STALENESS_DEFAULT,
+    METALS,
+    REQUEST_TIMEOUT_DEFAULT,
+    PRIORITY_INTERACTIVE,
+    RANGE_WINDOW_DEFAULT,
+    SMA_WINDOW_DEFAULT,
+    STORAGE_MODE_SNAPSHOT,
+    STORAGE_MODES,
+    UPDATE_INTERVAL_DEFAULT,
+    VOLATILITY_WINDOW_DEFAULT,
+)
+from .hub import async_get_hub
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -27,6 +66,12 @@ class GoldPortfolioConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         errors: Dict[str, str] = {}
 
         if user_input is not None:
+            # One entry per portfolio (outside the try: aborting raises);
+            # entries with the same API key share its price feed and quota
+            title = user_input.get(CONF_NAME, "").strip() or "Gold Portfolio"
+            await self.async_set_unique_id(title.casefold())
+            self._abort_if_unique_id_configured()
+
             try:
                 # Validate API key
                 api_key = user_input[CONF_API_KEY].strip()
@@ -36,15 +81,17 @@ class GoldPortfolioConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     errors["base"] = "empty_api_key"
                 else:
                     _LOGGER.debug(f"Validating API key: {api_key[:10]}...")
-                    api_client = GoldAPIClient(api_key)
-                    result = await api_client.get_gold_price()
+                    hub = await async_get_hub(self.hass)
+                    api_client = GoldAPIClient(
+                        api_key,
+                        session=async_get_clientsession(self.hass),
+                        scheduler=hub.get_scheduler(api_key),
+                    )
+                    result = await api_client.get_gold_price(priority=PRIORITY_INTERACTIVE)
                     _LOGGER.info(f"API validation successful. Gold price: {result.get('price')}")
 
-                    await self.async_set_unique_id(api_key)
-                    self._abort_if_unique_id_configured()
-
                     return self.async_create_entry(
-                        title=user_input.get(CONF_NAME, "Gold Portfolio"),
+                        title=title,
                         data={CONF_API_KEY: api_key},
                     )
             except ValueError as err:
@@ -94,6 +141,7 @@ class GoldPortfolioOptionsFlowHandler(config_entries.OptionsFlow):
             return self.async_create_entry(title="", data=user_input)
 
         options = self.config_entry.options
+        lots = self._lot_choices()
 
         return self.async_show_form(
             step_id="init",
@@ -103,6 +151,74 @@ class GoldPortfolioOptionsFlowHandler(config_entries.OptionsFlow):
                         CONF_UPDATE_INTERVAL,
                         default=options.get(CONF_UPDATE_INTERVAL, UPDATE_INTERVAL_DEFAULT),
                     ): vol.In([1, 2, 3, 4, 6, 8, 12, 24]),
+                    vol.Optional(
+                        CONF_REQUEST_TIMEOUT,
+                        default=options.get(CONF_REQUEST_TIMEOUT, REQUEST_TIMEOUT_DEFAULT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=2, max=60)),
+                    vol.Optional(
+                        CONF_MONTHLY_QUOTA,
+                        default=options.get(CONF_MONTHLY_QUOTA, API_MONTHLY_QUOTA_DEFAULT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_MAX_STALENESS,
+                        default=options.get(CONF_MAX_STALENESS, MAX_STALENESS_DEFAULT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=168)),
+                    vol.Optional(
+                        CONF_SYMBOLS,
+                        default=options.get(CONF_SYMBOLS, []),
+                    ): cv.multi_select(
+                        {
+                            f"{metal}/{currency}": f"{name} ({currency})"
+                            for metal, name in METALS.items()
+                            for currency in CURRENCIES
+                            if f"{metal}/{currency}" != DEFAULT_SYMBOL
+                        }
+                    ),
+                    vol.Optional(
+                        CONF_THRESHOLD_EUR,
+                        default=options.get(CONF_THRESHOLD_EUR, 0.0),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_THRESHOLD_PERCENT,
+                        default=options.get(CONF_THRESHOLD_PERCENT, 0.0),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_SMA_WINDOW,
+                        default=options.get(CONF_SMA_WINDOW, SMA_WINDOW_DEFAULT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=2, max=400)),
+                    vol.Optional(
+                        CONF_EMA_WINDOW,
+                        default=options.get(CONF_EMA_WINDOW, EMA_WINDOW_DEFAULT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=2, max=400)),
+                    vol.Optional(
+                        CONF_VOLATILITY_WINDOW,
+                        default=options.get(CONF_VOLATILITY_WINDOW, VOLATILITY_WINDOW_DEFAULT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=2, max=400)),
+                    vol.Optional(
+                        CONF_RANGE_WINDOW,
+                        default=options.get(CONF_RANGE_WINDOW, RANGE_WINDOW_DEFAULT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=2, max=1100)),
+                    vol.Optional(
+                        CONF_ENTITY_MODE,
+                        default=options.get(CONF_ENTITY_MODE, ENTITY_MODE_PER_LOT),
+                    ): vol.In(ENTITY_MODES),
+                    vol.Optional(
+                        CONF_TRACKED_LOTS,
+                        # Lots deleted since the last save can't stay selected
+                        default=[
+                            lot_id
+                            for lot_id in options.get(CONF_TRACKED_LOTS, [])
+                            if lot_id in lots
+                        ],
+                    ): cv.multi_select(lots),
+                    vol.Optional(
+                        CONF_COST_BASIS,
+                        default=options.get(CONF_COST_BASIS, COST_BASIS_FIFO),
+                    ): vol.In(COST_BASIS_METHODS),
+                    vol.Optional(
+                        CONF_STORAGE_MODE,
+                        default=options.get(CONF_STORAGE_MODE, STORAGE_MODE_SNAPSHOT),
+                    ): vol.In(STORAGE_MODES),
                 }
             ),
             description_placeholders={
@@ -110,3 +226,14 @@ class GoldPortfolioOptionsFlowHandler(config_entries.OptionsFlow):
                 "(1-24 mal pro Tag, z.B. 2 = 12 Stunden Intervall)"
             },
         )
+
+    def _lot_choices(self) -> Dict[str, str]:
+        """Return the lots that can get dedicated entities in compact mode."""
+        entry_data = self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id, {})
+        portfolio_manager = entry_data.get("portfolio_manager")
+        if portfolio_manager is None:
+            return {}
+        return {
+            lot.id: f"{lot.purchase_date} - {lot.amount_grams:g} g {METALS.get(lot.metal, lot.metal)}"
+            for lot in portfolio_manager.get_entries()
+        }
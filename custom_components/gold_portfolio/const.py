@@ -6,22 +6,103 @@ VERSION = "1.0.0"
 
 # API
 GOLD_API_BASE_URL = "https://www.goldapi.io/api"
-GOLD_PRICE_ENDPOINT = "/XAU/EUR"
 TROY_OZ_TO_GRAM = 31.1035  # Conversion factor
 
+# Metals and currencies (symbols are "METAL/CURRENCY", e.g. "XAG/EUR")
+METALS = {
+    "XAU": "Gold",
+    "XAG": "Silber",
+    "XPT": "Platin",
+    "XPD": "Palladium",
+}
+CURRENCIES = ["EUR", "USD", "CHF", "GBP"]
+DEFAULT_METAL = "XAU"
+PORTFOLIO_CURRENCY = "EUR"  # Purchase prices are stored in EUR
+DEFAULT_SYMBOL = f"{DEFAULT_METAL}/{PORTFOLIO_CURRENCY}"
+
 # Default values
 UPDATE_INTERVAL_DEFAULT = 2  # 2 times per day (every 12 hours)
 UPDATE_INTERVAL_MIN = 1
 UPDATE_INTERVAL_MAX = 24
+REQUEST_TIMEOUT_DEFAULT = 10  # Seconds per API request
+# Indicator windows in days (daily closes)
+SMA_WINDOW_DEFAULT = 50
+EMA_WINDOW_DEFAULT = 20
+VOLATILITY_WINDOW_DEFAULT = 30
+RANGE_WINDOW_DEFAULT = 365  # 52-week high/low
+API_MONTHLY_QUOTA_DEFAULT = 100  # Requests per month (free plan), 0 = unlimited
+API_RATE_LIMIT_PER_MINUTE = 5
+MAX_STALENESS_DEFAULT = 12  # Hours a stored price is served before revalidating
+
+# Request priorities (lower is served first)
+PRIORITY_LIVE = 0
+PRIORITY_INTERACTIVE = 1
+PRIORITY_BACKFILL = 2
+
+# Storage
+PORTFOLIO_FILE = "gold_portfolio_entries_{entry_id}.json"
+LEDGER_FILE = "gold_portfolio_ledger_{entry_id}.jsonl"  # Append-only transaction archive
+# Files shared by all entries before they were kept per entry
+LEGACY_PORTFOLIO_FILE = "gold_portfolio_entries.json"
+LEGACY_LEDGER_FILE = "gold_portfolio_ledger.jsonl"
+JOURNAL_COMPACT_EVENTS = 1000  # Journal mode: snapshot after this many events
+JOURNAL_COMPACT_BYTES = 1024 * 1024  # or this much archive tail
+SAVE_DELAY = 2  # Seconds to merge bursts of changes into one write
+HISTORY_CACHE_FILE = "gold_portfolio_price_history.json"
+HISTORY_CACHE_SIZE = 512  # Prices kept in the in-memory LRU
+HISTORY_TODAY_TTL = 900  # Seconds to cache today's (still moving) price
+HISTORY_BATCH_CONCURRENCY = 2  # Parallel API requests for batch lookups
+HISTORY_BATCH_MAX_CONCURRENCY = 10
+HISTORY_BATCH_MAX_DATES = 1000
+API_USAGE_FILE = "gold_portfolio_api_usage.json"
+LAST_PRICE_FILE = "gold_portfolio_last_price.json"
+TICK_FILE_PREFIX = "gold_portfolio_ticks_"  # + symbol, e.g. XAU_EUR.bin
+OHLC_FILE = "gold_portfolio_ohlc.json"
+TICK_QUERY_MAX_POINTS = 50000  # Raw ticks per get_price_history response
+ANALYTICS_FILE = "gold_portfolio_analytics_{entry_id}.json"
+BACKFILL_MAX_FETCH = 500  # API lookups per backfill_statistics call
+IMPORT_MAX_ROWS = 50000  # Entries per import_portfolio_entries call
 
 # Configuration
 CONF_API_KEY = "api_key"
 CONF_UPDATE_INTERVAL = "update_interval"
+CONF_REQUEST_TIMEOUT = "request_timeout"
+CONF_SYMBOLS = "symbols"
+CONF_MONTHLY_QUOTA = "monthly_quota"
+CONF_MAX_STALENESS = "max_staleness"
+CONF_ENTITY_MODE = "entity_mode"
+CONF_TRACKED_LOTS = "tracked_lots"
+CONF_THRESHOLD_EUR = "threshold_eur"
+CONF_THRESHOLD_PERCENT = "threshold_percent"
+CONF_SMA_WINDOW = "sma_window"
+CONF_EMA_WINDOW = "ema_window"
+CONF_VOLATILITY_WINDOW = "volatility_window"
+CONF_RANGE_WINDOW = "range_window"
+CONF_COST_BASIS = "cost_basis"
+CONF_STORAGE_MODE = "storage_mode"
+
+# Cost basis of sales: cost of the oldest lots, or the average cost per gram
+COST_BASIS_FIFO = "fifo"
+COST_BASIS_AVERAGE = "average"
+COST_BASIS_METHODS = [COST_BASIS_FIFO, COST_BASIS_AVERAGE]
+
+# Portfolio storage: full snapshot per save, or append-only journal
+STORAGE_MODE_SNAPSHOT = "snapshot"
+STORAGE_MODE_JOURNAL = "journal"
+STORAGE_MODES = [STORAGE_MODE_SNAPSHOT, STORAGE_MODE_JOURNAL]
+
+# Entity modes: four sensors per lot, or a summary plus selected lots only
+ENTITY_MODE_PER_LOT = "per_lot"
+ENTITY_MODE_COMPACT = "compact"
+ENTITY_MODES = [ENTITY_MODE_PER_LOT, ENTITY_MODE_COMPACT]
+VALUES_PAGE_SIZE_DEFAULT = 100  # Lots per get_portfolio_values page
+VALUES_PAGE_SIZE_MAX = 1000
 
 # Attributes
 ATTR_AMOUNT_GRAMS = "amount_grams"
 ATTR_PURCHASE_PRICE_EUR = "purchase_price_eur"
 ATTR_PURCHASE_DATE = "purchase_date"
+ATTR_METAL = "metal"
 ATTR_CURRENT_VALUE_EUR = "current_value_eur"
 ATTR_GAIN_EUR = "gain_eur"
 ATTR_GAIN_PERCENT = "gain_percent"
@@ -32,3 +113,15 @@ SERVICE_REMOVE_PORTFOLIO_ENTRY = "remove_portfolio_entry"
 SERVICE_UPDATE_PORTFOLIO_ENTRY = "update_portfolio_entry"
 SERVICE_GET_PORTFOLIO_ENTRIES = "get_portfolio_entries"
 SERVICE_GET_HISTORICAL_PRICE = "get_historical_price"
+SERVICE_GET_HISTORICAL_PRICES = "get_historical_prices"
+SERVICE_IMPORT_PORTFOLIO_ENTRIES = "import_portfolio_entries"
+SERVICE_GET_PORTFOLIO_VALUES = "get_portfolio_values"
+SERVICE_GET_PRICE_HISTORY = "get_price_history"
+SERVICE_BACKFILL_STATISTICS = "backfill_statistics"
+SERVICE_SELL_PORTFOLIO_ENTRIES = "sell_portfolio_entries"
+
+# Events
+EVENT_BACKFILL_PROGRESS = f"{DOMAIN}_backfill_progress"
+
+# Dispatcher signals (formatted with the config entry id)
+SIGNAL_PORTFOLIO_UPDATED = f"{DOMAIN}_portfolio_updated_{{}}"
@@ -0,0 +1,162 @@
+"""Lifecycle of the per-lot entities of Gold Portfolio Tracker."""
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+ENTRY_UNIQUE_ID_PREFIX = "portfolio_entry_"
+
+
+def lot_unique_id(config_entry_id: str, lot_id: str, kind: str) -> str:
+    """Return the unique id of a per-lot entity (lot ids are per portfolio)."""
+    return f"{config_entry_id}_{ENTRY_UNIQUE_ID_PREFIX}{lot_id}_{kind}"
+
+
+def lot_id_from_unique_id(config_entry_id: str, unique_id: str) -> str:
+    """Return the lot id encoded in a per-lot unique id (ids never contain "_")."""
+    prefix = f"{config_entry_id}_{ENTRY_UNIQUE_ID_PREFIX}"
+    return unique_id[len(prefix):].split("_", 1)[0]
+
+
+class PortfolioEntityManager:
+    """Adds and removes the entities of portfolio lots in batches.
+
+    Entities go through the sensor platform's own `async_add_entities`
+    callback, so services never have to look the platform up. Removing a lot
+    deletes its entities from the entity registry, which also removes them
+    from the state machine; entities still being added remove themselves
+    once added (see `async_is_current`).
+
+    With `tracked_lots` (compact mode) only those lots get entities.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        async_add_entities: AddEntitiesCallback,
+        entity_factory: Callable[[str], List[Entity]],
+        tracked_lots: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Initialize the manager."""
+        self.hass = hass
+        self.config_entry = config_entry
+        self._async_add_entities = async_add_entities
+        self._entity_factory = entity_factory
+        self._entities: Dict[str, List[Entity]] = {}
+        self.tracked_lots: Optional[Set[str]] = (
+            set(tracked_lots) if tracked_lots is not None else None
+        )
+
+    def _wants(self, lot_id: str) -> bool:
+        """Return True if a lot should have entities."""
+        return self.tracked_lots is None or lot_id in self.tracked_lots
+
+    @callback
+    def async_is_current(self, lot_id: str, entity: Entity) -> bool:
+        """Return True if an entity still belongs to a lot with entities."""
+        return any(current is entity for current in self._entities.get(lot_id, ()))
+
+    @property
+    def lot_ids(self) -> List[str]:
+        """Return the lots that currently have entities."""
+        return list(self._entities)
+
+    @callback
+    def async_add_lots(self, lot_ids: Iterable[str]) -> int:
+        """Create the entities of lots that don't have them yet."""
+        new_entities: List[Entity] = []
+        for lot_id in lot_ids:
+            if lot_id in self._entities or not self._wants(lot_id):
+                continue
+            entities = self._entity_factory(lot_id)
+            self._entities[lot_id] = entities
+            new_entities.extend(entities)
+
+        if new_entities:
+            self._async_add_entities(new_entities)
+            _LOGGER.debug("Added %d lot entities", len(new_entities))
+        return len(new_entities)
+
+    async def async_remove_lots(self, lot_ids: Iterable[str]) -> int:
+        """Remove the entities of lots from the registry and the state machine."""
+        registry = er.async_get(self.hass)
+        removed = 0
+        for lot_id in lot_ids:
+            for entity in self._entities.pop(lot_id, []):
+                entity_id = registry.async_get_entity_id(
+                    Platform.SENSOR, DOMAIN, entity.unique_id
+                )
+                # The entity removes itself when its registry entry goes; one
+                # not registered yet does so once added
+                if entity_id is not None:
+                    registry.async_remove(entity_id)
+                removed += 1
+
+        if removed:
+            _LOGGER.debug("Removed %d lot entities", removed)
+        return removed
+
+    async def async_set_tracked_lots(
+        self, tracked_lots: Optional[Iterable[str]], lot_ids: List[str]
+    ) -> None:
+        """Switch the tracked lots (None = all) and add or remove entities to match."""
+        self.tracked_lots = set(tracked_lots) if tracked_lots is not None else None
+        await self.async_remove_lots(
+            [lot_id for lot_id in self._entities if not self._wants(lot_id)]
+        )
+        self.async_add_lots(lot_ids)
+        self.async_remove_orphans(lot_ids)
+
+    @callback
+    def async_migrate_unique_ids(self) -> int:
+        """Prefix per-lot unique ids of older releases with the config entry id."""
+        registry = er.async_get(self.hass)
+        entry_id = self.config_entry.entry_id
+        old = [
+            entry
+            for entry in er.async_entries_for_config_entry(registry, entry_id)
+            if entry.unique_id.startswith(ENTRY_UNIQUE_ID_PREFIX)
+        ]
+        for entry in old:
+            registry.async_update_entity(
+                entry.entity_id, new_unique_id=f"{entry_id}_{entry.unique_id}"
+            )
+
+        if old:
+            _LOGGER.info("Migrated the unique ids of %d lot entities", len(old))
+        return len(old)
+
+    @callback
+    def async_remove_orphans(self, lot_ids: Iterable[str]) -> int:
+        """Delete registry entries of this config entry whose lot is gone or untracked."""
+        live = {lot_id for lot_id in lot_ids if self._wants(lot_id)}
+        registry = er.async_get(self.hass)
+        entry_id = self.config_entry.entry_id
+        # Older releases registered lots added by service under this prefix
+        legacy_prefix = f"{entry_id}_entry_"
+        lot_prefix = f"{entry_id}_{ENTRY_UNIQUE_ID_PREFIX}"
+        orphans = [
+            entry.entity_id
+            for entry in er.async_entries_for_config_entry(registry, entry_id)
+            if entry.unique_id.startswith(legacy_prefix)
+            or (
+                entry.unique_id.startswith(lot_prefix)
+                and lot_id_from_unique_id(entry_id, entry.unique_id) not in live
+            )
+        ]
+        for entity_id in orphans:
+            registry.async_remove(entity_id)
+
+        if orphans:
+            _LOGGER.info("Removed %d orphaned portfolio entities", len(orphans))
+        return len(orphans)
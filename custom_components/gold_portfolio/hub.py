@@ -0,0 +1,313 @@
+"""Shared price polling for Gold Portfolio config entries."""
+import logging
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .api import GoldAPIClient
+from .const import (
+    API_MONTHLY_QUOTA_DEFAULT,
+    DEFAULT_SYMBOL,
+    DOMAIN,
+    LAST_PRICE_FILE,
+    MAX_STALENESS_DEFAULT,
+    UPDATE_INTERVAL_DEFAULT,
+)
+from .scheduler import ApiUsageStore, QuotaScheduler, api_key_fingerprint
+from .storage import DelayedJSONWriter, load_json_file
+from .tick_store import TickStore
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PriceSubscription:
+    """What one config entry needs from a price feed."""
+
+    def __init__(
+        self,
+        symbols: Callable[[], List[str]],
+        update_interval: timedelta,
+        request_timeout: float,
+        monthly_quota: int = API_MONTHLY_QUOTA_DEFAULT,
+        max_staleness: timedelta = timedelta(hours=MAX_STALENESS_DEFAULT),
+    ) -> None:
+        """Initialize the subscription."""
+        self.symbols = symbols
+        self.update_interval = update_interval
+        self.request_timeout = request_timeout
+        self.monthly_quota = monthly_quota
+        self.max_staleness = max_staleness
+
+
+class LastPriceStore:
+    """Last successfully fetched price table per API key fingerprint.
+
+    Feeds start from it after a restart or reload, so a still fresh price
+    doesn't cost an API request.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store."""
+        self.hass = hass
+        self.data: Dict[str, Dict[str, Any]] = {}
+        path = Path(hass.config.path(".storage", LAST_PRICE_FILE))
+        self._writer = DelayedJSONWriter(hass, path, self._data_to_save)
+
+    async def async_load(self) -> None:
+        """Load the stored prices."""
+        try:
+            stored = await self.hass.async_add_executor_job(
+                load_json_file, self._writer.path, {}
+            )
+            self.data = stored.get("feeds", {})
+        except Exception as err:
+            _LOGGER.error("Error loading last prices: %s", err)
+            self.data = {}
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return the prices for the writer."""
+        return {"feeds": {key: dict(value) for key, value in self.data.items()}}
+
+    def get(self, api_key: str) -> Optional[Dict[str, Any]]:
+        """Return {"data": ..., "fetched_at": epoch seconds} of an API key."""
+        return self.data.get(api_key_fingerprint(api_key))
+
+    @callback
+    def async_set(self, api_key: str, data: Dict[str, Any], fetched_at: float) -> None:
+        """Remember a successful fetch."""
+        self.data[api_key_fingerprint(api_key)] = {"data": data, "fetched_at": fetched_at}
+        self._writer.async_schedule()
+
+    async def async_flush(self) -> None:
+        """Write pending prices now."""
+        await self._writer.async_flush()
+
+
+class PriceFeed:
+    """One API client and coordinator shared by all entries of an API key.
+
+    Every tick fetches the union of the symbols all subscribers need, at the
+    shortest interval any of them asked for, and fans the price table out to
+    all of them through the coordinator's listeners.
+
+    A feed can start from the last stored price table. That data carries
+    `"stale": True` until the next successful fetch replaces it.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api_key: str,
+        scheduler: QuotaScheduler,
+        price_store: LastPriceStore,
+    ) -> None:
+        """Initialize the feed."""
+        self.api_key = api_key
+        self.subscriptions: Dict[str, PriceSubscription] = {}
+        self.unsub_ticks: Optional[CALLBACK_TYPE] = None
+        self.max_staleness = timedelta(hours=MAX_STALENESS_DEFAULT)
+        # Epoch seconds of the last successful fetch (stored or live)
+        self.fetched_at: Optional[float] = None
+        self._price_store = price_store
+        self.api_client = GoldAPIClient(
+            api_key, session=async_get_clientsession(hass), scheduler=scheduler
+        )
+        self.coordinator = DataUpdateCoordinator(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_method=self._async_update_data,
+            # Until the subscriptions set it (see apply_subscriptions)
+            update_interval=timedelta(hours=24 // UPDATE_INTERVAL_DEFAULT),
+            # Equal data (see _async_update_data) doesn't notify listeners
+            always_update=False,
+        )
+        stored = price_store.get(api_key)
+        if stored:
+            self.coordinator.data = {**stored["data"], "stale": True}
+            self.fetched_at = stored["fetched_at"]
+
+    def symbols(self) -> List[str]:
+        """Return the symbols needed by any subscriber, gold first."""
+        symbols = [DEFAULT_SYMBOL]
+        for subscription in self.subscriptions.values():
+            symbols.extend(subscription.symbols())
+        return list(dict.fromkeys(symbols))
+
+    def refresh_delay(self, subscription: PriceSubscription) -> Optional[float]:
+        """Return seconds until the data must be revalidated for a subscriber.
+
+        0 means now (no data, a missing symbol or too old), None means the
+        data is live and the regular schedule is enough.
+        """
+        data = self.coordinator.data
+        if data is None or any(
+            symbol not in data.get("prices", {}) for symbol in subscription.symbols()
+        ):
+            return 0.0
+        if not data.get("stale"):
+            return None
+        age = time.time() - (self.fetched_at or 0.0)
+        return max(0.0, self.max_staleness.total_seconds() - age)
+
+    def apply_subscriptions(self) -> None:
+        """Adapt interval and timeout to the current subscribers."""
+        # Takes effect from the next scheduled poll
+        self.coordinator.update_interval = min(
+            subscription.update_interval for subscription in self.subscriptions.values()
+        )
+        self.api_client.timeout = max(
+            subscription.request_timeout for subscription in self.subscriptions.values()
+        )
+        quotas = [subscription.monthly_quota for subscription in self.subscriptions.values()]
+        # 0 means unlimited, which wins over any configured quota
+        self.api_client.scheduler.monthly_quota = 0 if 0 in quotas else max(quotas)
+        self.max_staleness = min(
+            subscription.max_staleness for subscription in self.subscriptions.values()
+        )
+
+    async def _async_update_data(self) -> dict:
+        """Fetch all prices from Gold API in one cycle."""
+        try:
+            prices = await self.api_client.get_prices(self.symbols())
+        except Exception as err:
+            previous = self.coordinator.data
+            if previous is not None and previous.get("stale"):
+                # Better a flagged old price than no sensors while the API is down
+                _LOGGER.warning("Could not revalidate stored gold price: %s", err)
+                return previous
+            _LOGGER.error("Error updating gold price: %s", err)
+            raise UpdateFailed(f"Error communicating with Gold API: {err}")
+
+        if DEFAULT_SYMBOL not in prices:
+            raise UpdateFailed(f"No price received for {DEFAULT_SYMBOL}")
+
+        self.fetched_at = time.time()
+        previous = self.coordinator.data
+        if previous is not None and _same_quotes(previous.get("prices", {}), prices):
+            _LOGGER.debug("Price timestamps unchanged, keeping previous data")
+            if previous.get("stale"):
+                # Confirmed by the API, so no longer stale
+                previous = {key: value for key, value in previous.items() if key != "stale"}
+            data = previous
+        else:
+            # Top-level keys keep the gold price for existing consumers
+            data = {**prices[DEFAULT_SYMBOL], "prices": prices}
+        self._price_store.async_set(self.api_key, data, self.fetched_at)
+        return data
+
+
+def _same_quotes(old: Dict[str, dict], new: Dict[str, dict]) -> bool:
+    """Return True if every symbol has the same quote timestamp as before."""
+    return old.keys() == new.keys() and all(
+        new[symbol].get("timestamp") is not None
+        and new[symbol].get("timestamp") == old[symbol].get("timestamp")
+        for symbol in new
+    )
+
+
+class PriceHub:
+    """Reference-counted price feeds and request schedulers, one per API key.
+
+    Schedulers outlive feeds so that config flow validation and re-created
+    feeds keep counting against the same budget. Every quote a feed fetches
+    is recorded in the tick store.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the hub."""
+        self.hass = hass
+        self.usage_store = ApiUsageStore(hass)
+        self.price_store = LastPriceStore(hass)
+        self.tick_store = TickStore(hass)
+        self._feeds: Dict[str, PriceFeed] = {}
+        self._entry_keys: Dict[str, str] = {}
+        self._schedulers: Dict[str, QuotaScheduler] = {}
+
+    def get_scheduler(self, api_key: str) -> QuotaScheduler:
+        """Return the request scheduler of an API key."""
+        scheduler = self._schedulers.get(api_key)
+        if scheduler is None:
+            scheduler = self._schedulers[api_key] = QuotaScheduler(
+                self.hass, api_key, self.usage_store
+            )
+        return scheduler
+
+    def get_feed(self, entry_id: str) -> Optional[PriceFeed]:
+        """Return the feed an entry is subscribed to."""
+        api_key = self._entry_keys.get(entry_id)
+        return self._feeds.get(api_key) if api_key else None
+
+    async def async_subscribe(
+        self, entry_id: str, api_key: str, subscription: PriceSubscription
+    ) -> PriceFeed:
+        """Subscribe an entry; the caller schedules `refresh_delay` revalidation."""
+        feed = self._feeds.get(api_key)
+        if feed is None:
+            feed = self._feeds[api_key] = PriceFeed(
+                self.hass, api_key, self.get_scheduler(api_key), self.price_store
+            )
+            feed.unsub_ticks = feed.coordinator.async_add_listener(
+                self._record_ticks_callback(feed)
+            )
+            _LOGGER.debug("Created price feed (%d feeds)", len(self._feeds))
+
+        feed.subscriptions[entry_id] = subscription
+        self._entry_keys[entry_id] = api_key
+        feed.apply_subscriptions()
+        return feed
+
+    def _record_ticks_callback(self, feed: PriceFeed) -> CALLBACK_TYPE:
+        """Return a coordinator listener that records the fetched quotes."""
+
+        @callback
+        def _record_ticks() -> None:
+            data = feed.coordinator.data
+            if feed.coordinator.last_update_success and data:
+                self.hass.async_create_task(
+                    self.tick_store.async_append_prices(data.get("prices", {}))
+                )
+
+        return _record_ticks
+
+    async def async_unsubscribe(self, entry_id: str) -> None:
+        """Unsubscribe an entry, tearing the feed down after the last one."""
+        api_key = self._entry_keys.pop(entry_id, None)
+        feed = self._feeds.get(api_key) if api_key else None
+        if feed is None:
+            return
+
+        feed.subscriptions.pop(entry_id, None)
+        if feed.subscriptions:
+            feed.apply_subscriptions()
+            return
+
+        del self._feeds[api_key]
+        if feed.unsub_ticks is not None:
+            feed.unsub_ticks()
+        await feed.coordinator.async_shutdown()
+        # Don't leave service calls waiting on a feed that is gone
+        feed.api_client.scheduler.async_cancel_waiters()
+        await feed.api_client.async_close()
+        await self.usage_store.async_flush()
+        await self.price_store.async_flush()
+        await self.tick_store.async_flush()
+        _LOGGER.debug("Removed price feed (%d feeds)", len(self._feeds))
+
+
+async def async_get_hub(hass: HomeAssistant) -> PriceHub:
+    """Return the integration's price hub, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    hub = domain_data.get("hub")
+    if hub is None:
+        hub = PriceHub(hass)
+        await hub.usage_store.async_load()
+        await hub.price_store.async_load()
+        # Another caller may have created one while the files loaded
+        hub = domain_data.setdefault("hub", hub)
+    return hub
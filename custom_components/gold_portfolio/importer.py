@@ -0,0 +1,131 @@
+"""Parsing and validation of bulk portfolio imports."""
+import csv
+import io
+import json
+import math
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .const import DEFAULT_METAL, IMPORT_MAX_ROWS, METALS
+
+IMPORT_FORMATS = ("csv", "json")
+_PRICE_FIELDS = ("purchase_price_eur", "purchase_price_per_gram")
+
+
+def resolve_import_path(config_dir: str, file_path: str) -> Path:
+    """Resolve a file path, which must lie inside the config directory."""
+    root = Path(config_dir).resolve()
+    path = (root / file_path).resolve()
+    if path != root and root not in path.parents:
+        raise ValueError(f"File must be inside the config directory: {file_path}")
+    if not path.is_file():
+        raise ValueError(f"File not found: {file_path}")
+    return path
+
+
+def read_import_file(config_dir: str, file_path: str) -> str:
+    """Read an import file from the config directory (blocking)."""
+    return resolve_import_path(config_dir, file_path).read_text(encoding="utf-8-sig")
+
+
+def detect_format(content: str, file_path: Optional[str] = None) -> str:
+    """Guess the format from the file extension or the content."""
+    if file_path:
+        suffix = Path(file_path).suffix.lower().lstrip(".")
+        if suffix in IMPORT_FORMATS:
+            return suffix
+    return "json" if content.lstrip().startswith(("[", "{")) else "csv"
+
+
+def parse_rows(content: str, fmt: str) -> List[Dict[str, Any]]:
+    """Parse CSV (with header row) or JSON (list or {"entries": [...]}) into rows."""
+    if fmt == "json":
+        data = json.loads(content)
+        if isinstance(data, dict):
+            data = data.get("entries")
+        if not isinstance(data, list):
+            raise ValueError('JSON must be a list of entries or {"entries": [...]}')
+        return data
+
+    sample = content[:4096]
+    try:
+        # Spreadsheets exported with a German locale use ";"
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(io.StringIO(content), dialect=dialect)
+    if not reader.fieldnames or "amount_grams" not in [
+        name.strip() for name in reader.fieldnames
+    ]:
+        raise ValueError("CSV needs a header row with at least purchase_date and amount_grams")
+    return [
+        {key.strip(): value for key, value in row.items() if key is not None}
+        for row in reader
+    ]
+
+
+def _number(value: Any) -> Optional[float]:
+    """Parse a finite number, accepting a decimal comma."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        number = float(value)
+    else:
+        text = str(value).strip().replace(" ", "")
+        if "," in text and "." not in text:
+            text = text.replace(",", ".")
+        number = float(text)
+    # float() also accepts nan and inf (and JSON has NaN and Infinity)
+    if not math.isfinite(number):
+        raise ValueError(f"Not a finite number: {value}")
+    return number
+
+
+def validate_row(row: Any) -> Dict[str, Any]:
+    """Return the add_entry arguments for a row or raise ValueError."""
+    if not isinstance(row, dict):
+        raise ValueError("Entry must be an object")
+
+    purchase_date = str(row.get("purchase_date") or "").strip()
+    if not purchase_date:
+        raise ValueError("purchase_date is required")
+    purchase_date = date.fromisoformat(purchase_date).isoformat()
+
+    amount_grams = _number(row.get("amount_grams"))
+    if amount_grams is None or amount_grams < 0.01:
+        raise ValueError("amount_grams must be at least 0.01")
+
+    prices = {field: _number(row.get(field)) for field in _PRICE_FIELDS}
+    if all(price is None for price in prices.values()):
+        raise ValueError("purchase_price_eur or purchase_price_per_gram is required")
+    if any(price is not None and price < 0 for price in prices.values()):
+        raise ValueError("Prices must not be negative")
+
+    metal = str(row.get("metal") or DEFAULT_METAL).strip().upper()
+    if metal not in METALS:
+        raise ValueError(f"Unsupported metal: {metal}")
+
+    return {
+        "purchase_date": purchase_date,
+        "amount_grams": amount_grams,
+        **prices,
+        "metal": metal,
+    }
+
+
+def validate_rows(
+    rows: List[Any],
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Validate all rows, returning (valid rows, errors with 1-based row numbers)."""
+    if len(rows) > IMPORT_MAX_ROWS:
+        raise ValueError(f"More than {IMPORT_MAX_ROWS} entries")
+
+    valid: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    for number, row in enumerate(rows, start=1):
+        try:
+            valid.append(validate_row(row))
+        except (TypeError, ValueError) as err:
+            errors.append({"row": number, "error": str(err)})
+    return valid, errors
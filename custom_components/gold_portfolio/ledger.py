@@ -0,0 +1,116 @@
+"""Transaction ledger of Gold Portfolio Tracker."""
+import json
+import logging
+import os
+from bisect import bisect_left, insort
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from .columnar import date_to_ordinal
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENT_BUY = "buy"
+EVENT_SELL = "sell"
+EVENT_ADJUST = "adjust"
+EVENT_TYPES = (EVENT_BUY, EVENT_SELL, EVENT_ADJUST)
+
+# Remaining grams below this close a lot
+GRAMS_EPSILON = 1e-9
+
+
+def new_event(event_type: str, seq: int, **fields: Any) -> Dict[str, Any]:
+    """Return a ledger event with its sequence number and timestamp."""
+    return {"seq": seq, "type": event_type, "at": datetime.now().isoformat(), **fields}
+
+
+def append_events(path: Path, events: List[Dict[str, Any]]) -> int:
+    """Append events as JSON lines and return the new file size (blocking)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "ab") as file:
+        if events:
+            file.write(
+                "".join(
+                    json.dumps(event, default=str, separators=(",", ":")) + "\n"
+                    for event in events
+                ).encode()
+            )
+            file.flush()
+            os.fsync(file.fileno())
+        return file.tell()
+
+
+def read_events(
+    path: Path, offset: int, after_seq: int, repair: bool = True
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Return the events after `after_seq` from `offset` on and the end offset.
+
+    A torn final line (crash mid-append) is cut off, and a complete final
+    record missing its newline gets one, so later appends start on a clean
+    line. Without `repair` the file is only read and a torn final line
+    skipped. If the file is shorter than `offset` it is read from the
+    start; the sequence numbers still select the tail.
+    """
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        return [], 0
+    if offset > size:
+        offset = 0
+
+    events: List[Dict[str, Any]] = []
+    with open(path, "r+b" if repair else "rb") as file:
+        file.seek(offset)
+        position = offset
+        for line in file:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                if position + len(line) < size:
+                    raise
+                if not repair:
+                    break
+                _LOGGER.warning("Truncating partial ledger record in %s", path.name)
+                file.truncate(position)
+                break
+            position += len(line)
+            if repair and not line.endswith(b"\n"):
+                file.write(b"\n")
+                position += 1
+            if event["seq"] > after_seq:
+                events.append(event)
+    return events, position
+
+
+class FifoIndex:
+    """Open lots per metal ordered by purchase date (then id), oldest first."""
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._keys: Dict[str, List[Tuple[int, str]]] = {}
+
+    @staticmethod
+    def _key(lot: Any) -> Tuple[int, str]:
+        """Return the sort key of a lot."""
+        return (date_to_ordinal(lot.purchase_date), lot.id)
+
+    def add(self, lot: Any) -> None:
+        """Add a lot."""
+        insort(self._keys.setdefault(lot.metal, []), self._key(lot))
+
+    def discard(self, lot: Any) -> None:
+        """Remove a lot (its date and metal must not have changed since add)."""
+        keys = self._keys.get(lot.metal)
+        if not keys:
+            return
+        key = self._key(lot)
+        index = bisect_left(keys, key)
+        if index < len(keys) and keys[index] == key:
+            del keys[index]
+        if not keys:
+            del self._keys[lot.metal]
+
+    def lot_ids(self, metal: str) -> Iterator[str]:
+        """Iterate over the open lots of a metal, oldest first."""
+        return (lot_id for _, lot_id in list(self._keys.get(metal, [])))
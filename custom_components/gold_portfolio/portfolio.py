@@ -1,48 +1,554 @@
 """Portfolio management for Gold Portfolio Tracker."""
-import json
 import logging
+import math
 from datetime import datetime
+from functools import partial
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from homeassistant.core import HomeAssistant
+
+from .columnar import ColumnarLotIndex, date_to_ordinal, numpy_available
+from .const import (
+    COST_BASIS_AVERAGE,
+    COST_BASIS_FIFO,
+    DEFAULT_METAL,
+    JOURNAL_COMPACT_BYTES,
+    JOURNAL_COMPACT_EVENTS,
+    LEDGER_FILE,
+    LEGACY_LEDGER_FILE,
+    LEGACY_PORTFOLIO_FILE,
+    PORTFOLIO_FILE,
+    STORAGE_MODE_JOURNAL,
+    STORAGE_MODE_SNAPSHOT,
+)
+from .ledger import (
+    EVENT_ADJUST,
+    EVENT_BUY,
+    EVENT_SELL,
+    GRAMS_EPSILON,
+    FifoIndex,
+    append_events,
+    new_event,
+    read_events,
+)
+from .storage import DelayedJSONWriter, load_json_file, write_json_atomic
+from .valuation import ValuationSnapshot
 
 _LOGGER = logging.getLogger(__name__)
 
 
+PricesPerGram = Union[float, Mapping[str, float], None]
+
+
+class PortfolioLot(Mapping):
+    """Compact record of a single precious metal purchase.
+
+    Acts as a read-only mapping with the keys of the stored entry format,
+    so callers can use it like the entry dicts handed out before. After
+    partial sales `amount_grams` and `purchase_price_eur` are what remains.
+    Attributes are read-only too; only the manager changes them (through
+    `_set_field`), so its totals and indexes stay in step.
+    """
+
+    __slots__ = (
+        "id",
+        "purchase_date",
+        "amount_grams",
+        "purchase_price_eur",
+        "created_at",
+        "metal",
+        "sold_grams",
+    )
+
+    def __init__(
+        self,
+        lot_id: str,
+        purchase_date: str,
+        amount_grams: float,
+        purchase_price_eur: float,
+        created_at: Optional[str] = None,
+        metal: str = DEFAULT_METAL,
+        sold_grams: float = 0.0,
+    ) -> None:
+        """Initialize the lot."""
+        _set_field(self, "id", lot_id)
+        _set_field(self, "purchase_date", purchase_date)
+        _set_field(self, "amount_grams", amount_grams)
+        _set_field(self, "purchase_price_eur", purchase_price_eur)
+        _set_field(self, "created_at", created_at)
+        _set_field(self, "metal", metal)
+        _set_field(self, "sold_grams", sold_grams)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Refuse changes; lots are changed through the PortfolioManager."""
+        raise AttributeError(f"PortfolioLot is read-only, cannot set {name}")
+
+    def __delattr__(self, name: str) -> None:
+        """Refuse deletions."""
+        raise AttributeError(f"PortfolioLot is read-only, cannot delete {name}")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PortfolioLot":
+        """Create a lot from a stored entry dict."""
+        return cls(
+            str(data["id"]),
+            data.get("purchase_date"),
+            float(data.get("amount_grams", 0)),
+            float(data.get("purchase_price_eur", 0)),
+            data.get("created_at"),
+            data.get("metal") or DEFAULT_METAL,
+            float(data.get("sold_grams", 0)),
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return a plain dict copy of the lot."""
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def __getitem__(self, key: str) -> Any:
+        """Return a field by its entry key."""
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the entry keys."""
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        """Return the number of entry keys."""
+        return len(self.__slots__)
+
+    def __repr__(self) -> str:
+        """Return a readable representation."""
+        return f"PortfolioLot({self.as_dict()!r})"
+
+
+# Bypasses the read-only PortfolioLot.__setattr__ for the manager
+_set_field = object.__setattr__
+
+
+def storage_files(config_dir: Path, entry_id: Optional[str] = None) -> Tuple[Path, Path]:
+    """Return the snapshot and ledger file of a config entry."""
+    if entry_id is None:
+        names = (LEGACY_PORTFOLIO_FILE, LEGACY_LEDGER_FILE)
+    else:
+        names = (
+            PORTFOLIO_FILE.format(entry_id=entry_id),
+            LEDGER_FILE.format(entry_id=entry_id),
+        )
+    return config_dir / ".storage" / names[0], config_dir / ".storage" / names[1]
+
+
+def migrate_legacy_files(config_dir, entry_id: str) -> bool:
+    """Move the files shared by all entries to this entry (blocking, once).
+
+    Files the entry already has are left alone; the ledger is moved before
+    the snapshot, so an interrupted move is finished by the next call.
+    """
+    config_dir = Path(config_dir)
+    moved = False
+    pairs = zip(storage_files(config_dir), storage_files(config_dir, entry_id))
+    for legacy, target in reversed(list(pairs)):
+        if legacy.exists() and not target.exists():
+            legacy.rename(target)
+            moved = True
+    if moved:
+        _LOGGER.info("Moved the shared portfolio files to entry %s", entry_id)
+    return moved
+
+
+def _metal_totals() -> List[float]:
+    """Return empty running totals: [grams, investment, count]."""
+    return [0.0, 0.0, 0]
+
+
 class PortfolioManager:
-    """Manage the gold portfolio entries."""
+    """Manage the gold portfolio entries.
 
-    def __init__(self, config_dir):
-        """Initialize portfolio manager."""
+    Each lot has a metal (XAU by default). Prices passed to the valuation
+    methods are either a per-gram price applied to all lots, or a mapping of
+    metal -> per-gram price in EUR.
+
+    Every change is a buy, sell or adjust event of the transaction ledger.
+    Events update the lots, running totals and realized gains as they are
+    applied and are appended to a JSON-lines archive. The entries file is a
+    snapshot of the resulting state with the last applied sequence number,
+    so loading replays only the archive tail written after it.
+
+    In snapshot storage mode every save rewrites the snapshot. In journal
+    mode a save only appends its events, and the snapshot is rewritten
+    (compacted) once the tail passes a count or size threshold, so the bytes
+    written per change don't grow with the portfolio.
+    """
+
+    def __init__(
+        self,
+        config_dir,
+        hass: Optional[HomeAssistant] = None,
+        columnar: Optional[bool] = None,
+        cost_basis: str = COST_BASIS_FIFO,
+        storage_mode: str = STORAGE_MODE_SNAPSHOT,
+        entry_id: Optional[str] = None,
+    ):
+        """Initialize portfolio manager; call `async_load` (or `load`) next.
+
+        With `columnar` (default: when NumPy is available) lot figures are
+        mirrored into NumPy arrays and per-lot valuation is vectorized.
+        `cost_basis` (fifo or average) values sales without an explicit
+        method. `storage_mode` is snapshot or journal. `entry_id` scopes
+        the files to one config entry (without it the unscoped files are
+        used, e.g. by offline tools).
+        """
         # Convert to Path if string
         if isinstance(config_dir, str):
             config_dir = Path(config_dir)
         
         self.config_dir = config_dir
-        self.portfolio_file = config_dir / ".storage" / "gold_portfolio_entries.json"
-        self.portfolio_file.parent.mkdir(parents=True, exist_ok=True)
-        self._entries: List[Dict[str, Any]] = []
+        self.hass = hass
+        self.portfolio_file, self.ledger_file = storage_files(config_dir, entry_id)
+        self.cost_basis = cost_basis
+        self.storage_mode = storage_mode
+        # Lots indexed by id; dict order keeps insertion order for listings
+        self._lots: Dict[str, PortfolioLot] = {}
+        # Running totals per metal, kept in step with every add/update/remove
+        self._totals: Dict[str, List[float]] = {}
+        # Open lots per metal in FIFO order, for sales
+        self._fifo = FifoIndex()
+        # Realized gain per metal (kept after a metal is sold out)
+        self._realized: Dict[str, float] = {}
+        # Average-cost sales: difference between the average basis and the
+        # cost of the lots that were consumed, per metal still held
+        self._basis_adjustment: Dict[str, float] = {}
+        self._seq = 0
+        # Events applied since the last save, appended by the writer
+        self._pending_events: List[Dict[str, Any]] = []
+        # Archive tail after the snapshot; the byte counts are set by the writer
+        self._tail_events = 0
+        self._tail_bytes = 0
+        self._snapshot_offset = 0
+        self._snapshot_due = False
+        # Set when loading failed; the files are then never written
+        self._load_failed = False
+        if columnar is None:
+            columnar = numpy_available()
+        self._columns: Optional[ColumnarLotIndex] = (
+            ColumnarLotIndex() if columnar and numpy_available() else None
+        )
+        self._last_id = 0
+        # Bumped on every mutation so cached valuations can detect staleness
+        self.revision = 0
+        self._writer = DelayedJSONWriter(
+            hass,
+            self.portfolio_file,
+            self._data_to_save,
+            write_func=self._write_snapshot,
+            failed_func=self._save_failed,
+        )
+
+    def load(self) -> None:
+        """Load the entries (blocking; files are created on the first save)."""
         self._load_entries()
+        if self.hass is None and (self._pending_events or self._snapshot_due):
+            self._writer.async_schedule()
+
+    async def async_load(self) -> None:
+        """Load the entries in the executor."""
+        await self.hass.async_add_executor_job(self._load_entries)
+        if self._pending_events or self._snapshot_due:
+            self._writer.async_schedule()
 
     def _load_entries(self) -> None:
-        """Load entries from file."""
+        """Load the snapshot and replay the ledger events written after it."""
         try:
-            if self.portfolio_file.exists():
-                with open(self.portfolio_file, "r") as f:
-                    data = json.load(f)
-                    self._entries = data.get("entries", [])
-                    _LOGGER.debug("Loaded %d portfolio entries", len(self._entries))
+            data = load_json_file(self.portfolio_file)
+            for raw in (data or {}).get("entries", []):
+                self._index_lot(PortfolioLot.from_dict(raw))
+            self._totals = self._recompute_totals()
+
+            if data is not None and "ledger" not in data:
+                self._migrate()
+            else:
+                # Without a snapshot (journal mode, never compacted) the
+                # whole archive is the tail
+                ledger = (data or {}).get("ledger", {})
+                self._seq = ledger.get("seq", 0)
+                self._realized = dict(ledger.get("realized", {}))
+                self._basis_adjustment = dict(ledger.get("basis_adjustment", {}))
+                self._snapshot_offset = ledger.get("offset", 0)
+                events, end = read_events(
+                    self.ledger_file, self._snapshot_offset, self._seq
+                )
+                for event in events:
+                    self._apply(event)
+                self._tail_events = len(events)
+                self._tail_bytes = end - self._snapshot_offset
+                if events:
+                    self._check_totals()
+                    _LOGGER.debug("Replayed %d ledger events", len(events))
+            _LOGGER.debug("Loaded %d portfolio entries", len(self._lots))
         except Exception as err:
+            # Starting from empty would overwrite the stored portfolio
+            self._load_failed = True
             _LOGGER.error("Error loading portfolio entries: %s", err)
-            self._entries = []
+            raise
 
-    def _save_entries(self) -> None:
-        """Save entries to file."""
+    def _migrate(self) -> None:
+        """Record entries saved before the ledger existed as buy events."""
+        # Continue after an archive left by an interrupted migration
+        events, _ = read_events(self.ledger_file, 0, 0)
+        self._seq = events[-1]["seq"] if events else 0
+        for lot in self._lots.values():
+            self._seq += 1
+            self._pending_events.append(
+                new_event(EVENT_BUY, self._seq, lot=lot.as_dict(), migrated=True)
+            )
+        # The old entries file must be replaced in any storage mode
+        self._snapshot_due = True
+        if self._lots:
+            _LOGGER.info("Migrated %d portfolio entries to the ledger", len(self._lots))
+
+    def _index_lot(self, lot: PortfolioLot) -> None:
+        """Add a lot to the lot, columnar and FIFO indexes."""
+        self._lots[lot.id] = lot
+        self._add_columns(lot)
+        self._fifo.add(lot)
+        if lot.id.isdigit():
+            self._last_id = max(self._last_id, int(lot.id))
+
+    def _drop_lot(self, lot: PortfolioLot) -> None:
+        """Remove a lot from all indexes and the totals."""
+        del self._lots[lot.id]
+        if self._columns is not None:
+            self._columns.remove(lot.id)
+        self._fifo.discard(lot)
+        self._subtract_totals(lot)
+        if lot.metal not in self._totals:
+            # Nothing left to carry an average-cost difference
+            self._basis_adjustment.pop(lot.metal, None)
+
+    def _commit(self, event_type: str, **fields: Any) -> Dict[str, Any]:
+        """Create the next ledger event, apply it and queue it for the archive."""
+        self._seq += 1
+        event = new_event(event_type, self._seq, **fields)
+        self._apply(event)
+        self._pending_events.append(event)
+        return event
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        """Apply a ledger event to the lots, totals and realized gains."""
+        if event["type"] == EVENT_BUY:
+            lot = PortfolioLot.from_dict(event["lot"])
+            self._index_lot(lot)
+            self._add_totals(lot)
+        elif event["type"] == EVENT_SELL:
+            self._apply_sell(event)
+        elif event["type"] == EVENT_ADJUST:
+            lot = self._lots[event["lot_id"]]
+            if event.get("removed"):
+                self._drop_lot(lot)
+            else:
+                self._subtract_totals(lot)
+                self._fifo.discard(lot)
+                for key, value in event["changes"].items():
+                    _set_field(lot, key, value)
+                self._add_totals(lot)
+                self._fifo.add(lot)
+                if self._columns is not None:
+                    self._columns.update(
+                        lot.id,
+                        grams=lot.amount_grams,
+                        cost=lot.purchase_price_eur,
+                        ordinal=date_to_ordinal(lot.purchase_date),
+                        metal=lot.metal,
+                    )
+        else:
+            raise ValueError(f"Unknown ledger event: {event['type']}")
+        self._seq = max(self._seq, event["seq"])
+
+    def _apply_sell(self, event: Dict[str, Any]) -> None:
+        """Take the sold grams and their cost out of the filled lots."""
+        metal = event["metal"]
+        for lot_id, grams, cost in event["fills"]:
+            lot = self._lots[lot_id]
+            _set_field(lot, "sold_grams", lot.sold_grams + grams)
+            if lot.amount_grams - grams <= GRAMS_EPSILON:
+                self._drop_lot(lot)
+                continue
+            self._subtract_totals(lot)
+            _set_field(lot, "amount_grams", lot.amount_grams - grams)
+            _set_field(lot, "purchase_price_eur", lot.purchase_price_eur - cost)
+            self._add_totals(lot)
+            if self._columns is not None:
+                self._columns.update(
+                    lot_id, grams=lot.amount_grams, cost=lot.purchase_price_eur
+                )
+
+        self._realized[metal] = self._realized.get(metal, 0.0) + event["realized_gain_eur"]
+        adjustment = event.get("basis_adjustment_eur", 0.0)
+        if adjustment and metal in self._totals:
+            self._basis_adjustment[metal] = (
+                self._basis_adjustment.get(metal, 0.0) + adjustment
+            )
+
+    def _next_entry_id(self) -> str:
+        """Return a new millisecond-timestamp id, unique within the portfolio."""
+        # Never reuse an id on same-millisecond adds: bump past the last one
+        next_id = max(int(datetime.now().timestamp() * 1000), self._last_id + 1)
+        while str(next_id) in self._lots:
+            next_id += 1
+        self._last_id = next_id
+        return str(next_id)
+
+    def _add_columns(self, lot: PortfolioLot) -> None:
+        """Mirror a new lot into the columnar index."""
+        if self._columns is not None:
+            self._columns.add(
+                lot.id,
+                lot.amount_grams,
+                lot.purchase_price_eur,
+                date_to_ordinal(lot.purchase_date),
+                lot.metal,
+            )
+
+    def _add_totals(self, lot: PortfolioLot) -> None:
+        """Add a lot to the running totals of its metal."""
+        totals = self._totals.setdefault(lot.metal, _metal_totals())
+        totals[0] += lot.amount_grams
+        totals[1] += lot.purchase_price_eur
+        totals[2] += 1
+
+    def _subtract_totals(self, lot: PortfolioLot) -> None:
+        """Remove a lot from the running totals of its metal."""
+        totals = self._totals[lot.metal]
+        if totals[2] <= 1:
+            # Drop exactly so rounding residue can't survive an empty metal
+            del self._totals[lot.metal]
+            return
+        totals[0] -= lot.amount_grams
+        totals[1] -= lot.purchase_price_eur
+        totals[2] -= 1
+
+    def _recompute_totals(self) -> Dict[str, List[float]]:
+        """Compute the totals per metal from all lots."""
+        lots_by_metal: Dict[str, List[PortfolioLot]] = {}
+        for lot in self._lots.values():
+            lots_by_metal.setdefault(lot.metal, []).append(lot)
+        return {
+            metal: [
+                math.fsum(lot.amount_grams for lot in lots),
+                math.fsum(lot.purchase_price_eur for lot in lots),
+                len(lots),
+            ]
+            for metal, lots in lots_by_metal.items()
+        }
+
+    def _check_totals(self) -> None:
+        """Compare running totals against a full recompute (debug only)."""
+        if not _LOGGER.isEnabledFor(logging.DEBUG):
+            return
+
+        expected = self._recompute_totals()
+        drifted = expected.keys() != self._totals.keys() or any(
+            not math.isclose(value, current, rel_tol=1e-9, abs_tol=1e-6)
+            for metal, totals in expected.items()
+            for value, current in zip(totals, self._totals[metal])
+        )
+        if drifted:
+            _LOGGER.warning(
+                "Running totals drifted (%s != %s), resyncing", self._totals, expected
+            )
+            self._totals = expected
+
+    def _compaction_due(self) -> bool:
+        """Return True if the next journal save should write a snapshot."""
+        return (
+            self._snapshot_due
+            or self._tail_events >= JOURNAL_COMPACT_EVENTS
+            or self._tail_bytes >= JOURNAL_COMPACT_BYTES
+        )
+
+    def _data_to_save(
+        self,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Return the new ledger events and, if due, a snapshot copy for the writer."""
+        events, self._pending_events = self._pending_events, []
+        self._tail_events += len(events)
+        if self.storage_mode == STORAGE_MODE_JOURNAL and not self._compaction_due():
+            _LOGGER.debug("Journaling %d ledger events", len(events))
+            return events, None
+
+        _LOGGER.debug("Saving %d portfolio entries", len(self._lots))
+        self._tail_events = 0
+        self._snapshot_due = False
+        return events, {
+            "entries": [lot.as_dict() for lot in self._lots.values()],
+            "ledger": {
+                "seq": self._seq,
+                "realized": dict(self._realized),
+                "basis_adjustment": dict(self._basis_adjustment),
+            },
+        }
+
+    def _write_snapshot(
+        self, path: Path, data: Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]
+    ) -> None:
+        """Append the events to the archive, then write the snapshot if any (executor).
+
+        Events left in the list were not written; a raised error makes the
+        writer hand them back to `_save_failed`.
+        """
+        events, snapshot = data
+        if self._load_failed:
+            raise RuntimeError(
+                f"Portfolio {self.portfolio_file.name} failed to load, not saving"
+            )
         try:
-            with open(self.portfolio_file, "w") as f:
-                json.dump({"entries": self._entries}, f, indent=2, default=str)
-                _LOGGER.debug("Saved %d portfolio entries", len(self._entries))
-        except Exception as err:
-            _LOGGER.error("Error saving portfolio entries: %s", err)
+            offset = append_events(self.ledger_file, events)
+        except OSError as err:
+            if snapshot is None:
+                raise
+            # A snapshot still holds the state; only the history has a gap
+            _LOGGER.error("Error appending %d ledger events: %s", len(events), err)
+            offset = self.ledger_file.stat().st_size if self.ledger_file.exists() else 0
+        else:
+            events.clear()
+        if snapshot is not None:
+            snapshot["ledger"]["offset"] = offset
+            write_json_atomic(path, snapshot)
+            self._snapshot_offset = offset
+        self._tail_bytes = offset - self._snapshot_offset
+
+    def _save_failed(
+        self, data: Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]
+    ) -> None:
+        """Keep what a failed save did not write for the next one."""
+        events, snapshot = data
+        self._pending_events[:0] = events
+        if snapshot is not None:
+            self._snapshot_due = True
+        else:
+            self._tail_events -= len(events)
+
+    def set_storage_mode(self, storage_mode: str) -> None:
+        """Switch between snapshot and journal storage."""
+        if storage_mode == self.storage_mode:
+            return
+        self.storage_mode = storage_mode
+        if storage_mode == STORAGE_MODE_SNAPSHOT and self._tail_bytes:
+            # Fold the journal into a snapshot instead of waiting for the next change
+            self._writer.async_schedule()
+
+    def _save_entries(self) -> None:
+        """Schedule a delayed, coalesced save of the entries."""
+        self.revision += 1
+        self._writer.async_schedule()
+
+    async def async_flush(self) -> None:
+        """Write any pending changes to disk now."""
+        await self._writer.async_flush()
 
     def add_entry(
         self,
@@ -50,26 +556,63 @@ class PortfolioManager:
         amount_grams: float,
         purchase_price_eur: Optional[float] = None,
         purchase_price_per_gram: Optional[float] = None,
-    ) -> Dict[str, Any]:
+        metal: str = DEFAULT_METAL,
+    ) -> PortfolioLot:
         """Add a new portfolio entry."""
-        entry_id = str(int(datetime.now().timestamp() * 1000))
+        lot = self._insert_lot(
+            purchase_date, amount_grams, purchase_price_eur, purchase_price_per_gram, metal
+        )
+        self._check_totals()
+        self._save_entries()
+        _LOGGER.debug("Added portfolio entry: %s", lot.id)
+        return lot
+
+    def add_entries(self, rows: Iterable[Mapping[str, Any]]) -> List[PortfolioLot]:
+        """Add many validated entries with a single save.
+
+        Each row takes the keyword arguments of `add_entry`.
+        """
+        lots = [
+            self._insert_lot(
+                row["purchase_date"],
+                row["amount_grams"],
+                row.get("purchase_price_eur"),
+                row.get("purchase_price_per_gram"),
+                row.get("metal", DEFAULT_METAL),
+            )
+            for row in rows
+        ]
+        if lots:
+            self._check_totals()
+            self._save_entries()
+            _LOGGER.debug("Added %d portfolio entries", len(lots))
+        return lots
+
+    def _insert_lot(
+        self,
+        purchase_date: str,
+        amount_grams: float,
+        purchase_price_eur: Optional[float],
+        purchase_price_per_gram: Optional[float],
+        metal: str,
+    ) -> PortfolioLot:
+        """Record a buy event for a lot with a fresh id."""
+        entry_id = self._next_entry_id()
 
         # If per-gram price provided, calculate total price
         if purchase_price_per_gram is not None and purchase_price_eur is None:
             purchase_price_eur = purchase_price_per_gram * amount_grams
 
-        entry = {
-            "id": entry_id,
-            "purchase_date": purchase_date,
-            "amount_grams": float(amount_grams),
-            "purchase_price_eur": float(purchase_price_eur or 0),
-            "created_at": datetime.now().isoformat(),
-        }
-
-        self._entries.append(entry)
-        self._save_entries()
-        _LOGGER.debug("Added portfolio entry: %s", entry_id)
-        return entry
+        lot = PortfolioLot(
+            entry_id,
+            purchase_date,
+            float(amount_grams),
+            float(purchase_price_eur or 0),
+            datetime.now().isoformat(),
+            metal,
+        )
+        self._commit(EVENT_BUY, lot=lot.as_dict())
+        return self._lots[entry_id]
 
     def update_entry(
         self,
@@ -77,96 +620,303 @@ class PortfolioManager:
         purchase_date: Optional[str] = None,
         amount_grams: Optional[float] = None,
         purchase_price_eur: Optional[float] = None,
-    ) -> Optional[Dict[str, Any]]:
-        """Update a portfolio entry."""
-        for entry in self._entries:
-            if entry["id"] == entry_id:
-                if purchase_date is not None:
-                    entry["purchase_date"] = purchase_date
-                if amount_grams is not None:
-                    entry["amount_grams"] = float(amount_grams)
-                if purchase_price_eur is not None:
-                    entry["purchase_price_eur"] = float(purchase_price_eur)
-
-                self._save_entries()
-                _LOGGER.debug("Updated portfolio entry: %s", entry_id)
-                return entry
-
-        _LOGGER.warning("Portfolio entry not found: %s", entry_id)
-        return None
+        metal: Optional[str] = None,
+    ) -> Optional[PortfolioLot]:
+        """Update a portfolio entry (an adjust event).
+
+        Amount, price and metal of a lot with sales are fixed, since realized
+        gains were computed from them.
+        """
+        lot = self._lots.get(entry_id)
+        if lot is None:
+            _LOGGER.warning("Portfolio entry not found: %s", entry_id)
+            return None
+
+        changes: Dict[str, Any] = {}
+        if purchase_date is not None:
+            changes["purchase_date"] = purchase_date
+        if amount_grams is not None:
+            changes["amount_grams"] = float(amount_grams)
+        if purchase_price_eur is not None:
+            changes["purchase_price_eur"] = float(purchase_price_eur)
+        if metal is not None:
+            changes["metal"] = metal
+        if lot.sold_grams and changes.keys() - {"purchase_date"}:
+            raise ValueError(
+                f"Portfolio entry {entry_id} was partly sold, only its date can change"
+            )
+        if not changes:
+            return lot
+
+        self._commit(EVENT_ADJUST, lot_id=entry_id, changes=changes)
+        self._check_totals()
+        self._save_entries()
+        _LOGGER.debug("Updated portfolio entry: %s", entry_id)
+        return lot
 
     def remove_entry(self, entry_id: str) -> bool:
         """Remove a portfolio entry."""
-        for i, entry in enumerate(self._entries):
-            if entry["id"] == entry_id:
-                self._entries.pop(i)
-                self._save_entries()
-                _LOGGER.debug("Removed portfolio entry: %s", entry_id)
-                return True
-
-        _LOGGER.warning("Portfolio entry not found: %s", entry_id)
-        return False
-
-    def get_entries(self) -> List[Dict[str, Any]]:
-        """Get all portfolio entries."""
-        return self._entries.copy()
-
-    def get_entry(self, entry_id: str) -> Optional[Dict[str, Any]]:
-        """Get a specific portfolio entry."""
-        for entry in self._entries:
-            if entry["id"] == entry_id:
-                return entry.copy()
-        return None
+        if entry_id not in self._lots:
+            _LOGGER.warning("Portfolio entry not found: %s", entry_id)
+            return False
+
+        self._commit(EVENT_ADJUST, lot_id=entry_id, removed=True)
+        self._check_totals()
+        self._save_entries()
+        _LOGGER.debug("Removed portfolio entry: %s", entry_id)
+        return True
+
+    def sell(
+        self,
+        metal: str,
+        amount_grams: float,
+        proceeds_eur: float,
+        sale_date: str,
+        lot_id: Optional[str] = None,
+        cost_basis: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Record a sale and return its ledger event.
+
+        The grams come out of `lot_id`, or out of the metal's lots oldest
+        first. The realized gain uses the cost of those grams (fifo) or the
+        metal's average cost (average). Lots sold completely are closed.
+        """
+        method = cost_basis or self.cost_basis
+        if lot_id is not None:
+            lot = self._lots.get(lot_id)
+            if lot is None:
+                raise ValueError(f"Portfolio entry not found: {lot_id}")
+            metal = lot.metal
+            candidates: Iterable[str] = [lot_id]
+            held = lot.amount_grams
+        else:
+            candidates = self._fifo.lot_ids(metal)
+            held = self._totals.get(metal, _metal_totals())[0]
+        if amount_grams <= 0 or amount_grams > held + GRAMS_EPSILON:
+            raise ValueError(f"Cannot sell {amount_grams:g} g {metal}, {held:g} g held")
+
+        fills = []
+        remaining = amount_grams
+        for candidate in candidates:
+            lot = self._lots[candidate]
+            grams = min(lot.amount_grams, remaining)
+            if lot.amount_grams - grams <= GRAMS_EPSILON:
+                fills.append([candidate, lot.amount_grams, lot.purchase_price_eur])
+            else:
+                fills.append(
+                    [candidate, grams, lot.purchase_price_eur * grams / lot.amount_grams]
+                )
+            remaining -= grams
+            if remaining <= GRAMS_EPSILON:
+                break
+
+        lots_cost = math.fsum(fill[2] for fill in fills)
+        if method == COST_BASIS_AVERAGE:
+            grams_held, investment, _ = self._totals[metal]
+            investment += self._basis_adjustment.get(metal, 0.0)
+            basis = investment * amount_grams / grams_held
+        else:
+            basis = lots_cost
+
+        event = self._commit(
+            EVENT_SELL,
+            date=sale_date,
+            metal=metal,
+            grams=float(amount_grams),
+            proceeds_eur=float(proceeds_eur),
+            cost_basis=method,
+            basis_eur=basis,
+            realized_gain_eur=float(proceeds_eur) - basis,
+            basis_adjustment_eur=lots_cost - basis,
+            fills=fills,
+        )
+        self._check_totals()
+        self._save_entries()
+        _LOGGER.debug("Sold %s g %s from %d lots", amount_grams, metal, len(fills))
+        return event
+
+    async def async_ledger_events(self) -> List[Dict[str, Any]]:
+        """Return all ledger events, including sold and removed lots."""
+        await self.async_flush()
+        pending = list(self._pending_events)
+        events, _ = await self.hass.async_add_executor_job(
+            partial(read_events, self.ledger_file, 0, 0, repair=False)
+        )
+        # Events a failed flush left pending are not in the file yet
+        seq = events[-1]["seq"] if events else 0
+        return events + [event for event in pending if event["seq"] > seq]
+
+    def get_entries(self) -> List[PortfolioLot]:
+        """Get all portfolio entries as read-only views."""
+        return list(self._lots.values())
+
+    def get_entries_page(self, offset: int, limit: int) -> List[PortfolioLot]:
+        """Return up to `limit` lots from `offset`, in insertion order."""
+        return list(islice(self._lots.values(), offset, offset + limit))
+
+    def get_entry(self, entry_id: str) -> Optional[PortfolioLot]:
+        """Get a read-only view of a specific portfolio entry."""
+        return self._lots.get(entry_id)
 
     def get_total_grams(self) -> float:
         """Get total grams across all entries."""
-        return sum(entry["amount_grams"] for entry in self._entries)
+        return math.fsum(totals[0] for totals in self._totals.values())
 
     def get_total_investment(self) -> float:
-        """Get total investment in EUR."""
-        return sum(entry["purchase_price_eur"] for entry in self._entries)
+        """Get the cost basis of the holdings in EUR."""
+        return math.fsum(
+            [totals[1] for totals in self._totals.values()]
+            + list(self._basis_adjustment.values())
+        )
+
+    def get_realized_gains(self) -> Dict[str, float]:
+        """Get the realized gain per metal in EUR."""
+        return dict(self._realized)
+
+    def get_entry_count(self) -> int:
+        """Get the number of portfolio entries."""
+        return len(self._lots)
+
+    def get_metals(self) -> List[str]:
+        """Get the metals held in the portfolio."""
+        return list(self._totals)
+
+    def _prices_by_metal(self, current_price_per_gram: PricesPerGram) -> Dict[str, float]:
+        """Normalize a price argument to a metal -> per-gram price mapping."""
+        if current_price_per_gram is None:
+            return {}
+        if isinstance(current_price_per_gram, Mapping):
+            return dict(current_price_per_gram)
+        return {metal: current_price_per_gram for metal in self._totals}
 
     def calculate_entry_value(
-        self, entry_id: str, current_price_per_gram: float
+        self, entry_id: str, current_price_per_gram: PricesPerGram
     ) -> Optional[Dict[str, Any]]:
         """Calculate current value and gain for an entry."""
-        entry = self.get_entry(entry_id)
-        if not entry:
+        lot = self._lots.get(entry_id)
+        if lot is None:
             return None
 
-        current_value = entry["amount_grams"] * current_price_per_gram
-        gain_eur = current_value - entry["purchase_price_eur"]
-        gain_percent = (
-            (gain_eur / entry["purchase_price_eur"] * 100)
-            if entry["purchase_price_eur"] > 0
-            else 0
-        )
+        price = self._prices_by_metal(current_price_per_gram).get(lot.metal)
+        if price is None:
+            current_value = gain_eur = gain_percent = None
+        else:
+            current_value = lot.amount_grams * price
+            gain_eur = current_value - lot.purchase_price_eur
+            gain_percent = (
+                (gain_eur / lot.purchase_price_eur * 100)
+                if lot.purchase_price_eur > 0
+                else 0
+            )
 
         return {
             "entry_id": entry_id,
-            "amount_grams": entry["amount_grams"],
-            "purchase_date": entry["purchase_date"],
-            "purchase_price_eur": entry["purchase_price_eur"],
-            "current_price_per_gram": current_price_per_gram,
-            "current_value_eur": round(current_value, 2),
-            "gain_eur": round(gain_eur, 2),
-            "gain_percent": round(gain_percent, 2),
+            "metal": lot.metal,
+            "amount_grams": lot.amount_grams,
+            "purchase_date": lot.purchase_date,
+            "purchase_price_eur": lot.purchase_price_eur,
+            "current_price_per_gram": price,
+            "current_value_eur": _round(current_value),
+            "gain_eur": _round(gain_eur),
+            "gain_percent": _round(gain_percent),
         }
 
-    def calculate_portfolio_value(self, current_price_per_gram: float) -> Dict[str, Any]:
-        """Calculate total portfolio value and gain."""
+    def calculate_portfolio_value(self, current_price_per_gram: PricesPerGram) -> Dict[str, Any]:
+        """Calculate total portfolio value and gain.
+
+        Metals without a price are left out of value and gain (and listed
+        under `unpriced_metals`); with no prices at all both are None.
+        """
+        prices = self._prices_by_metal(current_price_per_gram)
         total_grams = self.get_total_grams()
         total_investment = self.get_total_investment()
-        current_value = total_grams * current_price_per_gram
-        gain_eur = current_value - total_investment
-        gain_percent = (gain_eur / total_investment * 100) if total_investment > 0 else 0
 
-        return {
+        metals = {}
+        values = []
+        priced_investment = []
+        unpriced = []
+        for metal, (grams, investment, count) in self._totals.items():
+            investment += self._basis_adjustment.get(metal, 0.0)
+            price = prices.get(metal)
+            value = grams * price if price is not None else None
+            if value is None:
+                unpriced.append(metal)
+            else:
+                values.append(value)
+                priced_investment.append(investment)
+            metals[metal] = {
+                "total_grams": round(grams, 2),
+                "total_investment_eur": round(investment, 2),
+                "current_value_eur": _round(value),
+                "entry_count": count,
+                "realized_gain_eur": round(self._realized.get(metal, 0.0), 2),
+            }
+
+        if values or not self._totals:
+            current_value = math.fsum(values)
+            invested = math.fsum(priced_investment)
+            gain_eur = current_value - invested
+            gain_percent = (gain_eur / invested * 100) if invested > 0 else 0
+        else:
+            current_value = gain_eur = gain_percent = None
+
+        result = {
             "total_grams": round(total_grams, 2),
             "total_investment_eur": round(total_investment, 2),
-            "current_price_per_gram": current_price_per_gram,
-            "current_value_eur": round(current_value, 2),
-            "gain_eur": round(gain_eur, 2),
-            "gain_percent": round(gain_percent, 2),
-            "entry_count": len(self._entries),
+            "current_price_per_gram": prices.get(DEFAULT_METAL),
+            "current_value_eur": _round(current_value),
+            "gain_eur": _round(gain_eur),
+            "gain_percent": _round(gain_percent),
+            "entry_count": self.get_entry_count(),
+            "realized_gain_eur": round(math.fsum(self._realized.values()), 2),
+            "metals": metals,
         }
+        if unpriced and values:
+            result["unpriced_metals"] = unpriced
+        return result
+
+    def calculate_snapshot(
+        self,
+        current_price_per_gram: PricesPerGram,
+        price_timestamp: Any = None,
+        version: int = 0,
+    ) -> ValuationSnapshot:
+        """Value all lots and the totals in a single pass."""
+        prices = self._prices_by_metal(current_price_per_gram)
+        totals = self.calculate_portfolio_value(prices)
+        if self._columns is not None:
+            entries = self._columns.valuate(prices)
+        else:
+            entries = {}
+            for lot in self._lots.values():
+                price = prices.get(lot.metal)
+                if price is None:
+                    entries[lot.id] = (lot.amount_grams, None, None, None)
+                    continue
+                current_value = lot.amount_grams * price
+                gain_eur = current_value - lot.purchase_price_eur
+                gain_percent = (
+                    (gain_eur / lot.purchase_price_eur * 100)
+                    if lot.purchase_price_eur > 0
+                    else 0
+                )
+                entries[lot.id] = (
+                    lot.amount_grams,
+                    round(current_value, 2),
+                    round(gain_eur, 2),
+                    round(gain_percent, 2),
+                )
+
+        return ValuationSnapshot(
+            version,
+            self.revision,
+            prices,
+            price_timestamp,
+            totals,
+            entries,
+        )
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    """Round a money/percent figure, passing None through."""
+    return None if value is None else round(value, 2)
@@ -0,0 +1,215 @@
+"""Historical price cache for Gold Portfolio Tracker."""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .api import RateLimitError
+from .const import (
+    DEFAULT_SYMBOL,
+    HISTORY_BATCH_CONCURRENCY,
+    HISTORY_CACHE_FILE,
+    HISTORY_CACHE_SIZE,
+    HISTORY_TODAY_TTL,
+)
+from .storage import DelayedJSONWriter, load_json_file
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class HistoricalPriceCache:
+    """Two-level cache of historical metal prices.
+
+    A size-bounded in-memory LRU sits in front of a symbol -> date -> price
+    file in `.storage`. A past date's price never changes, so it is cached forever
+    and persisted. Today's (still moving) price is only kept in memory for
+    HISTORY_TODAY_TTL seconds.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_size: int = HISTORY_CACHE_SIZE) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self.max_size = max_size
+        self._lru: "OrderedDict[Tuple[str, str], Tuple[float, float]]" = OrderedDict()
+        self._stored: Optional[Dict[str, Dict[str, float]]] = None
+        self._load_lock = asyncio.Lock()
+        # Fetches in flight, shared by concurrent lookups of the same date
+        self._inflight: Dict[Tuple[str, str], "asyncio.Future[Optional[float]]"] = {}
+        path = Path(hass.config.path(".storage", HISTORY_CACHE_FILE))
+        self._writer = DelayedJSONWriter(hass, path, self._data_to_save)
+
+    def _data_to_save(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Return the persisted prices for the writer."""
+        return {
+            "prices": {symbol: dict(prices) for symbol, prices in (self._stored or {}).items()}
+        }
+
+    async def _async_load(self) -> Dict[str, Dict[str, float]]:
+        """Load the persisted prices on first use."""
+        if self._stored is not None:
+            return self._stored
+        async with self._load_lock:
+            if self._stored is None:
+                try:
+                    data = await self.hass.async_add_executor_job(
+                        load_json_file, self._writer.path, {}
+                    )
+                    self._stored = {}
+                    for key, value in data.get("prices", {}).items():
+                        if isinstance(value, dict):
+                            self._stored[key] = {
+                                day: float(price) for day, price in value.items()
+                            }
+                        else:
+                            # Files from before multi-metal support: XAU/EUR by date
+                            self._stored.setdefault(DEFAULT_SYMBOL, {})[key] = float(value)
+                    _LOGGER.debug(
+                        "Loaded %d cached historical prices",
+                        sum(len(prices) for prices in self._stored.values()),
+                    )
+                except Exception as err:
+                    _LOGGER.error("Error loading historical price cache: %s", err)
+                    self._stored = {}
+        return self._stored
+
+    def _remember(self, key: Tuple[str, str], price: float) -> None:
+        """Put a price into the LRU, evicting the least recently used."""
+        self._lru[key] = (price, time.monotonic())
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_size:
+            self._lru.popitem(last=False)
+
+    def _is_past(self, date: str) -> bool:
+        """Return True if the date lies before today."""
+        return date < dt_util.now().date().isoformat()
+
+    async def async_lookup(
+        self, date: str, symbol: str = DEFAULT_SYMBOL
+    ) -> Optional[float]:
+        """Return a cached price or None."""
+        key = (symbol, date)
+        cached = self._lru.get(key)
+        if cached is not None:
+            price, fetched_at = cached
+            if self._is_past(date) or time.monotonic() - fetched_at < HISTORY_TODAY_TTL:
+                self._lru.move_to_end(key)
+                return price
+            del self._lru[key]
+
+        if self._is_past(date):
+            price = (await self._async_load()).get(symbol, {}).get(date)
+            if price is not None:
+                self._remember(key, price)
+                return price
+        return None
+
+    async def async_stored_prices(self, symbol: str = DEFAULT_SYMBOL) -> Dict[str, float]:
+        """Return a copy of all persisted past prices of a symbol by date."""
+        return dict((await self._async_load()).get(symbol, {}))
+
+    async def async_store(
+        self, date: str, price: float, symbol: str = DEFAULT_SYMBOL
+    ) -> None:
+        """Cache a freshly fetched price."""
+        self._remember((symbol, date), price)
+        if self._is_past(date):
+            stored = await self._async_load()
+            stored.setdefault(symbol, {})[date] = price
+            self._writer.async_schedule()
+
+    async def async_get(
+        self,
+        date: str,
+        fetch: Callable[[str], Awaitable[Optional[float]]],
+        symbol: str = DEFAULT_SYMBOL,
+    ) -> Tuple[Optional[float], bool]:
+        """Return (price, from_cache), calling fetch(date) on a miss."""
+        price = await self.async_lookup(date, symbol)
+        if price is not None:
+            return price, True
+
+        key = (symbol, date)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight), False
+
+        future = self.hass.loop.create_future()
+        self._inflight[key] = future
+        try:
+            price = await fetch(date)
+            if price is not None:
+                await self.async_store(date, price, symbol)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as err:
+            future.set_exception(err)
+            # Retrieve it so an unawaited future doesn't log a warning
+            future.exception()
+            raise
+        else:
+            future.set_result(price)
+        finally:
+            del self._inflight[key]
+        return price, False
+
+    async def async_get_many(
+        self,
+        dates: Iterable[str],
+        fetch: Callable[[str], Awaitable[Optional[float]]],
+        max_concurrency: int = HISTORY_BATCH_CONCURRENCY,
+        symbol: str = DEFAULT_SYMBOL,
+    ) -> Tuple[Dict[str, float], List[str], Dict[str, str]]:
+        """Look up many dates, fetching misses concurrently.
+
+        Returns (prices, dates served from cache, errors by date). Once the API
+        reports a rate limit or the scheduler defers a request, no further
+        requests are started; the remaining dates get the same error.
+        """
+        prices: Dict[str, float] = {}
+        cached: List[str] = []
+        errors: Dict[str, str] = {}
+        misses: List[str] = []
+
+        for date in dict.fromkeys(dates):
+            price = await self.async_lookup(date, symbol)
+            if price is not None:
+                prices[date] = price
+                cached.append(date)
+            else:
+                misses.append(date)
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+        rate_limited: Optional[str] = None
+
+        async def _fetch_one(date: str) -> None:
+            nonlocal rate_limited
+            async with semaphore:
+                if rate_limited is not None:
+                    errors[date] = f"{rate_limited} (not requested)"
+                    return
+                try:
+                    price, _ = await self.async_get(date, fetch, symbol)
+                except RateLimitError as err:
+                    rate_limited = str(err)
+                    errors[date] = rate_limited
+                    return
+                except Exception as err:
+                    errors[date] = str(err)
+                    return
+                if price is None:
+                    errors[date] = f"Could not retrieve price for {date}"
+                else:
+                    prices[date] = price
+
+        await asyncio.gather(*(_fetch_one(date) for date in misses))
+        return prices, cached, errors
+
+    async def async_flush(self) -> None:
+        """Write pending prices to disk now."""
+        await self._writer.async_flush()
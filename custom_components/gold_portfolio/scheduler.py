@@ -0,0 +1,283 @@
+"""Quota-aware request scheduling for the Gold API."""
+import asyncio
+import hashlib
+import heapq
+import itertools
+import logging
+import random
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from homeassistant.core import HomeAssistant, callback
+
+from .api import RateLimitError
+from .const import (
+    API_MONTHLY_QUOTA_DEFAULT,
+    API_RATE_LIMIT_PER_MINUTE,
+    API_USAGE_FILE,
+    PRIORITY_BACKFILL,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_LIVE,
+)
+from .storage import DelayedJSONWriter, load_json_file
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+SECONDS_PER_MONTH = 30 * 24 * 3600
+# Share of the monthly quota that lower priorities must leave untouched
+QUOTA_RESERVE = {
+    PRIORITY_LIVE: 0.0,
+    PRIORITY_INTERACTIVE: 0.05,
+    PRIORITY_BACKFILL: 0.2,
+}
+# Longest a request may be deferred before it fails. Backfills come from
+# service calls waiting for a response, so they fail instead of waiting
+# for the monthly bucket to refill; callers report them as deferred.
+MAX_WAIT = {
+    PRIORITY_LIVE: 120,
+    PRIORITY_INTERACTIVE: 60,
+    PRIORITY_BACKFILL: 300,
+}
+MAX_RETRIES = 3
+BACKOFF_BASE = 2.0
+BACKOFF_MAX = 300.0
+
+
+class QuotaExceededError(RateLimitError):
+    """Raised when a request cannot be scheduled within its maximum wait.
+
+    `retry_after` is the number of seconds until it could be admitted.
+    """
+
+
+def api_key_fingerprint(api_key: str) -> str:
+    """Return a short, non-reversible id for an API key."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:12]
+
+
+class ApiUsageStore:
+    """Persisted request counters and quota buckets, keyed by API key fingerprint."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store."""
+        self.hass = hass
+        self.data: Dict[str, Dict[str, Any]] = {}
+        path = Path(hass.config.path(".storage", API_USAGE_FILE))
+        self._writer = DelayedJSONWriter(hass, path, self._data_to_save)
+
+    async def async_load(self) -> None:
+        """Load the counters."""
+        try:
+            stored = await self.hass.async_add_executor_job(
+                load_json_file, self._writer.path, {}
+            )
+            self.data = stored.get("usage", {})
+        except Exception as err:
+            _LOGGER.error("Error loading API usage: %s", err)
+            self.data = {}
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return the counters for the writer."""
+        return {"usage": {key: dict(value) for key, value in self.data.items()}}
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Schedule a delayed save."""
+        self._writer.async_schedule()
+
+    async def async_flush(self) -> None:
+        """Write pending counters now."""
+        await self._writer.async_flush()
+
+
+class QuotaScheduler:
+    """Single gate for every request made with one API key.
+
+    Two token buckets apply: a short-term one for the per-minute rate limit
+    and one sized to the monthly plan quota. Waiting requests are served by
+    priority (live price before interactive lookups before backfills).
+    Lower priorities keep a reserve of the monthly quota free; a request
+    that cannot be admitted within its maximum wait is deferred with
+    QuotaExceededError instead of being sent. A 429 blocks the key for
+    its Retry-After (or a jittered exponential backoff) and the request is
+    retried.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api_key: str,
+        usage_store: ApiUsageStore,
+        monthly_quota: int = API_MONTHLY_QUOTA_DEFAULT,
+        rate_per_minute: int = API_RATE_LIMIT_PER_MINUTE,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self.monthly_quota = monthly_quota
+        self.rate_per_minute = rate_per_minute
+        self._usage_store = usage_store
+        self._usage = usage_store.data.setdefault(api_key_fingerprint(api_key), {})
+        self._rate_tokens = float(rate_per_minute)
+        self._rate_updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiters: List[Tuple[int, int, float, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def usage(self) -> Dict[str, Any]:
+        """Return request counters for this API key."""
+        self._roll_counters()
+        return {
+            "requests_today": self._usage.get("day_count", 0),
+            "requests_this_month": self._usage.get("month_count", 0),
+            "monthly_quota": self.monthly_quota or None,
+            "quota_remaining": (
+                int(self._quota_tokens()) if self.monthly_quota else None
+            ),
+        }
+
+    async def async_call(
+        self, priority: int, request: Callable[[], Awaitable[_T]]
+    ) -> _T:
+        """Run a request once the scheduler admits it, retrying on 429."""
+        attempt = 0
+        while True:
+            await self._async_acquire(priority)
+            try:
+                return await request()
+            except RateLimitError as err:
+                attempt += 1
+                delay = self._backoff(getattr(err, "retry_after", None), attempt)
+                self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+                self._rate_tokens = 0.0
+                if attempt > MAX_RETRIES or delay > MAX_WAIT[priority]:
+                    raise
+                _LOGGER.warning(
+                    "Gold API rate limited, retrying in %.0f s (attempt %d)", delay, attempt
+                )
+
+    def _backoff(self, retry_after: Optional[float], attempt: int) -> float:
+        """Return the delay before retrying after a 429."""
+        if retry_after is not None:
+            return min(float(retry_after), BACKOFF_MAX) + random.uniform(0, 1)
+        delay = min(BACKOFF_BASE * 2 ** attempt, BACKOFF_MAX)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def _async_acquire(self, priority: int) -> None:
+        """Wait until a request of this priority may be sent."""
+        future = self.hass.loop.create_future()
+        deadline = time.monotonic() + MAX_WAIT[priority]
+        heapq.heappush(self._waiters, (priority, next(self._sequence), deadline, future))
+        self._dispatch()
+        await future
+
+    @callback
+    def _dispatch(self) -> None:
+        """Admit waiting requests in priority order."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._waiters:
+            priority, _, deadline, future = self._waiters[0]
+            if future.done():
+                # Caller gave up (cancelled)
+                heapq.heappop(self._waiters)
+                continue
+
+            wait = self._wait_time(priority)
+            now = time.monotonic()
+            if wait <= 0:
+                heapq.heappop(self._waiters)
+                self._consume()
+                future.set_result(None)
+                continue
+            if now + wait > deadline:
+                heapq.heappop(self._waiters)
+                future.set_exception(
+                    QuotaExceededError(
+                        f"API budget exhausted - request deferred, retry in {wait:.0f} s",
+                        wait,
+                    )
+                )
+                continue
+
+            self._timer = self.hass.loop.call_later(wait, self._dispatch)
+            break
+
+    @callback
+    def async_cancel_waiters(self) -> None:
+        """Fail every queued request, e.g. when the last feed of the key stops."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._waiters:
+            _, _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_exception(
+                    QuotaExceededError("Price feed stopped - request not sent")
+                )
+
+    def _refill_rate(self) -> None:
+        """Refill the per-minute bucket."""
+        now = time.monotonic()
+        self._rate_tokens = min(
+            float(self.rate_per_minute),
+            self._rate_tokens + (now - self._rate_updated) * self.rate_per_minute / 60,
+        )
+        self._rate_updated = now
+
+    def _quota_tokens(self) -> float:
+        """Return the refilled monthly quota bucket."""
+        now = time.time()
+        tokens = self._usage.get("quota_tokens", float(self.monthly_quota))
+        updated = self._usage.get("quota_updated", now)
+        tokens = min(
+            float(self.monthly_quota),
+            tokens + (now - updated) * self.monthly_quota / SECONDS_PER_MONTH,
+        )
+        self._usage["quota_tokens"] = tokens
+        self._usage["quota_updated"] = now
+        return tokens
+
+    def _wait_time(self, priority: int) -> float:
+        """Return seconds until a request of this priority can be admitted."""
+        self._refill_rate()
+        wait = max(0.0, self._blocked_until - time.monotonic())
+        if self._rate_tokens < 1:
+            wait = max(wait, (1 - self._rate_tokens) * 60 / self.rate_per_minute)
+        if self.monthly_quota:
+            needed = 1 + QUOTA_RESERVE[priority] * self.monthly_quota
+            tokens = self._quota_tokens()
+            if tokens < needed:
+                wait = max(
+                    wait, (needed - tokens) * SECONDS_PER_MONTH / self.monthly_quota
+                )
+        return wait
+
+    def _roll_counters(self) -> None:
+        """Reset day/month counters when the period changed."""
+        now = datetime.now()
+        day = now.strftime("%Y-%m-%d")
+        month = now.strftime("%Y-%m")
+        if self._usage.get("day") != day:
+            self._usage["day"] = day
+            self._usage["day_count"] = 0
+        if self._usage.get("month") != month:
+            self._usage["month"] = month
+            self._usage["month_count"] = 0
+
+    def _consume(self) -> None:
+        """Take a token from both buckets and count the request."""
+        self._rate_tokens -= 1
+        if self.monthly_quota:
+            self._usage["quota_tokens"] = self._quota_tokens() - 1
+        self._roll_counters()
+        self._usage["day_count"] += 1
+        self._usage["month_count"] += 1
+        self._usage_store.async_schedule_save()
@@ -1,19 +1,48 @@
 """Sensors for Gold Portfolio Tracker."""
 import logging
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 
 from homeassistant.components.sensor import SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
 )
 
-from .const import DOMAIN, TROY_OZ_TO_GRAM
+from .const import (
+    CONF_COST_BASIS,
+    CONF_EMA_WINDOW,
+    CONF_ENTITY_MODE,
+    CONF_RANGE_WINDOW,
+    CONF_SMA_WINDOW,
+    CONF_SYMBOLS,
+    CONF_THRESHOLD_EUR,
+    CONF_THRESHOLD_PERCENT,
+    CONF_TRACKED_LOTS,
+    CONF_VOLATILITY_WINDOW,
+    COST_BASIS_FIFO,
+    DEFAULT_SYMBOL,
+    DOMAIN,
+    EMA_WINDOW_DEFAULT,
+    ENTITY_MODE_COMPACT,
+    ENTITY_MODE_PER_LOT,
+    METALS,
+    RANGE_WINDOW_DEFAULT,
+    SIGNAL_PORTFOLIO_UPDATED,
+    SMA_WINDOW_DEFAULT,
+    VOLATILITY_WINDOW_DEFAULT,
+)
+from .analytics import PriceAnalytics
+from .entity_manager import PortfolioEntityManager, lot_unique_id
 from .portfolio import PortfolioManager
+from .scheduler import QuotaScheduler
+from .timing import PhaseTimer
+from .valuation import PortfolioValuator
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -23,6 +52,16 @@ try:
 except ImportError:
     UnitOfPrice = None
 
+_UNSET = object()
+
+# Indicator window options in DailyIndicators argument order
+ANALYTICS_WINDOWS = (
+    (CONF_SMA_WINDOW, SMA_WINDOW_DEFAULT),
+    (CONF_EMA_WINDOW, EMA_WINDOW_DEFAULT),
+    (CONF_VOLATILITY_WINDOW, VOLATILITY_WINDOW_DEFAULT),
+    (CONF_RANGE_WINDOW, RANGE_WINDOW_DEFAULT),
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -33,37 +72,193 @@ async def async_setup_entry(
     coordinator = hass.data[DOMAIN][config_entry.entry_id]["coordinator"]
     api_client = hass.data[DOMAIN][config_entry.entry_id]["api_client"]
 
-    portfolio_manager = PortfolioManager(hass.config.path())
-
+    timer = PhaseTimer(_LOGGER, f"Sensor setup of {config_entry.title}")
+    portfolio_manager = hass.data[DOMAIN][config_entry.entry_id]["portfolio_manager"]
+
+    # One valuation per coordinator update, shared by all sensors. Subscribe
+    # before the entities so the snapshot is fresh when they write state.
+    valuator = PortfolioValuator(coordinator, portfolio_manager)
+    config_entry.async_on_unload(valuator.async_start())
+
+    analytics = PriceAnalytics(
+        hass,
+        coordinator,
+        hass.data[DOMAIN]["hub"].tick_store,
+        config_entry.entry_id,
+        DEFAULT_SYMBOL,
+        [
+            config_entry.options.get(option, default)
+            for option, default in ANALYTICS_WINDOWS
+        ],
+    )
+    await analytics.async_load()
+    config_entry.async_on_unload(analytics.async_start())
+    timer.mark("analytics")
+
+    price_sensors = {
+        symbol: MetalPriceSensor(coordinator, config_entry, symbol)
+        for symbol in config_entry.options.get(CONF_SYMBOLS, [])
+    }
     entities = [
-        GoldPriceSensor(coordinator, config_entry),
-        PortfolioTotalGramsSensor(coordinator, config_entry, portfolio_manager),
-        PortfolioTotalValueSensor(coordinator, config_entry, portfolio_manager),
-        PortfolioTotalGainSensor(coordinator, config_entry, portfolio_manager),
-        PortfolioTotalGainPercentSensor(coordinator, config_entry, portfolio_manager),
+        GoldPriceSensor(coordinator, config_entry, api_client.scheduler),
+        *price_sensors.values(),
+        PortfolioTotalGramsSensor(coordinator, config_entry, valuator),
+        PortfolioTotalValueSensor(coordinator, config_entry, valuator),
+        PortfolioTotalGainSensor(coordinator, config_entry, valuator),
+        PortfolioTotalGainPercentSensor(coordinator, config_entry, valuator),
+        PortfolioRealizedGainSensor(coordinator, config_entry, valuator),
+        PortfolioLotsSensor(coordinator, config_entry, valuator, portfolio_manager),
+        *(
+            PriceAnalyticsSensor(coordinator, config_entry, analytics, kind)
+            for kind in ANALYTICS_SENSORS
+        ),
     ]
 
-    # Add sensors for each portfolio entry
-    for entry in portfolio_manager.get_entries():
-        entry_id = entry["id"]
-        entities.extend([
-            PortfolioEntryGramsSensor(coordinator, config_entry, portfolio_manager, entry_id),
-            PortfolioEntryValueSensor(coordinator, config_entry, portfolio_manager, entry_id),
-            PortfolioEntryGainSensor(coordinator, config_entry, portfolio_manager, entry_id),
-            PortfolioEntryGainPercentSensor(coordinator, config_entry, portfolio_manager, entry_id),
-        ])
-
     async_add_entities(entities)
+    timer.mark("summary entities")
+
+    def lot_entities(entry_id: str) -> list:
+        """Create the sensors of one portfolio entry."""
+        return [
+            sensor_class(coordinator, config_entry, valuator, entry_id)
+            for sensor_class in ENTRY_SENSOR_CLASSES
+        ]
+
+    # Sensors for each portfolio entry, added and removed in batches. In
+    # compact mode only the selected lots get them; the rest are available
+    # through the lots sensor and the get_portfolio_values service.
+    entity_manager = PortfolioEntityManager(
+        hass,
+        config_entry,
+        async_add_entities,
+        lot_entities,
+        _tracked_lots(config_entry),
+    )
+    lot_ids = [entry.id for entry in portfolio_manager.get_entries()]
+    entity_manager.async_migrate_unique_ids()
+    entity_manager.async_add_lots(lot_ids)
+    entity_manager.async_remove_orphans(lot_ids)
+    timer.mark(f"lot entities ({len(entity_manager.lot_ids)} lots)")
+    timer.log()
+
+    hass.data[DOMAIN][config_entry.entry_id]["valuator"] = valuator
+    hass.data[DOMAIN][config_entry.entry_id]["entity_manager"] = entity_manager
+    hass.data[DOMAIN][config_entry.entry_id]["analytics"] = analytics
+    hass.data[DOMAIN][config_entry.entry_id]["summary_entities"] = entities
+    hass.data[DOMAIN][config_entry.entry_id]["price_sensors"] = price_sensors
+    hass.data[DOMAIN][config_entry.entry_id]["add_entities"] = async_add_entities
+
+
+def _tracked_lots(config_entry: ConfigEntry) -> Optional[list]:
+    """Return the lots with entities in compact mode, None in per-lot mode."""
+    mode = config_entry.options.get(CONF_ENTITY_MODE, ENTITY_MODE_PER_LOT)
+    if mode != ENTITY_MODE_COMPACT:
+        return None
+    return config_entry.options.get(CONF_TRACKED_LOTS, [])
+
+
+async def async_apply_options(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Reconfigure the running sensors for changed options without a reload."""
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+    options = config_entry.options
+
+    await entry_data["analytics"].async_set_windows(
+        [options.get(option, default) for option, default in ANALYTICS_WINDOWS]
+    )
+
+    price_sensors = entry_data["price_sensors"]
+    symbols = options.get(CONF_SYMBOLS, [])
+    for symbol in [symbol for symbol in price_sensors if symbol not in symbols]:
+        sensor = price_sensors.pop(symbol)
+        entry_data["summary_entities"].remove(sensor)
+        await sensor.async_remove()
+    new_sensors = {
+        symbol: MetalPriceSensor(entry_data["coordinator"], config_entry, symbol)
+        for symbol in symbols
+        if symbol not in price_sensors
+    }
+    if new_sensors:
+        price_sensors.update(new_sensors)
+        entry_data["summary_entities"].extend(new_sensors.values())
+        entry_data["add_entities"](list(new_sensors.values()))
+
+    lot_ids = [entry.id for entry in entry_data["portfolio_manager"].get_entries()]
+    await entry_data["entity_manager"].async_set_tracked_lots(
+        _tracked_lots(config_entry), lot_ids
+    )
+
+    # Attributes such as windows, entity mode or cost basis may have changed
+    for entity in entry_data["summary_entities"]:
+        if entity.hass is not None:
+            entity.async_write_ha_state()
+
+
+class PortfolioSensorEntity(CoordinatorEntity, SensorEntity):
+    """Coordinator sensor that only writes state when it changed noticeably.
+
+    A coordinator update is skipped unless availability, the state signature
+    or the value changed; numeric values must move by more than the option
+    named in `_threshold_option` (0 = any change). Portfolio changes made by
+    the services are handled like a coordinator update.
+    """
+
+    _threshold_option: Optional[str] = None
+    _config_entry: Optional[ConfigEntry] = None
+    _published_value: Any = _UNSET
+    _published_available: Optional[bool] = None
+    _published_signature: Any = None
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the coordinator and to portfolio changes."""
+        await super().async_added_to_hass()
+        if self._config_entry is not None:
+            self.async_on_remove(
+                async_dispatcher_connect(
+                    self.hass,
+                    SIGNAL_PORTFOLIO_UPDATED.format(self._config_entry.entry_id),
+                    self._handle_coordinator_update,
+                )
+            )
+
+    def _state_signature(self) -> Any:
+        """Return extra state that should trigger a write when it changes."""
+        return None
 
-    # Store portfolio manager in hass.data
-    if DOMAIN not in hass.data:
-        hass.data[DOMAIN] = {}
-    hass.data[DOMAIN][config_entry.entry_id]["portfolio_manager"] = portfolio_manager
-
-
-class GoldPriceSensor(CoordinatorEntity, SensorEntity):
+    def _significant(self, old: Any, new: Any) -> bool:
+        """Return True if the change from old to new is worth publishing."""
+        if old is _UNSET or old is None or new is None:
+            return old is not new
+        threshold = 0.0
+        if self._threshold_option and self._config_entry is not None:
+            threshold = self._config_entry.options.get(self._threshold_option, 0.0)
+        if threshold:
+            return abs(new - old) >= threshold
+        return new != old
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if something visible changed."""
+        if (
+            self.available == self._published_available
+            and self._state_signature() == self._published_signature
+            and not self._significant(self._published_value, self.native_value)
+        ):
+            return
+        self.async_write_ha_state()
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write state and remember what was published."""
+        self._published_value = self.native_value
+        self._published_available = self.available
+        self._published_signature = self._state_signature()
+        super().async_write_ha_state()
+
+
+class GoldPriceSensor(PortfolioSensorEntity):
     """Sensor for current gold price in EUR."""
 
+    _threshold_option = CONF_THRESHOLD_EUR
     _attr_name = "Gold Price"
     _attr_unique_id = "gold_portfolio_price"
     _attr_state_class = SensorStateClass.MEASUREMENT
@@ -71,12 +266,16 @@ class GoldPriceSensor(CoordinatorEntity, SensorEntity):
     _attr_icon = "mdi:gold"
 
     def __init__(
-        self, coordinator: DataUpdateCoordinator, config_entry: ConfigEntry
+        self,
+        coordinator: DataUpdateCoordinator,
+        config_entry: ConfigEntry,
+        scheduler: Optional[QuotaScheduler] = None,
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._attr_unique_id = f"{config_entry.entry_id}_price"
         self._config_entry = config_entry
+        self._scheduler = scheduler
 
     @property
     def native_value(self) -> Optional[float]:
@@ -85,18 +284,109 @@ class GoldPriceSensor(CoordinatorEntity, SensorEntity):
             return self.coordinator.data.get("price")
         return None
 
+    def _state_signature(self) -> Any:
+        """Publish when a stored price gets confirmed."""
+        return bool(self.coordinator.data and self.coordinator.data.get("stale"))
+
     @property
     def extra_state_attributes(self) -> dict:
         """Return extra state attributes."""
         if self.coordinator.data:
-            return {
+            attributes = {
                 "timestamp": self.coordinator.data.get("timestamp"),
                 "currency": self.coordinator.data.get("currency"),
+                "stale": self.coordinator.data.get("stale", False),
             }
+            if self._scheduler is not None:
+                attributes.update(self._scheduler.usage)
+            return attributes
         return {}
 
 
-class PortfolioTotalGramsSensor(CoordinatorEntity, SensorEntity):
+class MetalPriceSensor(PortfolioSensorEntity):
+    """Sensor for an additional metal/currency price per troy ounce."""
+
+    _threshold_option = CONF_THRESHOLD_EUR
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:gold"
+
+    def __init__(
+        self, coordinator: DataUpdateCoordinator, config_entry: ConfigEntry, symbol: str
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        metal, _, currency = symbol.partition("/")
+        self._symbol = symbol
+        self._config_entry = config_entry
+        self._attr_name = f"{METALS.get(metal, metal)} Price ({currency})"
+        self._attr_unique_id = f"{config_entry.entry_id}_price_{metal.lower()}_{currency.lower()}"
+        self._attr_native_unit_of_measurement = f"{currency}/oz"
+
+    @property
+    def native_value(self) -> Optional[float]:
+        """Return the state of the sensor."""
+        if self.coordinator.data:
+            quote = self.coordinator.data.get("prices", {}).get(self._symbol)
+            if quote:
+                return quote.get("price")
+        return None
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return extra state attributes."""
+        if self.coordinator.data:
+            quote = self.coordinator.data.get("prices", {}).get(self._symbol) or {}
+            return {
+                "symbol": self._symbol,
+                "timestamp": quote.get("timestamp"),
+                "currency": quote.get("currency"),
+            }
+        return {}
+
+
+class PriceAnalyticsSensor(PortfolioSensorEntity):
+    """Sensor for a gold price indicator computed over daily closes."""
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(
+        self,
+        coordinator: DataUpdateCoordinator,
+        config_entry: ConfigEntry,
+        analytics: PriceAnalytics,
+        kind: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        name, window_option, unit, icon, threshold_option = ANALYTICS_SENSORS[kind]
+        self._kind = kind
+        self._analytics = analytics
+        self._config_entry = config_entry
+        self._window_option = window_option
+        self._threshold_option = threshold_option
+        self._attr_name = name
+        self._attr_unique_id = f"{config_entry.entry_id}_analytics_{kind}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_icon = icon
+
+    @property
+    def native_value(self) -> Optional[float]:
+        """Return the state of the sensor."""
+        return self._analytics.values().get(self._kind)
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return extra state attributes."""
+        if self._window_option is None:
+            return {}
+        return {
+            "window_days": self._config_entry.options.get(
+                self._window_option, dict(ANALYTICS_WINDOWS)[self._window_option]
+            )
+        }
+
+
+class PortfolioTotalGramsSensor(PortfolioSensorEntity):
     """Sensor for total grams in portfolio."""
 
     _attr_name = "Portfolio Total Grams"
@@ -109,23 +399,24 @@ class PortfolioTotalGramsSensor(CoordinatorEntity, SensorEntity):
         self,
         coordinator: DataUpdateCoordinator,
         config_entry: ConfigEntry,
-        portfolio_manager: PortfolioManager,
+        valuator: PortfolioValuator,
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._attr_unique_id = f"{config_entry.entry_id}_total_grams"
         self._config_entry = config_entry
-        self._portfolio_manager = portfolio_manager
+        self._valuator = valuator
 
     @property
     def native_value(self) -> float:
         """Return the state of the sensor."""
-        return self._portfolio_manager.get_total_grams()
+        return self._valuator.snapshot.totals["total_grams"]
 
 
-class PortfolioTotalValueSensor(CoordinatorEntity, SensorEntity):
+class PortfolioTotalValueSensor(PortfolioSensorEntity):
     """Sensor for total current value of portfolio."""
 
+    _threshold_option = CONF_THRESHOLD_EUR
     _attr_name = "Portfolio Current Value"
     _attr_unique_id = "gold_portfolio_current_value"
     _attr_state_class = SensorStateClass.MEASUREMENT
@@ -136,40 +427,39 @@ class PortfolioTotalValueSensor(CoordinatorEntity, SensorEntity):
         self,
         coordinator: DataUpdateCoordinator,
         config_entry: ConfigEntry,
-        portfolio_manager: PortfolioManager,
+        valuator: PortfolioValuator,
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._attr_unique_id = f"{config_entry.entry_id}_current_value"
         self._config_entry = config_entry
-        self._portfolio_manager = portfolio_manager
+        self._valuator = valuator
 
     @property
     def native_value(self) -> Optional[float]:
         """Return the state of the sensor."""
         if self.coordinator.data:
-            price_per_gram = self.coordinator.data.get("price", 0) / TROY_OZ_TO_GRAM
-            portfolio_value = self._portfolio_manager.calculate_portfolio_value(price_per_gram)
-            return portfolio_value.get("current_value_eur")
+            return self._valuator.snapshot.totals.get("current_value_eur")
         return None
 
     @property
     def extra_state_attributes(self) -> dict:
         """Return extra state attributes."""
         if self.coordinator.data:
-            price_per_gram = self.coordinator.data.get("price", 0) / TROY_OZ_TO_GRAM
-            portfolio_value = self._portfolio_manager.calculate_portfolio_value(price_per_gram)
+            portfolio_value = self._valuator.snapshot.totals
             return {
                 "total_grams": portfolio_value.get("total_grams"),
                 "total_investment_eur": portfolio_value.get("total_investment_eur"),
                 "entry_count": portfolio_value.get("entry_count"),
+                "metals": portfolio_value.get("metals"),
             }
         return {}
 
 
-class PortfolioTotalGainSensor(CoordinatorEntity, SensorEntity):
+class PortfolioTotalGainSensor(PortfolioSensorEntity):
     """Sensor for total gain in EUR."""
 
+    _threshold_option = CONF_THRESHOLD_EUR
     _attr_name = "Portfolio Total Gain (EUR)"
     _attr_unique_id = "gold_portfolio_total_gain_eur"
     _attr_state_class = SensorStateClass.MEASUREMENT
@@ -180,27 +470,26 @@ class PortfolioTotalGainSensor(CoordinatorEntity, SensorEntity):
         self,
         coordinator: DataUpdateCoordinator,
         config_entry: ConfigEntry,
-        portfolio_manager: PortfolioManager,
+        valuator: PortfolioValuator,
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._attr_unique_id = f"{config_entry.entry_id}_total_gain_eur"
         self._config_entry = config_entry
-        self._portfolio_manager = portfolio_manager
+        self._valuator = valuator
 
     @property
     def native_value(self) -> Optional[float]:
         """Return the state of the sensor."""
         if self.coordinator.data:
-            price_per_gram = self.coordinator.data.get("price", 0) / TROY_OZ_TO_GRAM
-            portfolio_value = self._portfolio_manager.calculate_portfolio_value(price_per_gram)
-            return portfolio_value.get("gain_eur")
+            return self._valuator.snapshot.totals.get("gain_eur")
         return None
 
 
-class PortfolioTotalGainPercentSensor(CoordinatorEntity, SensorEntity):
+class PortfolioTotalGainPercentSensor(PortfolioSensorEntity):
     """Sensor for total gain in percent."""
 
+    _threshold_option = CONF_THRESHOLD_PERCENT
     _attr_name = "Portfolio Total Gain (%)"
     _attr_unique_id = "gold_portfolio_total_gain_percent"
     _attr_state_class = SensorStateClass.MEASUREMENT
@@ -211,24 +500,128 @@ class PortfolioTotalGainPercentSensor(CoordinatorEntity, SensorEntity):
         self,
         coordinator: DataUpdateCoordinator,
         config_entry: ConfigEntry,
-        portfolio_manager: PortfolioManager,
+        valuator: PortfolioValuator,
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._attr_unique_id = f"{config_entry.entry_id}_total_gain_percent"
         self._config_entry = config_entry
-        self._portfolio_manager = portfolio_manager
+        self._valuator = valuator
 
     @property
     def native_value(self) -> Optional[float]:
         """Return the state of the sensor."""
         if self.coordinator.data:
-            price_per_gram = self.coordinator.data.get("price", 0) / TROY_OZ_TO_GRAM
-            portfolio_value = self._portfolio_manager.calculate_portfolio_value(price_per_gram)
-            return portfolio_value.get("gain_percent")
+            return self._valuator.snapshot.totals.get("gain_percent")
         return None
 
-class PortfolioEntryGramsSensor(CoordinatorEntity, SensorEntity):
+
+class PortfolioRealizedGainSensor(PortfolioSensorEntity):
+    """Sensor for the gain realized by sales in EUR."""
+
+    _threshold_option = CONF_THRESHOLD_EUR
+    _attr_name = "Portfolio Realized Gain (EUR)"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfPrice.EUR if UnitOfPrice else "€"
+    _attr_icon = "mdi:cash-check"
+
+    def __init__(
+        self,
+        coordinator: DataUpdateCoordinator,
+        config_entry: ConfigEntry,
+        valuator: PortfolioValuator,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{config_entry.entry_id}_realized_gain_eur"
+        self._config_entry = config_entry
+        self._valuator = valuator
+
+    @property
+    def native_value(self) -> float:
+        """Return the state of the sensor."""
+        # Realized gains don't depend on the current price
+        return self._valuator.snapshot.totals["realized_gain_eur"]
+
+    def _state_signature(self) -> Any:
+        """Publish when the gain of a single metal changes."""
+        return self.extra_state_attributes
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return extra state attributes."""
+        return {
+            "cost_basis": self._config_entry.options.get(CONF_COST_BASIS, COST_BASIS_FIFO),
+            "metals": {
+                metal: round(gain, 2)
+                for metal, gain in self._valuator.portfolio_manager.get_realized_gains().items()
+            },
+        }
+
+
+class PortfolioLotsSensor(PortfolioSensorEntity):
+    """Sensor for the number of lots, with a small gain/loss summary."""
+
+    _attr_name = "Portfolio Lots"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:format-list-numbered"
+
+    def __init__(
+        self,
+        coordinator: DataUpdateCoordinator,
+        config_entry: ConfigEntry,
+        valuator: PortfolioValuator,
+        portfolio_manager: PortfolioManager,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{config_entry.entry_id}_lots"
+        self._config_entry = config_entry
+        self._valuator = valuator
+        self._portfolio_manager = portfolio_manager
+
+    @property
+    def native_value(self) -> int:
+        """Return the state of the sensor."""
+        return self._portfolio_manager.get_entry_count()
+
+    def _state_signature(self) -> Any:
+        """Publish when the gain/loss counts change."""
+        return self.extra_state_attributes
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return extra state attributes."""
+        attributes = {
+            "entity_mode": self._config_entry.options.get(
+                CONF_ENTITY_MODE, ENTITY_MODE_PER_LOT
+            ),
+        }
+        if self.coordinator.data:
+            lots_in_gain, lots_in_loss = self._valuator.snapshot.gain_counts()
+            attributes["lots_in_gain"] = lots_in_gain
+            attributes["lots_in_loss"] = lots_in_loss
+        return attributes
+
+
+class PortfolioEntrySensorEntity(PortfolioSensorEntity):
+    """Sensor of one portfolio entry, managed by the PortfolioEntityManager."""
+
+    _entry_id: str
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe, or go away if the lot was removed while this was added."""
+        await super().async_added_to_hass()
+        entry_data = self.hass.data[DOMAIN].get(self._config_entry.entry_id, {})
+        entity_manager = entry_data.get("entity_manager")
+        if entity_manager is not None and not entity_manager.async_is_current(
+            self._entry_id, self
+        ):
+            # The entity removes itself when its registry entry goes
+            er.async_get(self.hass).async_remove(self.entity_id)
+
+
+class PortfolioEntryGramsSensor(PortfolioEntrySensorEntity):
     """Sensor for grams of a specific portfolio entry."""
 
     _attr_state_class = SensorStateClass.MEASUREMENT
@@ -239,29 +632,30 @@ class PortfolioEntryGramsSensor(CoordinatorEntity, SensorEntity):
         self,
         coordinator: DataUpdateCoordinator,
         config_entry: ConfigEntry,
-        portfolio_manager: PortfolioManager,
+        valuator: PortfolioValuator,
         entry_id: str,
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._entry_id = entry_id
-        self._portfolio_manager = portfolio_manager
+        self._valuator = valuator
         self._config_entry = config_entry
         self._attr_name = f"Portfolio Entry {entry_id} Grams"
-        self._attr_unique_id = f"portfolio_entry_{entry_id}_grams"
+        self._attr_unique_id = lot_unique_id(config_entry.entry_id, entry_id, "grams")
 
     @property
     def native_value(self) -> Optional[float]:
         """Return the state of the sensor."""
-        entry = self._portfolio_manager.get_entry(self._entry_id)
-        if entry:
-            return entry.get("amount_grams")
+        entry_value = self._valuator.snapshot.entry(self._entry_id)
+        if entry_value:
+            return entry_value.get("amount_grams")
         return None
 
 
-class PortfolioEntryValueSensor(CoordinatorEntity, SensorEntity):
+class PortfolioEntryValueSensor(PortfolioEntrySensorEntity):
     """Sensor for current value of a specific portfolio entry."""
 
+    _threshold_option = CONF_THRESHOLD_EUR
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_native_unit_of_measurement = UnitOfPrice.EUR if UnitOfPrice else "€"
     _attr_icon = "mdi:euro"
@@ -270,31 +664,31 @@ class PortfolioEntryValueSensor(CoordinatorEntity, SensorEntity):
         self,
         coordinator: DataUpdateCoordinator,
         config_entry: ConfigEntry,
-        portfolio_manager: PortfolioManager,
+        valuator: PortfolioValuator,
         entry_id: str,
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._entry_id = entry_id
-        self._portfolio_manager = portfolio_manager
+        self._valuator = valuator
         self._config_entry = config_entry
         self._attr_name = f"Portfolio Entry {entry_id} Current Value"
-        self._attr_unique_id = f"portfolio_entry_{entry_id}_current_value"
+        self._attr_unique_id = lot_unique_id(config_entry.entry_id, entry_id, "current_value")
 
     @property
     def native_value(self) -> Optional[float]:
         """Return the state of the sensor."""
         if self.coordinator.data:
-            price_per_gram = self.coordinator.data.get("price", 0) / TROY_OZ_TO_GRAM
-            entry_value = self._portfolio_manager.calculate_entry_value(self._entry_id, price_per_gram)
+            entry_value = self._valuator.snapshot.entry(self._entry_id)
             if entry_value:
                 return entry_value.get("current_value_eur")
         return None
 
 
-class PortfolioEntryGainSensor(CoordinatorEntity, SensorEntity):
+class PortfolioEntryGainSensor(PortfolioEntrySensorEntity):
     """Sensor for gain (EUR) of a specific portfolio entry."""
 
+    _threshold_option = CONF_THRESHOLD_EUR
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_native_unit_of_measurement = UnitOfPrice.EUR if UnitOfPrice else "€"
     _attr_icon = "mdi:cash-multiple"
@@ -303,31 +697,31 @@ class PortfolioEntryGainSensor(CoordinatorEntity, SensorEntity):
         self,
         coordinator: DataUpdateCoordinator,
         config_entry: ConfigEntry,
-        portfolio_manager: PortfolioManager,
+        valuator: PortfolioValuator,
         entry_id: str,
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._entry_id = entry_id
-        self._portfolio_manager = portfolio_manager
+        self._valuator = valuator
         self._config_entry = config_entry
         self._attr_name = f"Portfolio Entry {entry_id} Gain (EUR)"
-        self._attr_unique_id = f"portfolio_entry_{entry_id}_gain_eur"
+        self._attr_unique_id = lot_unique_id(config_entry.entry_id, entry_id, "gain_eur")
 
     @property
     def native_value(self) -> Optional[float]:
         """Return the state of the sensor."""
         if self.coordinator.data:
-            price_per_gram = self.coordinator.data.get("price", 0) / TROY_OZ_TO_GRAM
-            entry_value = self._portfolio_manager.calculate_entry_value(self._entry_id, price_per_gram)
+            entry_value = self._valuator.snapshot.entry(self._entry_id)
             if entry_value:
                 return entry_value.get("gain_eur")
         return None
 
 
-class PortfolioEntryGainPercentSensor(CoordinatorEntity, SensorEntity):
+class PortfolioEntryGainPercentSensor(PortfolioEntrySensorEntity):
     """Sensor for gain (%) of a specific portfolio entry."""
 
+    _threshold_option = CONF_THRESHOLD_PERCENT
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_native_unit_of_measurement = "%"
     _attr_icon = "mdi:percent"
@@ -336,23 +730,42 @@ class PortfolioEntryGainPercentSensor(CoordinatorEntity, SensorEntity):
         self,
         coordinator: DataUpdateCoordinator,
         config_entry: ConfigEntry,
-        portfolio_manager: PortfolioManager,
+        valuator: PortfolioValuator,
         entry_id: str,
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._entry_id = entry_id
-        self._portfolio_manager = portfolio_manager
+        self._valuator = valuator
         self._config_entry = config_entry
         self._attr_name = f"Portfolio Entry {entry_id} Gain (%)"
-        self._attr_unique_id = f"portfolio_entry_{entry_id}_gain_percent"
+        self._attr_unique_id = lot_unique_id(config_entry.entry_id, entry_id, "gain_percent")
 
     @property
     def native_value(self) -> Optional[float]:
         """Return the state of the sensor."""
         if self.coordinator.data:
-            price_per_gram = self.coordinator.data.get("price", 0) / TROY_OZ_TO_GRAM
-            entry_value = self._portfolio_manager.calculate_entry_value(self._entry_id, price_per_gram)
+            entry_value = self._valuator.snapshot.entry(self._entry_id)
             if entry_value:
                 return entry_value.get("gain_percent")
-        return None
\ No newline at end of file
+        return None
+
+
+ENTRY_SENSOR_CLASSES = (
+    PortfolioEntryGramsSensor,
+    PortfolioEntryValueSensor,
+    PortfolioEntryGainSensor,
+    PortfolioEntryGainPercentSensor,
+)
+
+_PRICE_UNIT = UnitOfPrice.EUR if UnitOfPrice else "€/oz"
+
+# kind -> (name, window option, unit, icon, threshold option)
+ANALYTICS_SENSORS = {
+    "sma": ("Gold Price SMA", CONF_SMA_WINDOW, _PRICE_UNIT, "mdi:chart-line", CONF_THRESHOLD_EUR),
+    "ema": ("Gold Price EMA", CONF_EMA_WINDOW, _PRICE_UNIT, "mdi:chart-bell-curve-cumulative", CONF_THRESHOLD_EUR),
+    "volatility": ("Gold Price Volatility", CONF_VOLATILITY_WINDOW, "%", "mdi:pulse", CONF_THRESHOLD_PERCENT),
+    "max_drawdown": ("Gold Price Max Drawdown", None, "%", "mdi:trending-down", CONF_THRESHOLD_PERCENT),
+    "range_high": ("Gold Price Range High", CONF_RANGE_WINDOW, _PRICE_UNIT, "mdi:arrow-collapse-up", CONF_THRESHOLD_EUR),
+    "range_low": ("Gold Price Range Low", CONF_RANGE_WINDOW, _PRICE_UNIT, "mdi:arrow-collapse-down", CONF_THRESHOLD_EUR),
+}
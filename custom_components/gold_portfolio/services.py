@@ -1,72 +1,134 @@
 """Services for Gold Portfolio Tracker."""
 import logging
-from datetime import datetime
-from typing import Any, Dict
+from datetime import date, datetime, timedelta
+from functools import partial
+from typing import Any, Dict, List, Optional
 
 import voluptuous as vol
 from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.service import async_register_admin_service
 from homeassistant.core import SupportsResponse
-from homeassistant.helpers.entity_platform import async_get_platforms
+from homeassistant.util import dt as dt_util
 
 from .api import GoldAPIClient
 from .const import (
+    BACKFILL_MAX_FETCH,
     CONF_API_KEY,
+    COST_BASIS_METHODS,
+    CURRENCIES,
+    DEFAULT_METAL,
+    DEFAULT_SYMBOL,
     DOMAIN,
+    HISTORY_BATCH_CONCURRENCY,
+    HISTORY_BATCH_MAX_CONCURRENCY,
+    HISTORY_BATCH_MAX_DATES,
+    METALS,
+    PRIORITY_BACKFILL,
     SERVICE_ADD_PORTFOLIO_ENTRY,
+    SERVICE_BACKFILL_STATISTICS,
     SERVICE_GET_HISTORICAL_PRICE,
+    SERVICE_GET_HISTORICAL_PRICES,
     SERVICE_GET_PORTFOLIO_ENTRIES,
+    SERVICE_GET_PORTFOLIO_VALUES,
+    SERVICE_GET_PRICE_HISTORY,
+    SERVICE_IMPORT_PORTFOLIO_ENTRIES,
     SERVICE_REMOVE_PORTFOLIO_ENTRY,
+    SERVICE_SELL_PORTFOLIO_ENTRIES,
     SERVICE_UPDATE_PORTFOLIO_ENTRY,
+    SIGNAL_PORTFOLIO_UPDATED,
+    VALUES_PAGE_SIZE_DEFAULT,
+    VALUES_PAGE_SIZE_MAX,
+)
+from .backfill import PortfolioBackfill
+from .importer import (
+    IMPORT_FORMATS,
+    detect_format,
+    parse_rows,
+    read_import_file,
+    validate_rows,
 )
 from .portfolio import PortfolioManager
+from .tick_store import RESOLUTIONS
+from .valuation import prices_per_gram_from_data
 
 _LOGGER = logging.getLogger(__name__)
 
 
-async def _register_entry_sensors(hass: HomeAssistant, config_entry_id: str, portfolio_entry_id: str) -> None:
-    """Register new sensors for a portfolio entry."""
-    try:
-        from .sensor import (
-            PortfolioEntryGramsSensor,
-            PortfolioEntryValueSensor,
-            PortfolioEntryGainSensor,
-            PortfolioEntryGainPercentSensor,
-        )
-        
-        # Get the config entry and coordinator
-        coordinator = hass.data[DOMAIN][config_entry_id]["coordinator"]
-        portfolio_manager = hass.data[DOMAIN][config_entry_id]["portfolio_manager"]
-        
-        # Create new sensor entities
-        sensors = [
-            PortfolioEntryGramsSensor(coordinator, None, portfolio_manager, portfolio_entry_id),
-            PortfolioEntryValueSensor(coordinator, None, portfolio_manager, portfolio_entry_id),
-            PortfolioEntryGainSensor(coordinator, None, portfolio_manager, portfolio_entry_id),
-            PortfolioEntryGainPercentSensor(coordinator, None, portfolio_manager, portfolio_entry_id),
-        ]
-        
-        # Override unique_id for new sensors
-        from homeassistant.config_entries import ConfigEntry
-        config_entry = hass.config_entries.async_get_entry(config_entry_id)
-        
-        if config_entry:
-            for sensor in sensors:
-                sensor._config_entry = config_entry
-                sensor._attr_unique_id = f"{config_entry_id}_entry_{portfolio_entry_id}_{sensor._attr_unique_id.split('_')[-1]}"
-        
-        # Get the platform
-        from homeassistant.const import Platform
-        platforms = async_get_platforms(hass, DOMAIN)
-        
-        if platforms:
-            for platform in platforms:
-                if platform.domain == "sensor":
-                    await platform.async_add_entities(sensors)
-                    _LOGGER.debug(f"Registered sensors for entry {portfolio_entry_id}")
-                    return
-    except Exception as err:
-        _LOGGER.warning(f"Could not register new entry sensors: {err}")
+def _register_entry_sensors(
+    hass: HomeAssistant, config_entry_id: str, portfolio_entry_ids: List[str]
+) -> None:
+    """Register new sensors for portfolio entries in one batch."""
+    entity_manager = hass.data[DOMAIN][config_entry_id].get("entity_manager")
+    if entity_manager is None:
+        _LOGGER.warning("Entity manager not found for entry: %s", config_entry_id)
+        return
+    entity_manager.async_add_lots(portfolio_entry_ids)
+
+
+async def _remove_entry_sensors(
+    hass: HomeAssistant, config_entry_id: str, portfolio_entry_ids: List[str]
+) -> None:
+    """Remove the sensors of deleted portfolio entries."""
+    entity_manager = hass.data[DOMAIN][config_entry_id].get("entity_manager")
+    if entity_manager is not None:
+        await entity_manager.async_remove_lots(portfolio_entry_ids)
+
+
+def _notify_portfolio_changed(hass: HomeAssistant, config_entry_id: str) -> None:
+    """Let the sensors of an entry publish a changed portfolio.
+
+    The coordinator keeps its data while the quotes are unchanged, so its
+    listeners are not called for changes made by the services.
+    """
+    async_dispatcher_send(hass, SIGNAL_PORTFOLIO_UPDATED.format(config_entry_id))
+
+
+def _expand_dates(data: Dict[str, Any]) -> List[str]:
+    """Return the requested dates (list and/or range), deduplicated and sorted."""
+    dates = set()
+    for value in data.get("dates", []):
+        dates.add(date.fromisoformat(str(value)).isoformat())
+
+    start = data.get("start_date")
+    end = data.get("end_date")
+    if start or end:
+        if not (start and end):
+            raise ValueError("start_date and end_date must be given together")
+        day = date.fromisoformat(str(start))
+        last = date.fromisoformat(str(end))
+        if (last - day).days >= HISTORY_BATCH_MAX_DATES:
+            raise ValueError(f"Date range exceeds {HISTORY_BATCH_MAX_DATES} days")
+        while day <= last:
+            dates.add(day.isoformat())
+            day += timedelta(days=1)
+
+    if len(dates) > HISTORY_BATCH_MAX_DATES:
+        raise ValueError(f"More than {HISTORY_BATCH_MAX_DATES} dates requested")
+    return sorted(dates)
+
+
+def _history_time(value: Optional[str], end: bool = False) -> float:
+    """Return epoch seconds for an ISO datetime or date (a date as end is inclusive)."""
+    if not value:
+        return dt_util.utcnow().timestamp() if end else 0.0
+    parsed = dt_util.parse_datetime(str(value))
+    if parsed is not None:
+        return dt_util.as_utc(parsed).timestamp()
+    day = date.fromisoformat(str(value))
+    if end:
+        day += timedelta(days=1)
+    start = dt_util.start_of_local_day(day).timestamp()
+    return start - 1e-6 if end else start
+
+
+def _valid_symbol(value: Any) -> str:
+    """Validate a METAL/CURRENCY symbol."""
+    metal, _, currency = str(value).upper().partition("/")
+    if metal not in METALS or currency not in CURRENCIES:
+        raise vol.Invalid(f"Unsupported symbol: {value}")
+    return f"{metal}/{currency}"
 
 
 async def async_setup_services(hass: HomeAssistant) -> None:
@@ -89,15 +151,16 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             amount_grams = call.data.get("amount_grams")
             purchase_price_eur = call.data.get("purchase_price_eur")
             purchase_price_per_gram = call.data.get("purchase_price_per_gram")
+            metal = call.data.get("metal", DEFAULT_METAL)
 
             # If neither price is provided, try to fetch historical price
             if purchase_price_eur is None and purchase_price_per_gram is None:
                 api_client = hass.data[DOMAIN][entry_id]["api_client"]
                 coordinator = hass.data[DOMAIN][entry_id]["coordinator"]
 
-                if coordinator.data:
+                price_per_gram = prices_per_gram_from_data(coordinator.data).get(metal)
+                if price_per_gram is not None:
                     # Use current price as fallback
-                    price_per_gram = coordinator.data.get("price", 0) / 31.1035
                     purchase_price_eur = amount_grams * price_per_gram
                     _LOGGER.warning(
                         "No purchase price provided, using current price as fallback: %s EUR",
@@ -109,11 +172,13 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 amount_grams=amount_grams,
                 purchase_price_eur=purchase_price_eur,
                 purchase_price_per_gram=purchase_price_per_gram,
+                metal=metal,
             )
             _LOGGER.info("Added portfolio entry: %s", entry.get("id"))
             
             # Register new sensors for this entry
-            await _register_entry_sensors(hass, entry_id, entry.get("id"))
+            _register_entry_sensors(hass, entry_id, [entry.get("id")])
+            _notify_portfolio_changed(hass, entry_id)
         except Exception as err:
             _LOGGER.error("Error adding portfolio entry: %s", err)
 
@@ -133,6 +198,8 @@ async def async_setup_services(hass: HomeAssistant) -> None:
 
         try:
             if portfolio_manager.remove_entry(portfolio_entry_id):
+                await _remove_entry_sensors(hass, entry_id, [portfolio_entry_id])
+                _notify_portfolio_changed(hass, entry_id)
                 _LOGGER.info("Removed portfolio entry: %s", portfolio_entry_id)
             else:
                 _LOGGER.warning("Portfolio entry not found: %s", portfolio_entry_id)
@@ -159,14 +226,77 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 purchase_date=call.data.get("purchase_date"),
                 amount_grams=call.data.get("amount_grams"),
                 purchase_price_eur=call.data.get("purchase_price_eur"),
+                metal=call.data.get("metal"),
             )
             if updated:
+                _notify_portfolio_changed(hass, entry_id)
                 _LOGGER.info("Updated portfolio entry: %s", portfolio_entry_id)
             else:
                 _LOGGER.warning("Portfolio entry not found: %s", portfolio_entry_id)
         except Exception as err:
             _LOGGER.error("Error updating portfolio entry: %s", err)
 
+    async def sell_portfolio_entries(call: ServiceCall) -> Dict[str, Any]:
+        """Record a sale of grams from one lot or the oldest lots of a metal."""
+        entry_id = call.data.get("entry_id")
+
+        if entry_id not in hass.data[DOMAIN]:
+            _LOGGER.error("Config entry not found: %s", entry_id)
+            return {"error": "Config entry not found"}
+
+        portfolio_manager = hass.data[DOMAIN][entry_id].get("portfolio_manager")
+        if not portfolio_manager:
+            _LOGGER.error("Portfolio manager not found for entry: %s", entry_id)
+            return {"error": "Portfolio manager not found"}
+
+        amount_grams = call.data["amount_grams"]
+        proceeds_eur = call.data.get("proceeds_eur")
+        if proceeds_eur is None:
+            if call.data.get("price_per_gram") is None:
+                return {"error": "proceeds_eur or price_per_gram is required"}
+            proceeds_eur = call.data["price_per_gram"] * amount_grams
+
+        try:
+            event = portfolio_manager.sell(
+                metal=call.data.get("metal", DEFAULT_METAL),
+                amount_grams=amount_grams,
+                proceeds_eur=proceeds_eur,
+                sale_date=call.data.get("sale_date") or dt_util.now().date().isoformat(),
+                lot_id=call.data.get("portfolio_entry_id"),
+                cost_basis=call.data.get("cost_basis"),
+            )
+        except ValueError as err:
+            _LOGGER.error("Error selling portfolio entries: %s", err)
+            return {"error": str(err)}
+
+        closed = [
+            lot_id for lot_id, _, _ in event["fills"]
+            if portfolio_manager.get_entry(lot_id) is None
+        ]
+        if closed:
+            await _remove_entry_sensors(hass, entry_id, closed)
+        _notify_portfolio_changed(hass, entry_id)
+        _LOGGER.info(
+            "Sold %s g %s, realized gain %.2f EUR",
+            event["grams"],
+            event["metal"],
+            event["realized_gain_eur"],
+        )
+        return {
+            "seq": event["seq"],
+            "metal": event["metal"],
+            "grams": event["grams"],
+            "proceeds_eur": round(event["proceeds_eur"], 2),
+            "cost_basis": event["cost_basis"],
+            "basis_eur": round(event["basis_eur"], 2),
+            "realized_gain_eur": round(event["realized_gain_eur"], 2),
+            "lots": [
+                {"entry_id": lot_id, "grams": grams, "cost_eur": round(cost, 2)}
+                for lot_id, grams, cost in event["fills"]
+            ],
+            "closed_entries": closed,
+        }
+
     async def get_portfolio_entries(call: ServiceCall) -> Dict[str, Any]:
         """Get all portfolio entries."""
         entry_id = call.data.get("entry_id")
@@ -180,14 +310,150 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             _LOGGER.error("Portfolio manager not found for entry: %s", entry_id)
             return {"error": "Portfolio manager not found"}
 
-        entries = portfolio_manager.get_entries()
+        entries = [entry.as_dict() for entry in portfolio_manager.get_entries()]
         _LOGGER.info("Retrieved %d portfolio entries", len(entries))
         return {"entries": entries}
 
+    async def get_portfolio_values(call: ServiceCall) -> Dict[str, Any]:
+        """Get current values of portfolio entries, one page at a time."""
+        entry_id = call.data.get("entry_id")
+
+        if entry_id not in hass.data[DOMAIN]:
+            _LOGGER.error("Config entry not found: %s", entry_id)
+            return {"error": "Config entry not found"}
+
+        portfolio_manager = hass.data[DOMAIN][entry_id].get("portfolio_manager")
+        valuator = hass.data[DOMAIN][entry_id].get("valuator")
+        if not portfolio_manager or not valuator:
+            _LOGGER.error("Portfolio manager not found for entry: %s", entry_id)
+            return {"error": "Portfolio manager not found"}
+
+        offset = call.data.get("offset", 0)
+        limit = call.data.get("limit", VALUES_PAGE_SIZE_DEFAULT)
+        snapshot = valuator.snapshot
+        entries = []
+        for lot in portfolio_manager.get_entries_page(offset, limit):
+            entry = lot.as_dict()
+            entry.update(snapshot.entry(lot.id) or {})
+            entry.pop("entry_id", None)
+            entries.append(entry)
+
+        total = portfolio_manager.get_entry_count()
+        return {
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "next_offset": offset + limit if offset + limit < total else None,
+            "price_timestamp": snapshot.price_timestamp,
+            "entries": entries,
+        }
+
+    async def import_portfolio_entries(call: ServiceCall) -> Dict[str, Any]:
+        """Import many portfolio entries from CSV or JSON."""
+        entry_id = call.data.get("entry_id")
+
+        if entry_id not in hass.data[DOMAIN]:
+            _LOGGER.error("Config entry not found: %s", entry_id)
+            return {"error": "Config entry not found"}
+
+        portfolio_manager = hass.data[DOMAIN][entry_id].get("portfolio_manager")
+        if not portfolio_manager:
+            _LOGGER.error("Portfolio manager not found for entry: %s", entry_id)
+            return {"error": "Portfolio manager not found"}
+
+        file_path = call.data.get("file_path")
+        try:
+            if "entries" in call.data:
+                rows = call.data["entries"]
+            else:
+                if file_path:
+                    content = await hass.async_add_executor_job(
+                        read_import_file, hass.config.path(), file_path
+                    )
+                elif call.data.get("content"):
+                    content = call.data["content"]
+                else:
+                    return {"error": "Provide entries, content or file_path"}
+                fmt = call.data.get("format") or detect_format(content, file_path)
+                rows = parse_rows(content, fmt)
+            valid, errors = validate_rows(rows)
+        except ValueError as err:
+            _LOGGER.error("Invalid portfolio import: %s", err)
+            return {"error": str(err)}
+
+        result: Dict[str, Any] = {"rows": len(rows), "imported": 0, "errors": errors}
+        if errors and not call.data.get("skip_invalid", False):
+            # All or nothing: fix the rows and import again
+            _LOGGER.warning("Portfolio import rejected: %d invalid rows", len(errors))
+            return result
+
+        lots = portfolio_manager.add_entries(valid)
+        _register_entry_sensors(hass, entry_id, [lot.id for lot in lots])
+        if lots:
+            _notify_portfolio_changed(hass, entry_id)
+        _LOGGER.info("Imported %d portfolio entries (%d invalid)", len(lots), len(errors))
+        result["imported"] = len(lots)
+        return result
+
+    async def get_price_history(call: ServiceCall) -> Dict[str, Any]:
+        """Get recorded price ticks or OHLC rollups for a time range."""
+        symbol = call.data.get("symbol", DEFAULT_SYMBOL)
+        resolution = call.data.get("resolution", "day")
+        try:
+            start = _history_time(call.data.get("start"))
+            end = _history_time(call.data.get("end"), end=True)
+        except ValueError as err:
+            _LOGGER.error("Invalid range for price history: %s", err)
+            return {"error": str(err)}
+
+        tick_store = hass.data[DOMAIN]["hub"].tick_store
+        result: Dict[str, Any] = {"symbol": symbol, "resolution": resolution}
+        if resolution == "tick":
+            timestamps, prices, truncated = await tick_store.async_ticks(symbol, start, end)
+            result.update(timestamps=timestamps, prices=prices, truncated=truncated)
+        else:
+            result.update(await tick_store.async_ohlc(symbol, resolution, start, end))
+        return result
+
+    async def backfill_statistics(call: ServiceCall) -> Dict[str, Any]:
+        """Import the daily portfolio history as long-term statistics."""
+        entry_id = call.data.get("entry_id")
+
+        if entry_id not in hass.data[DOMAIN]:
+            _LOGGER.error("Config entry not found: %s", entry_id)
+            return {"error": "Config entry not found"}
+
+        portfolio_manager = hass.data[DOMAIN][entry_id].get("portfolio_manager")
+        if not portfolio_manager:
+            _LOGGER.error("Portfolio manager not found for entry: %s", entry_id)
+            return {"error": "Portfolio manager not found"}
+
+        api_client = hass.data[DOMAIN][entry_id]["api_client"]
+        backfill = PortfolioBackfill(
+            hass,
+            entry_id,
+            await portfolio_manager.async_ledger_events(),
+            hass.data[DOMAIN]["price_cache"],
+            hass.data[DOMAIN]["hub"].tick_store,
+            lambda symbol: partial(
+                api_client.get_historical_price,
+                symbol=symbol,
+                priority=PRIORITY_BACKFILL,
+            ),
+        )
+        try:
+            return await backfill.async_run(
+                call.data.get("start_date"), call.data.get("max_fetch", 0)
+            )
+        except Exception as err:
+            _LOGGER.error("Error backfilling statistics: %s", err)
+            return {"error": str(err)}
+
     async def get_historical_price(call: ServiceCall) -> Dict[str, Any]:
         """Get historical gold price for a date."""
         entry_id = call.data.get("entry_id")
         date_str = call.data.get("date")  # Format: YYYY-MM-DD
+        symbol = call.data.get("symbol", DEFAULT_SYMBOL)
 
         if entry_id not in hass.data[DOMAIN]:
             _LOGGER.error("Config entry not found: %s", entry_id)
@@ -195,10 +461,21 @@ async def async_setup_services(hass: HomeAssistant) -> None:
 
         try:
             api_client = hass.data[DOMAIN][entry_id]["api_client"]
-            price = await api_client.get_historical_price(date_str)
+            price_cache = hass.data[DOMAIN]["price_cache"]
+            price, cached = await price_cache.async_get(
+                date_str,
+                partial(api_client.get_historical_price, symbol=symbol),
+                symbol,
+            )
             if price:
-                _LOGGER.info("Historical price for %s: %s EUR", date_str, price)
-                return {"date": date_str, "price": price}
+                _LOGGER.info(
+                    "Historical %s price for %s: %s (cached: %s)",
+                    symbol,
+                    date_str,
+                    price,
+                    cached,
+                )
+                return {"date": date_str, "symbol": symbol, "price": price, "cached": cached}
             else:
                 _LOGGER.warning("Could not retrieve historical price for %s", date_str)
                 return {"error": f"Could not retrieve price for {date_str}"}
@@ -206,6 +483,52 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             _LOGGER.error("Error getting historical price: %s", err)
             return {"error": str(err)}
 
+    async def get_historical_prices(call: ServiceCall) -> Dict[str, Any]:
+        """Get historical gold prices for many dates."""
+        entry_id = call.data.get("entry_id")
+
+        if entry_id not in hass.data[DOMAIN]:
+            _LOGGER.error("Config entry not found: %s", entry_id)
+            return {"error": "Config entry not found"}
+
+        try:
+            dates = _expand_dates(call.data)
+        except ValueError as err:
+            _LOGGER.error("Invalid dates for historical prices: %s", err)
+            return {"error": str(err)}
+
+        try:
+            api_client = hass.data[DOMAIN][entry_id]["api_client"]
+            price_cache = hass.data[DOMAIN]["price_cache"]
+            symbol = call.data.get("symbol", DEFAULT_SYMBOL)
+            prices, cached, errors = await price_cache.async_get_many(
+                dates,
+                # Batches yield to live polling; while the monthly budget is
+                # below the backfill reserve dates are reported as deferred
+                partial(
+                    api_client.get_historical_price,
+                    symbol=symbol,
+                    priority=PRIORITY_BACKFILL,
+                ),
+                call.data.get("max_concurrency", HISTORY_BATCH_CONCURRENCY),
+                symbol,
+            )
+            _LOGGER.info(
+                "Historical prices: %d found (%d cached), %d errors",
+                len(prices),
+                len(cached),
+                len(errors),
+            )
+            return {
+                "symbol": symbol,
+                "prices": {day: prices[day] for day in sorted(prices)},
+                "cached": cached,
+                "errors": errors,
+            }
+        except Exception as err:
+            _LOGGER.error("Error getting historical prices: %s", err)
+            return {"error": str(err)}
+
     # Register services
     async_register_admin_service(
         hass,
@@ -218,6 +541,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             vol.Required("amount_grams"): vol.All(vol.Coerce(float), vol.Range(min=0.01)),
             vol.Optional("purchase_price_eur"): vol.All(vol.Coerce(float), vol.Range(min=0)),
             vol.Optional("purchase_price_per_gram"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional("metal"): vol.In(list(METALS)),
         }),
     )
 
@@ -243,9 +567,32 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             vol.Optional("purchase_date"): str,
             vol.Optional("amount_grams"): vol.All(vol.Coerce(float), vol.Range(min=0.01)),
             vol.Optional("purchase_price_eur"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional("metal"): vol.In(list(METALS)),
         }),
     )
 
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_SELL_PORTFOLIO_ENTRIES,
+        sell_portfolio_entries,
+        schema=vol.Schema({
+            vol.Required("entry_id"): str,
+            vol.Required("amount_grams"): vol.All(vol.Coerce(float), vol.Range(min=0.01)),
+            vol.Exclusive("proceeds_eur", "proceeds"): vol.All(
+                vol.Coerce(float), vol.Range(min=0)
+            ),
+            vol.Exclusive("price_per_gram", "proceeds"): vol.All(
+                vol.Coerce(float), vol.Range(min=0)
+            ),
+            vol.Optional("sale_date"): str,
+            vol.Optional("metal"): vol.In(list(METALS)),
+            vol.Optional("portfolio_entry_id"): str,
+            vol.Optional("cost_basis"): vol.In(COST_BASIS_METHODS),
+        }),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
     async_register_admin_service(
         hass,
         DOMAIN,
@@ -257,6 +604,21 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         supports_response=SupportsResponse.OPTIONAL,
     )
 
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_GET_PORTFOLIO_VALUES,
+        get_portfolio_values,
+        schema=vol.Schema({
+            vol.Required("entry_id"): str,
+            vol.Optional("offset", default=0): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Optional("limit", default=VALUES_PAGE_SIZE_DEFAULT): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=VALUES_PAGE_SIZE_MAX)
+            ),
+        }),
+        supports_response=SupportsResponse.ONLY,
+    )
+
     async_register_admin_service(
         hass,
         DOMAIN,
@@ -265,6 +627,70 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         schema=vol.Schema({
             vol.Required("entry_id"): str,
             vol.Required("date"): str,
+            vol.Optional("symbol"): _valid_symbol,
+        }),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_GET_HISTORICAL_PRICES,
+        get_historical_prices,
+        schema=vol.Schema({
+            vol.Required("entry_id"): str,
+            vol.Optional("dates"): vol.All(cv.ensure_list, [str]),
+            vol.Optional("start_date"): str,
+            vol.Optional("end_date"): str,
+            vol.Optional("symbol"): _valid_symbol,
+            vol.Optional("max_concurrency"): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=HISTORY_BATCH_MAX_CONCURRENCY)
+            ),
+        }),
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_GET_PRICE_HISTORY,
+        get_price_history,
+        schema=vol.Schema({
+            vol.Optional("symbol"): _valid_symbol,
+            vol.Optional("start"): str,
+            vol.Optional("end"): str,
+            vol.Optional("resolution"): vol.In(["tick", *RESOLUTIONS]),
+        }),
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_BACKFILL_STATISTICS,
+        backfill_statistics,
+        schema=vol.Schema({
+            vol.Required("entry_id"): str,
+            vol.Optional("start_date"): str,
+            vol.Optional("max_fetch", default=0): vol.All(
+                vol.Coerce(int), vol.Range(min=0, max=BACKFILL_MAX_FETCH)
+            ),
+        }),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_IMPORT_PORTFOLIO_ENTRIES,
+        import_portfolio_entries,
+        schema=vol.Schema({
+            vol.Required("entry_id"): str,
+            vol.Exclusive("entries", "source"): list,
+            vol.Exclusive("content", "source"): str,
+            vol.Exclusive("file_path", "source"): str,
+            vol.Optional("format"): vol.In(IMPORT_FORMATS),
+            vol.Optional("skip_invalid", default=False): bool,
         }),
         supports_response=SupportsResponse.OPTIONAL,
     )
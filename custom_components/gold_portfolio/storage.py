@@ -0,0 +1,161 @@
+"""Persistence helpers for Gold Portfolio Tracker."""
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from contextlib import suppress
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+
+from .const import SAVE_DELAY
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def load_json_file(path: Path, default: Any = None) -> Any:
+    """Load a JSON file, returning default if it does not exist."""
+    if not path.exists():
+        return default
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def write_json_atomic(path: Path, data: Any) -> None:
+    """Write data as JSON using temp file + fsync + rename.
+
+    A crash at any point leaves either the old or the new file on disk,
+    never a truncated one.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, default=str, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        with suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+    # Persist the rename itself
+    with suppress(OSError):
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class DelayedJSONWriter:
+    """Coalesce save requests into one delayed, atomic write in the executor.
+
+    `data_func` is called on the event loop when the write actually happens,
+    so a burst of mutations only serializes the latest state once. Its result
+    is handed to `write_func` in the executor (an atomic JSON write by
+    default). If the write fails the writer stays dirty, so the next save or
+    the shutdown flush tries again, and `failed_func` gets the data back on
+    the event loop.
+    """
+
+    def __init__(
+        self,
+        hass: Optional[HomeAssistant],
+        path: Path,
+        data_func: Callable[[], Any],
+        delay: float = SAVE_DELAY,
+        write_func: Callable[[Path, Any], None] = write_json_atomic,
+        failed_func: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        """Initialize the writer."""
+        self.hass = hass
+        self.path = path
+        self._data_func = data_func
+        self._write_func = write_func
+        self._failed_func = failed_func
+        self._delay = delay
+        self._unsub_timer: Optional[asyncio.TimerHandle] = None
+        self._unsub_final_write: Optional[CALLBACK_TYPE] = None
+        self._write_lock = asyncio.Lock()
+        self._dirty = False
+
+    @property
+    def pending(self) -> bool:
+        """Return True if there are changes not yet written."""
+        return self._dirty
+
+    @callback
+    def async_schedule(self) -> None:
+        """Schedule a delayed write, merging with any pending one."""
+        if self.hass is None:
+            # No event loop to defer to (e.g. offline tooling), write now
+            data = self._data_func()
+            if not self._write(data) and self._failed_func is not None:
+                self._failed_func(data)
+            return
+
+        self._dirty = True
+        if self._unsub_timer is not None:
+            return
+
+        self._unsub_timer = self.hass.loop.call_later(
+            self._delay, self._async_timer_fired
+        )
+        self._async_listen_final_write()
+
+    @callback
+    def _async_listen_final_write(self) -> None:
+        """Flush on Home Assistant shutdown."""
+        if self._unsub_final_write is None:
+            self._unsub_final_write = self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_final_write
+            )
+
+    @callback
+    def _async_timer_fired(self) -> None:
+        """Run the scheduled write."""
+        self._unsub_timer = None
+        self.hass.async_create_task(self.async_flush())
+
+    async def _async_final_write(self, _event: Event) -> None:
+        """Flush on Home Assistant shutdown."""
+        self._unsub_final_write = None
+        await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Write pending data now."""
+        if self._unsub_timer is not None:
+            self._unsub_timer.cancel()
+            self._unsub_timer = None
+        if self._unsub_final_write is not None:
+            self._unsub_final_write()
+            self._unsub_final_write = None
+
+        async with self._write_lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            data = self._data_func()
+            if await self.hass.async_add_executor_job(self._write, data):
+                return
+            # Keep the changes for the next save or the shutdown flush
+            self._dirty = True
+            if self._failed_func is not None:
+                self._failed_func(data)
+            self._async_listen_final_write()
+
+    def _write(self, data: Any) -> bool:
+        """Write data to disk (runs in the executor); return True on success."""
+        try:
+            self._write_func(self.path, data)
+        except Exception as err:
+            _LOGGER.error("Error writing %s: %s", self.path.name, err)
+            return False
+        return True
@@ -0,0 +1,279 @@
+"""Append-only price tick history with OHLC rollups."""
+import asyncio
+import logging
+import mmap
+import struct
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import OHLC_FILE, TICK_FILE_PREFIX, TICK_QUERY_MAX_POINTS
+from .storage import DelayedJSONWriter, load_json_file
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy ships with Home Assistant
+    np = None
+
+_LOGGER = logging.getLogger(__name__)
+
+# One tick: epoch seconds and price, little-endian doubles
+TICK_FORMAT = "<dd"
+TICK_SIZE = struct.calcsize(TICK_FORMAT)
+RESOLUTIONS = ("day", "week", "month")
+# Rollup bucket: open, high, low, close, tick count
+_OPEN, _HIGH, _LOW, _CLOSE, _COUNT = range(5)
+
+
+def period_keys(timestamp: float) -> Tuple[str, str, str]:
+    """Return the local day, week (its Monday) and month a tick belongs to."""
+    local = dt_util.as_local(dt_util.utc_from_timestamp(timestamp)).date()
+    monday = local.toordinal() - local.weekday()
+    return (
+        local.isoformat(),
+        type(local).fromordinal(monday).isoformat(),
+        local.isoformat()[:7],
+    )
+
+
+def _roll(buckets: Dict[str, List[float]], key: str, price: float) -> None:
+    """Add a price to the OHLC bucket of a period."""
+    bucket = buckets.get(key)
+    if bucket is None:
+        buckets[key] = [price, price, price, price, 1]
+        return
+    if price > bucket[_HIGH]:
+        bucket[_HIGH] = price
+    if price < bucket[_LOW]:
+        bucket[_LOW] = price
+    bucket[_CLOSE] = price
+    bucket[_COUNT] += 1
+
+
+def _empty_rollup() -> Dict[str, Any]:
+    """Return the rollups of a symbol without ticks."""
+    return {"ticks": 0, "last": None, **{resolution: {} for resolution in RESOLUTIONS}}
+
+
+class _Timestamps:
+    """Sequence view of the timestamps in a tick buffer, for bisect."""
+
+    def __init__(self, buffer: Any, count: int) -> None:
+        """Initialize the view."""
+        self._buffer = buffer
+        self._count = count
+
+    def __len__(self) -> int:
+        """Return the number of ticks."""
+        return self._count
+
+    def __getitem__(self, index: int) -> float:
+        """Return the timestamp of a tick."""
+        return struct.unpack_from("<d", self._buffer, index * TICK_SIZE)[0]
+
+
+def read_ticks(
+    path: Path, start: float, end: float, limit: int = TICK_QUERY_MAX_POINTS
+) -> Tuple[List[float], List[float], bool]:
+    """Return (timestamps, prices, truncated) for start <= t <= end (blocking).
+
+    Ticks are appended in time order, so the range is found by binary search
+    on the memory-mapped file and only that slice is decoded.
+    """
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        return [], [], False
+    count = size // TICK_SIZE
+    if not count:
+        return [], [], False
+
+    with open(path, "rb") as file, mmap.mmap(
+        file.fileno(), count * TICK_SIZE, access=mmap.ACCESS_READ
+    ) as buffer:
+        if np is not None:
+            ticks = np.frombuffer(buffer, dtype=np.dtype("<f8"), count=count * 2)
+            timestamps = ticks[0::2]
+            first = int(np.searchsorted(timestamps, start, side="left"))
+            last = int(np.searchsorted(timestamps, end, side="right"))
+            truncated = last - first > limit
+            last = min(last, first + limit)
+            result = (timestamps[first:last].tolist(), ticks[1::2][first:last].tolist())
+            # Views must be released before the map is closed
+            del ticks, timestamps
+        else:
+            view = _Timestamps(buffer, count)
+            first = bisect_left(view, start)
+            last = bisect_right(view, end)
+            truncated = last - first > limit
+            last = min(last, first + limit)
+            pairs = list(
+                struct.iter_unpack(
+                    TICK_FORMAT, buffer[first * TICK_SIZE:last * TICK_SIZE]
+                )
+            )
+            result = ([pair[0] for pair in pairs], [pair[1] for pair in pairs])
+    return result[0], result[1], truncated
+
+
+class TickStore:
+    """Price ticks per symbol in fixed-width binary files under `.storage`.
+
+    Each fetched quote is appended as a 16-byte record; the files are never
+    rewritten, only memory-mapped for range reads. Daily, weekly and monthly
+    OHLC buckets are updated with every tick and persisted as JSON, so
+    rollup queries never scan the ticks.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store."""
+        self.hass = hass
+        self._dir = Path(hass.config.path(".storage"))
+        # symbol -> {"ticks": n, "last": t, "day"/"week"/"month": {key: bucket}}
+        self._rollups: Optional[Dict[str, Dict[str, Any]]] = None
+        self._load_lock = asyncio.Lock()
+        # Keeps appends (executor writes) in order
+        self._lock = asyncio.Lock()
+        self._writer = DelayedJSONWriter(
+            hass, self._dir / OHLC_FILE, self._data_to_save
+        )
+
+    def tick_path(self, symbol: str) -> Path:
+        """Return the tick file of a symbol."""
+        return self._dir / f"{TICK_FILE_PREFIX}{symbol.replace('/', '_')}.bin"
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return the rollups for the writer."""
+        return {
+            "rollups": {
+                symbol: {
+                    "ticks": rollup["ticks"],
+                    "last": rollup["last"],
+                    **{
+                        resolution: {
+                            key: list(bucket) for key, bucket in rollup[resolution].items()
+                        }
+                        for resolution in RESOLUTIONS
+                    },
+                }
+                for symbol, rollup in (self._rollups or {}).items()
+            }
+        }
+
+    def _load(self) -> Tuple[Dict[str, Dict[str, Any]], bool]:
+        """Load the rollups, rebuilding any that don't match their tick file."""
+        rollups = load_json_file(self._writer.path, {}).get("rollups", {})
+        rebuilt = False
+        for path in self._dir.glob(f"{TICK_FILE_PREFIX}*.bin"):
+            symbol = path.stem[len(TICK_FILE_PREFIX):].replace("_", "/")
+            size = path.stat().st_size
+            if size % TICK_SIZE:
+                # Drop a record torn by a crash mid-append
+                _LOGGER.warning("Truncating partial tick record in %s", path.name)
+                with open(path, "r+b") as file:
+                    file.truncate(size - size % TICK_SIZE)
+                size -= size % TICK_SIZE
+            if rollups.get(symbol, {}).get("ticks") != size // TICK_SIZE:
+                rollups[symbol] = self._rebuild(path)
+                rebuilt = True
+        return rollups, rebuilt
+
+    def _rebuild(self, path: Path) -> Dict[str, Any]:
+        """Recompute the rollups of a symbol from its ticks."""
+        rollup = _empty_rollup()
+        timestamps, prices, _ = read_ticks(path, float("-inf"), float("inf"), limit=2**62)
+        for timestamp, price in zip(timestamps, prices):
+            for resolution, key in zip(RESOLUTIONS, period_keys(timestamp)):
+                _roll(rollup[resolution], key, price)
+        rollup["ticks"] = len(timestamps)
+        rollup["last"] = timestamps[-1] if timestamps else None
+        _LOGGER.debug("Rebuilt rollups of %s from %d ticks", path.name, len(timestamps))
+        return rollup
+
+    async def _async_rollups(self) -> Dict[str, Dict[str, Any]]:
+        """Load the rollups on first use."""
+        if self._rollups is not None:
+            return self._rollups
+        async with self._load_lock:
+            if self._rollups is None:
+                try:
+                    self._rollups, rebuilt = await self.hass.async_add_executor_job(
+                        self._load
+                    )
+                    if rebuilt:
+                        self._writer.async_schedule()
+                except Exception as err:
+                    _LOGGER.error("Error loading price ticks: %s", err)
+                    self._rollups = {}
+        return self._rollups
+
+    def _append(self, symbol: str, timestamp: float, price: float) -> None:
+        """Append one tick to a symbol's file (blocking)."""
+        with open(self.tick_path(symbol), "ab") as file:
+            file.write(struct.pack(TICK_FORMAT, timestamp, price))
+
+    async def async_append(self, symbol: str, timestamp: float, price: float) -> bool:
+        """Record a quote unless it is not newer than the last one."""
+        async with self._lock:
+            rollups = await self._async_rollups()
+            rollup = rollups.get(symbol)
+            if rollup is None:
+                rollup = rollups[symbol] = _empty_rollup()
+            if rollup["last"] is not None and timestamp <= rollup["last"]:
+                return False
+
+            await self.hass.async_add_executor_job(
+                self._append, symbol, timestamp, price
+            )
+            for resolution, key in zip(RESOLUTIONS, period_keys(timestamp)):
+                _roll(rollup[resolution], key, price)
+            rollup["ticks"] += 1
+            rollup["last"] = timestamp
+            self._writer.async_schedule()
+            return True
+
+    async def async_append_prices(self, prices: Dict[str, dict]) -> None:
+        """Record the quotes of one coordinator fetch."""
+        for symbol, quote in prices.items():
+            timestamp = quote.get("timestamp") or dt_util.utcnow().timestamp()
+            try:
+                await self.async_append(symbol, float(timestamp), float(quote["price"]))
+            except Exception as err:
+                _LOGGER.warning("Could not record %s tick: %s", symbol, err)
+
+    async def async_ticks(
+        self, symbol: str, start: float, end: float, limit: int = TICK_QUERY_MAX_POINTS
+    ) -> Tuple[List[float], List[float], bool]:
+        """Return raw ticks of a symbol within [start, end]."""
+        return await self.hass.async_add_executor_job(
+            read_ticks, self.tick_path(symbol), start, end, limit
+        )
+
+    async def async_ohlc(
+        self, symbol: str, resolution: str, start: float, end: float
+    ) -> Dict[str, List[Any]]:
+        """Return OHLC columns of the periods overlapping [start, end]."""
+        index = RESOLUTIONS.index(resolution)
+        first = period_keys(start)[index]
+        last = period_keys(end)[index]
+        buckets = (await self._async_rollups()).get(symbol, {}).get(resolution, {})
+        result: Dict[str, List[Any]] = {
+            "periods": [], "open": [], "high": [], "low": [], "close": [], "ticks": []
+        }
+        # Keys are ISO dates/months, so string order is time order
+        for key in sorted(key for key in buckets if first <= key <= last):
+            bucket = buckets[key]
+            result["periods"].append(key)
+            result["open"].append(bucket[_OPEN])
+            result["high"].append(bucket[_HIGH])
+            result["low"].append(bucket[_LOW])
+            result["close"].append(bucket[_CLOSE])
+            result["ticks"].append(bucket[_COUNT])
+        return result
+
+    async def async_flush(self) -> None:
+        """Write pending rollups now."""
+        await self._writer.async_flush()
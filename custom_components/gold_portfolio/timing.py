@@ -0,0 +1,32 @@
+"""Setup phase timing for Gold Portfolio Tracker."""
+import logging
+import time
+from typing import List, Tuple
+
+
+class PhaseTimer:
+    """Measures consecutive setup phases and logs them in one debug line."""
+
+    def __init__(self, logger: logging.Logger, label: str) -> None:
+        """Start timing."""
+        self._logger = logger
+        self._label = label
+        self._started = self._last = time.perf_counter()
+        self._phases: List[Tuple[str, float]] = []
+
+    def mark(self, phase: str) -> None:
+        """End the current phase under the given name."""
+        now = time.perf_counter()
+        self._phases.append((phase, now - self._last))
+        self._last = now
+
+    def log(self) -> None:
+        """Log the phase durations and the total in milliseconds."""
+        if not self._logger.isEnabledFor(logging.DEBUG):
+            return
+        self._logger.debug(
+            "%s took %.1f ms (%s)",
+            self._label,
+            (self._last - self._started) * 1000,
+            ", ".join(f"{phase} {seconds * 1000:.1f} ms" for phase, seconds in self._phases),
+        )
@@ -0,0 +1,150 @@
+"""Shared portfolio valuation for Gold Portfolio Tracker."""
+import logging
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Optional, Tuple
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import DEFAULT_SYMBOL, PORTFOLIO_CURRENCY, TROY_OZ_TO_GRAM
+
+if TYPE_CHECKING:
+    from .portfolio import PortfolioManager
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def prices_per_gram_from_data(data: Optional[Dict[str, Any]]) -> Dict[str, float]:
+    """Return metal -> price per gram in the portfolio currency from coordinator data."""
+    if not data:
+        return {}
+    table = data.get("prices") or {DEFAULT_SYMBOL: data}
+    prices = {}
+    for symbol, quote in table.items():
+        metal, _, currency = symbol.partition("/")
+        if currency == PORTFOLIO_CURRENCY and quote.get("price") is not None:
+            prices[metal] = quote["price"] / TROY_OZ_TO_GRAM
+    return prices
+
+
+class ValuationSnapshot:
+    """Valuation of the whole portfolio at one price.
+
+    `version` increases with every snapshot, `revision` is the portfolio
+    revision it was computed from, so readers can detect stale data.
+    """
+
+    __slots__ = (
+        "version",
+        "revision",
+        "prices_per_gram",
+        "price_timestamp",
+        "computed_at",
+        "totals",
+        "_entries",
+    )
+
+    def __init__(
+        self,
+        version: int,
+        revision: int,
+        prices_per_gram: Dict[str, float],
+        price_timestamp: Any,
+        totals: Dict[str, Any],
+        entries: Mapping[str, Tuple[float, Optional[float], Optional[float], Optional[float]]],
+    ) -> None:
+        """Initialize the snapshot."""
+        self.version = version
+        self.revision = revision
+        self.prices_per_gram = prices_per_gram
+        self.price_timestamp = price_timestamp
+        self.computed_at = datetime.now()
+        self.totals = totals
+        self._entries = entries
+
+    def entry(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        """Return the valuation of a single lot."""
+        values = self._entries.get(entry_id)
+        if values is None:
+            return None
+        amount_grams, current_value, gain_eur, gain_percent = values
+        return {
+            "entry_id": entry_id,
+            "amount_grams": amount_grams,
+            "current_value_eur": current_value,
+            "gain_eur": gain_eur,
+            "gain_percent": gain_percent,
+        }
+
+    def gain_counts(self) -> Tuple[int, int]:
+        """Return the number of lots in gain and in loss."""
+        if hasattr(self._entries, "gain_counts"):
+            return self._entries.gain_counts()
+        in_gain = in_loss = 0
+        for _, _, gain_eur, _ in self._entries.values():
+            if gain_eur is None:
+                continue
+            if gain_eur > 0:
+                in_gain += 1
+            elif gain_eur < 0:
+                in_loss += 1
+        return in_gain, in_loss
+
+
+class PortfolioValuator:
+    """Compute one valuation snapshot per coordinator update.
+
+    Sensors read from the shared snapshot instead of valuing the portfolio
+    themselves. The snapshot is also rebuilt lazily if the portfolio changed
+    since it was computed.
+    """
+
+    def __init__(
+        self,
+        coordinator: DataUpdateCoordinator,
+        portfolio_manager: "PortfolioManager",
+    ) -> None:
+        """Initialize the valuator."""
+        self.coordinator = coordinator
+        self.portfolio_manager = portfolio_manager
+        self._snapshot: Optional[ValuationSnapshot] = None
+        self._data: Optional[Dict[str, Any]] = None
+        self._version = 0
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Recompute on coordinator updates; must run before entities subscribe."""
+        return self.coordinator.async_add_listener(self._handle_coordinator_update)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Compute the snapshot for newly delivered data."""
+        self._refresh()
+
+    @property
+    def snapshot(self) -> ValuationSnapshot:
+        """Return the current snapshot, recomputing it if stale."""
+        if (
+            self._snapshot is None
+            or self._data is not self.coordinator.data
+            or self._snapshot.revision != self.portfolio_manager.revision
+        ):
+            self._refresh()
+        return self._snapshot
+
+    def _refresh(self) -> None:
+        """Compute a new snapshot from the current coordinator data."""
+        data = self.coordinator.data
+        prices_per_gram = prices_per_gram_from_data(data)
+        price_timestamp = data.get("timestamp") if data else None
+
+        self._version += 1
+        self._data = data
+        self._snapshot = self.portfolio_manager.calculate_snapshot(
+            prices_per_gram, price_timestamp, self._version
+        )
+        _LOGGER.debug(
+            "Computed valuation snapshot %d (revision %d)",
+            self._version,
+            self._snapshot.revision,
+        )
@@ -0,0 +1,12 @@
+"""Test setup for Gold Portfolio Tracker."""
+import sys
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+try:
+    import homeassistant  # noqa: F401
+except ImportError:
+    # Without Home Assistant use the stand-in of the benchmark suite
+    sys.path.insert(0, str(REPO_DIR / "benchmarks" / "ha_stub"))
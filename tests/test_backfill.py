@@ -0,0 +1,33 @@
+"""Tests for the statistics backfill of Gold Portfolio Tracker."""
+from datetime import date
+
+import pytest
+
+from custom_components.gold_portfolio.backfill import compute_daily_series, ledger_rows
+from custom_components.gold_portfolio.const import DEFAULT_METAL
+from custom_components.gold_portfolio.ledger import read_events
+from custom_components.gold_portfolio.portfolio import PortfolioManager
+
+pytest.importorskip("numpy")
+
+
+def test_history_follows_partial_and_full_sales(tmp_path):
+    """Sold grams leave the holdings on the sale date, not before."""
+    manager = PortfolioManager(tmp_path, None)
+    manager.load()
+    first = manager.add_entry("2024-01-01", 10.0, 500.0)
+    manager.add_entry("2024-01-03", 5.0, 300.0)
+    manager.sell(DEFAULT_METAL, 4.0, 250.0, "2024-01-05", lot_id=first.id)
+    manager.sell(DEFAULT_METAL, 6.0, 400.0, "2024-01-07", lot_id=first.id)
+    assert [lot.amount_grams for lot in manager.get_entries()] == [5.0]
+
+    rows, skipped = ledger_rows(read_events(manager.ledger_file, 0, 0)[0])
+    first_day = date(2024, 1, 1).toordinal()
+    series = compute_daily_series(
+        rows, first_day, first_day + 7, {DEFAULT_METAL: {first_day: 2.0}}
+    )
+
+    assert skipped == 0
+    # 10 g, +5 g on day 2, -4 g on day 4, the rest of the first lot on day 6
+    assert series["value"].tolist() == [20, 20, 30, 30, 22, 22, 10, 10]
+    assert series["invested"].tolist() == [500, 500, 800, 800, 600, 600, 300, 300]
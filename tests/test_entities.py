@@ -0,0 +1,100 @@
+"""Tests for the per-lot entities of Gold Portfolio Tracker."""
+import asyncio
+import logging
+from types import SimpleNamespace
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity_platform import EntityPlatform
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from custom_components.gold_portfolio import sensor
+from custom_components.gold_portfolio.const import DOMAIN
+from custom_components.gold_portfolio.portfolio import PortfolioManager
+from custom_components.gold_portfolio.scheduler import ApiUsageStore, QuotaScheduler
+from custom_components.gold_portfolio.tick_store import TickStore
+
+ENTRY_ID = "entry"
+
+
+async def _setup_sensors(hass: HomeAssistant, manager: PortfolioManager) -> None:
+    """Set up the sensor platform like the integration does, without a hub."""
+    config_entry = ConfigEntry(ENTRY_ID, DOMAIN, "Gold", {"api_key": "key"})
+    hass.data[DOMAIN] = {
+        "hub": SimpleNamespace(tick_store=TickStore(hass)),
+        ENTRY_ID: {
+            "coordinator": DataUpdateCoordinator(
+                hass, logging.getLogger(__name__), name=DOMAIN
+            ),
+            "api_client": SimpleNamespace(
+                scheduler=QuotaScheduler(hass, "key", ApiUsageStore(hass))
+            ),
+            "entry": config_entry,
+            "portfolio_manager": manager,
+        },
+    }
+    platform = EntityPlatform(hass, "sensor", ENTRY_ID)
+    await sensor.async_setup_entry(hass, config_entry, platform.async_add_entities)
+    await hass.async_block_till_done()
+
+
+def _lot_unique_ids(hass: HomeAssistant) -> list:
+    """Return the registered per-lot unique ids."""
+    registry = er.async_get(hass)
+    return sorted(
+        entry.unique_id
+        for entry in er.async_entries_for_config_entry(registry, ENTRY_ID)
+        if "portfolio_entry_" in entry.unique_id
+    )
+
+
+def test_lot_removed_while_being_added(tmp_path):
+    """Entities of a lot closed before they were added remove themselves."""
+
+    async def run() -> None:
+        hass = HomeAssistant(str(tmp_path))
+        manager = PortfolioManager(tmp_path, hass, entry_id=ENTRY_ID)
+        await manager.async_load()
+        lot = manager.add_entry("2024-01-01", 1.0, 100.0)
+        await _setup_sensors(hass, manager)
+        assert f"{ENTRY_ID}_portfolio_entry_{lot.id}_grams" in _lot_unique_ids(hass)
+
+        entity_manager = hass.data[DOMAIN][ENTRY_ID]["entity_manager"]
+        closed = manager.add_entry("2024-02-01", 2.0, 200.0)
+        entity_manager.async_add_lots([closed.id])
+        await entity_manager.async_remove_lots([closed.id])
+        await hass.async_block_till_done()
+
+        assert len(_lot_unique_ids(hass)) == 4
+        assert all(closed.id not in unique_id for unique_id in _lot_unique_ids(hass))
+        assert not [
+            entity_id
+            for entity_id in hass.states.async_entity_ids()
+            if closed.id in entity_id
+        ]
+        await manager.async_flush()
+
+    asyncio.run(run())
+
+
+def test_unprefixed_unique_ids_are_migrated(tmp_path):
+    """Lot entities of older releases keep their entity ids."""
+
+    async def run() -> None:
+        hass = HomeAssistant(str(tmp_path))
+        manager = PortfolioManager(tmp_path, hass, entry_id=ENTRY_ID)
+        await manager.async_load()
+        lot = manager.add_entry("2024-01-01", 1.0, 100.0)
+        registry = er.async_get(hass)
+        registry.async_get_or_create(
+            "sensor.old_grams", f"portfolio_entry_{lot.id}_grams", ENTRY_ID
+        )
+        await _setup_sensors(hass, manager)
+
+        assert registry.async_get_entity_id(
+            "sensor", DOMAIN, f"{ENTRY_ID}_portfolio_entry_{lot.id}_grams"
+        ) == "sensor.old_grams"
+        await manager.async_flush()
+
+    asyncio.run(run())
@@ -0,0 +1,49 @@
+"""Tests for the shared price polling of Gold Portfolio Tracker."""
+import asyncio
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.gold_portfolio.const import DEFAULT_SYMBOL
+from custom_components.gold_portfolio.hub import PriceSubscription, async_get_hub
+
+API_KEY = "goldapi-test-io"
+
+
+def test_entries_with_one_api_key_share_a_feed(tmp_path):
+    """Two portfolios on one key get one coordinator and one request per tick."""
+
+    async def run() -> None:
+        hass = HomeAssistant(str(tmp_path))
+        hub = await async_get_hub(hass)
+        feeds = [
+            await hub.async_subscribe(
+                entry_id,
+                API_KEY,
+                PriceSubscription(lambda: [DEFAULT_SYMBOL], timedelta(hours=12), 10),
+            )
+            for entry_id in ("portfolio_a", "portfolio_b")
+        ]
+        feed = feeds[0]
+        assert feeds[1] is feed
+        assert hub.get_feed("portfolio_a") is hub.get_feed("portfolio_b")
+
+        requests = []
+
+        async def get_price(symbol, timeout):
+            requests.append(symbol)
+            return {"price": 2200.0, "timestamp": 1700000000, "currency": "EUR"}
+
+        feed.api_client._get_price = get_price
+        await feed.coordinator.async_refresh()
+        assert requests == [DEFAULT_SYMBOL]
+        assert feed.api_client.scheduler.usage["requests_today"] == 1
+        assert feed.coordinator.data["price"] == 2200.0
+
+        # The feed stays until its last subscriber leaves
+        await hub.async_unsubscribe("portfolio_a")
+        assert hub.get_feed("portfolio_b") is feed
+        await hub.async_unsubscribe("portfolio_b")
+        assert hub.get_feed("portfolio_b") is None
+
+    asyncio.run(run())
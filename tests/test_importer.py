@@ -0,0 +1,25 @@
+"""Tests for the bulk import of Gold Portfolio Tracker."""
+from custom_components.gold_portfolio.importer import parse_rows, validate_rows
+
+
+def test_non_finite_numbers_are_row_errors():
+    """nan and infinite amounts or prices are rejected per row."""
+    content = (
+        "purchase_date;amount_grams;purchase_price_eur\n"
+        "2024-01-01;10;500\n"
+        "2024-01-02;nan;500\n"
+        "2024-01-03;10;inf\n"
+        "2024-01-04;-inf;500\n"
+    )
+    valid, errors = validate_rows(parse_rows(content, "csv"))
+    assert [row["amount_grams"] for row in valid] == [10.0]
+    assert [error["row"] for error in errors] == [2, 3, 4]
+
+    valid, errors = validate_rows(
+        parse_rows(
+            '[{"purchase_date": "2024-01-01", "amount_grams": NaN,'
+            ' "purchase_price_eur": 500}]',
+            "json",
+        )
+    )
+    assert not valid and errors[0]["error"] == "Not a finite number: nan"
@@ -0,0 +1,108 @@
+"""Tests for the transaction ledger of Gold Portfolio Tracker."""
+import pytest
+
+from custom_components.gold_portfolio.const import STORAGE_MODE_JOURNAL
+from custom_components.gold_portfolio.ledger import read_events
+from custom_components.gold_portfolio.portfolio import (
+    PortfolioManager,
+    migrate_legacy_files,
+)
+
+
+def _journal(tmp_path) -> PortfolioManager:
+    """Return a loaded journal-mode portfolio without Home Assistant."""
+    manager = PortfolioManager(tmp_path, None, storage_mode=STORAGE_MODE_JOURNAL)
+    manager.load()
+    return manager
+
+
+def test_final_line_without_newline_is_not_merged(tmp_path):
+    """A record missing its newline is kept and not merged with the next one."""
+    manager = _journal(tmp_path)
+    manager.add_entry("2020-01-01", 1.0, 100.0)
+    manager.add_entry("2020-02-01", 2.0, 200.0)
+    ledger_file = manager.ledger_file
+    ledger_file.write_bytes(ledger_file.read_bytes().rstrip(b"\n"))
+
+    manager = _journal(tmp_path)
+    manager.add_entry("2020-03-01", 3.0, 300.0)
+
+    manager = _journal(tmp_path)
+    grams = [lot.amount_grams for lot in manager.get_entries()]
+    assert grams == [1.0, 2.0, 3.0]
+    events, _ = read_events(ledger_file, 0, 0)
+    assert [event["seq"] for event in events] == [1, 2, 3]
+
+
+def test_torn_final_line_is_truncated(tmp_path):
+    """A partial record from an interrupted append is dropped on load."""
+    manager = _journal(tmp_path)
+    manager.add_entry("2020-01-01", 1.0, 100.0)
+    with open(manager.ledger_file, "ab") as file:
+        file.write(b'{"seq":')
+
+    manager = _journal(tmp_path)
+    manager.add_entry("2020-02-01", 2.0, 200.0)
+
+    manager = _journal(tmp_path)
+    assert [lot.amount_grams for lot in manager.get_entries()] == [1.0, 2.0]
+
+
+def test_entries_keep_separate_ledgers(tmp_path):
+    """Two config entries neither share sequence numbers nor replay each other."""
+    first = PortfolioManager(tmp_path, None, entry_id="first")
+    first.load()
+    first.add_entry("2020-01-01", 1.0, 100.0)
+    second = PortfolioManager(tmp_path, None, entry_id="second")
+    second.load()
+    second.add_entry("2020-02-01", 2.0, 200.0)
+
+    first = PortfolioManager(tmp_path, None, entry_id="first")
+    first.load()
+    second = PortfolioManager(tmp_path, None, entry_id="second")
+    second.load()
+    assert [lot.amount_grams for lot in first.get_entries()] == [1.0]
+    assert [lot.amount_grams for lot in second.get_entries()] == [2.0]
+    assert [event["seq"] for event in read_events(second.ledger_file, 0, 0)[0]] == [1]
+
+
+def test_legacy_files_move_to_entry(tmp_path):
+    """The portfolio saved before per-entry files is taken over once."""
+    legacy = _journal(tmp_path)
+    legacy.add_entry("2020-01-01", 1.0, 100.0)
+
+    assert migrate_legacy_files(tmp_path, "first")
+    assert not migrate_legacy_files(tmp_path, "second")
+    assert not legacy.ledger_file.exists()
+    manager = PortfolioManager(tmp_path, None, entry_id="first")
+    manager.load()
+    assert [lot.amount_grams for lot in manager.get_entries()] == [1.0]
+
+
+def test_failed_replay_never_saves(tmp_path):
+    """A ledger that cannot be replayed raises and is not overwritten."""
+    manager = _journal(tmp_path)
+    manager.add_entry("2020-01-01", 1.0, 100.0)
+    manager.add_entry("2020-02-01", 2.0, 200.0)
+    manager.add_entry("2020-03-01", 3.0, 300.0)
+    lines = manager.ledger_file.read_bytes().splitlines(keepends=True)
+    lines[1] = b'{"seq": 2, "type": "buy"\n'
+    corrupt = b"".join(lines)
+    manager.ledger_file.write_bytes(corrupt)
+
+    manager = PortfolioManager(tmp_path, None, storage_mode=STORAGE_MODE_JOURNAL)
+    with pytest.raises(ValueError):
+        manager.load()
+    manager.add_entry("2020-04-01", 4.0, 400.0)
+    assert manager.ledger_file.read_bytes() == corrupt
+
+
+def test_lots_are_read_only(tmp_path):
+    """Lots handed out cannot be changed behind the manager's back."""
+    manager = _journal(tmp_path)
+    lot = manager.add_entry("2020-01-01", 1.0, 100.0)
+    with pytest.raises(AttributeError):
+        lot.amount_grams = 5.0
+    manager.update_entry(lot.id, amount_grams=2.0)
+    assert manager.get_entry(lot.id).amount_grams == 2.0
+    assert manager.get_total_grams() == 2.0
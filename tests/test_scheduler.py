@@ -0,0 +1,91 @@
+"""Tests for the quota-aware request scheduler of Gold Portfolio Tracker."""
+import asyncio
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.gold_portfolio.const import (
+    PRIORITY_BACKFILL,
+    PRIORITY_INTERACTIVE,
+)
+from custom_components.gold_portfolio.scheduler import (
+    MAX_WAIT,
+    ApiUsageStore,
+    QuotaExceededError,
+    QuotaScheduler,
+)
+
+
+def _scheduler(tmp_path, quota_tokens: float) -> QuotaScheduler:
+    """Return a scheduler for a 100-request plan with the given budget left."""
+    hass = HomeAssistant(str(tmp_path))
+    scheduler = QuotaScheduler(hass, "test-key", ApiUsageStore(hass), monthly_quota=100)
+    scheduler._usage["quota_tokens"] = quota_tokens
+    return scheduler
+
+
+def test_backfill_deferred_while_budget_is_low(tmp_path):
+    """A backfill below its reserve is deferred at once, with a retry time."""
+
+    async def run() -> None:
+        scheduler = _scheduler(tmp_path, 10)
+        calls = []
+
+        async def request() -> str:
+            calls.append(1)
+            return "price"
+
+        with pytest.raises(QuotaExceededError) as err:
+            await asyncio.wait_for(scheduler.async_call(PRIORITY_BACKFILL, request), 1)
+        assert err.value.retry_after > MAX_WAIT[PRIORITY_BACKFILL]
+        assert not calls
+
+        # Budget refilled (e.g. a new month): the request goes out
+        scheduler._usage["quota_tokens"] = 100.0
+        assert await scheduler.async_call(PRIORITY_BACKFILL, request) == "price"
+        assert calls == [1]
+
+    asyncio.run(run())
+
+
+def test_cancel_waiters_fails_queued_requests(tmp_path):
+    """Requests still queued when the feed stops fail instead of hanging."""
+
+    async def run() -> None:
+        hass = HomeAssistant(str(tmp_path))
+        scheduler = QuotaScheduler(
+            hass, "test-key", ApiUsageStore(hass), monthly_quota=0, rate_per_minute=1
+        )
+
+        async def request() -> str:
+            return "price"
+
+        assert await scheduler.async_call(PRIORITY_BACKFILL, request) == "price"
+        # The rate bucket is empty: the next request waits about a minute
+        task = asyncio.ensure_future(scheduler.async_call(PRIORITY_BACKFILL, request))
+        await asyncio.sleep(0.05)
+        assert not task.done()
+
+        scheduler.async_cancel_waiters()
+        with pytest.raises(QuotaExceededError):
+            await asyncio.wait_for(task, 1)
+
+    asyncio.run(run())
+
+
+def test_interactive_fails_when_budget_is_low(tmp_path):
+    """Interactive requests still give up after their maximum wait."""
+
+    async def run() -> None:
+        scheduler = _scheduler(tmp_path, 3)
+
+        async def request() -> str:
+            return "price"
+
+        with pytest.raises(QuotaExceededError):
+            await scheduler.async_call(PRIORITY_INTERACTIVE, request)
+        # Above the interactive reserve it is admitted right away
+        scheduler._usage["quota_tokens"] = 10.0
+        assert await scheduler.async_call(PRIORITY_INTERACTIVE, request) == "price"
+
+    asyncio.run(run())
@@ -0,0 +1,82 @@
+"""Tests for the services of Gold Portfolio Tracker."""
+import asyncio
+from types import SimpleNamespace
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.gold_portfolio.const import DOMAIN, SERVICE_GET_HISTORICAL_PRICES
+from custom_components.gold_portfolio.price_cache import HistoricalPriceCache
+from custom_components.gold_portfolio.scheduler import QuotaExceededError
+from custom_components.gold_portfolio.services import async_setup_services
+
+ENTRY_ID = "test_entry"
+
+
+async def _no_fetch(day, symbol, priority):
+    """Fail: every price comes from the fake cache."""
+    raise AssertionError(f"Unexpected fetch of {day}")
+
+
+async def _deferred_fetch(day, symbol, priority):
+    """Fail like the scheduler does while the API budget is low."""
+    raise QuotaExceededError("API budget exhausted - request deferred", 3600.0)
+
+
+class FakePriceCache:
+    """Price cache answering every date with a fixed price."""
+
+    def __init__(self, hass):
+        """Initialize the cache."""
+
+    async def async_get_many(self, dates, fetch, max_concurrency, symbol):
+        """Return a price for each date."""
+        return {day: 2000.0 for day in dates}, [], {}
+
+
+def _get_historical_prices(tmp_path, data, fetch=_no_fetch, price_cache=FakePriceCache):
+    """Call get_historical_prices through its schema and return the response."""
+
+    async def run():
+        hass = HomeAssistant(str(tmp_path))
+        hass.data[DOMAIN] = {
+            ENTRY_ID: {"api_client": SimpleNamespace(get_historical_price=fetch)},
+            "price_cache": price_cache(hass),
+        }
+        await async_setup_services(hass)
+        return await hass.services.async_call(
+            DOMAIN,
+            SERVICE_GET_HISTORICAL_PRICES,
+            {"entry_id": ENTRY_ID, **data},
+            blocking=True,
+            return_response=True,
+        )
+
+    return asyncio.run(run())
+
+
+def test_historical_prices_single_date(tmp_path):
+    """A single date string is one date, not a list of characters."""
+    response = _get_historical_prices(tmp_path, {"dates": "2024-01-02"})
+    assert response["prices"] == {"2024-01-02": 2000.0}
+    assert response["errors"] == {}
+
+
+def test_historical_prices_date_list(tmp_path):
+    """A list of dates is deduplicated and sorted."""
+    response = _get_historical_prices(
+        tmp_path, {"dates": ["2024-01-03", "2024-01-02", "2024-01-03"]}
+    )
+    assert list(response["prices"]) == ["2024-01-02", "2024-01-03"]
+
+
+def test_historical_prices_deferred_dates_are_errors(tmp_path):
+    """Dates deferred by a low API budget come back as errors right away."""
+    response = _get_historical_prices(
+        tmp_path,
+        {"dates": ["2024-01-02", "2024-01-03"]},
+        fetch=_deferred_fetch,
+        price_cache=HistoricalPriceCache,
+    )
+    assert response["prices"] == {}
+    assert set(response["errors"]) == {"2024-01-02", "2024-01-03"}
+    assert all("deferred" in error for error in response["errors"].values())
@@ -0,0 +1,46 @@
+"""Tests for setting up Gold Portfolio Tracker config entries."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryNotReady
+
+from custom_components.gold_portfolio import async_setup_entry
+from custom_components.gold_portfolio.const import (
+    CONF_STORAGE_MODE,
+    DOMAIN,
+    STORAGE_MODE_JOURNAL,
+)
+from custom_components.gold_portfolio.portfolio import PortfolioManager
+
+
+def test_corrupt_ledger_record_defers_setup(tmp_path):
+    """A broken record mid-ledger fails setup and leaves the file untouched."""
+    manager = PortfolioManager(
+        tmp_path, None, storage_mode=STORAGE_MODE_JOURNAL, entry_id="entry"
+    )
+    manager.load()
+    for month in (1, 2, 3):
+        manager.add_entry(f"2020-0{month}-01", float(month), 100.0 * month)
+    lines = manager.ledger_file.read_bytes().splitlines(keepends=True)
+    lines[1] = b'{"seq": 2, "type": "buy"\n'
+    corrupt = b"".join(lines)
+    manager.ledger_file.write_bytes(corrupt)
+
+    async def run() -> None:
+        hass = HomeAssistant(str(tmp_path))
+        entry = ConfigEntry(
+            "entry",
+            DOMAIN,
+            "Gold",
+            data={"api_key": "key"},
+            options={CONF_STORAGE_MODE: STORAGE_MODE_JOURNAL},
+        )
+        hass.config_entries = SimpleNamespace(async_entries=lambda domain: [entry])
+        with pytest.raises(ConfigEntryNotReady):
+            await async_setup_entry(hass, entry)
+
+    asyncio.run(run())
+    assert manager.ledger_file.read_bytes() == corrupt
@@ -0,0 +1,80 @@
+"""Tests for the persistence helpers of Gold Portfolio Tracker."""
+import asyncio
+import json
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.gold_portfolio import portfolio
+from custom_components.gold_portfolio.const import STORAGE_MODE_JOURNAL
+from custom_components.gold_portfolio.portfolio import PortfolioManager
+from custom_components.gold_portfolio.storage import DelayedJSONWriter, write_json_atomic
+
+
+def _fail_once(func):
+    """Return a wrapper of func raising OSError on its first call."""
+    calls = []
+
+    def wrapper(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            raise OSError("disk full")
+        return func(*args)
+
+    return wrapper
+
+
+def test_writer_stays_dirty_after_failed_write(tmp_path):
+    """A failed write keeps the changes pending for the next flush."""
+
+    async def run() -> None:
+        hass = HomeAssistant(str(tmp_path))
+        path = tmp_path / "data.json"
+        failed = []
+        writer = DelayedJSONWriter(
+            hass,
+            path,
+            lambda: {"value": 1},
+            write_func=_fail_once(write_json_atomic),
+            failed_func=failed.append,
+        )
+        writer.async_schedule()
+        await writer.async_flush()
+        assert writer.pending
+        assert failed == [{"value": 1}]
+        assert not path.exists()
+
+        await writer.async_flush()
+        assert not writer.pending
+        assert json.loads(path.read_text()) == {"value": 1}
+
+    asyncio.run(run())
+
+
+def test_journal_keeps_events_of_failed_append(tmp_path, monkeypatch):
+    """Events whose append failed are written with the next save."""
+    monkeypatch.setattr(portfolio, "append_events", _fail_once(portfolio.append_events))
+    manager = PortfolioManager(tmp_path, None, storage_mode=STORAGE_MODE_JOURNAL)
+    manager.load()
+    manager.add_entry("2020-01-01", 1.0, 100.0)
+    manager.add_entry("2020-02-01", 2.0, 200.0)
+
+    manager = PortfolioManager(tmp_path, None, storage_mode=STORAGE_MODE_JOURNAL)
+    manager.load()
+    assert [lot.amount_grams for lot in manager.get_entries()] == [1.0, 2.0]
+
+
+def test_snapshot_retried_after_failed_write(tmp_path, monkeypatch):
+    """A failed snapshot write is repeated by the next save."""
+    manager = PortfolioManager(tmp_path, None)
+    manager.load()
+    manager.add_entry("2020-01-01", 1.0, 100.0)
+    monkeypatch.setattr(
+        portfolio, "write_json_atomic", _fail_once(portfolio.write_json_atomic)
+    )
+    manager.add_entry("2020-02-01", 2.0, 200.0)
+    assert manager._snapshot_due
+    manager.add_entry("2020-03-01", 3.0, 300.0)
+
+    manager = PortfolioManager(tmp_path, None)
+    manager.load()
+    assert [lot.amount_grams for lot in manager.get_entries()] == [1.0, 2.0, 3.0]